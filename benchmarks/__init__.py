@@ -0,0 +1,4 @@
+"""
+Benchmarks - Mediciones de rendimiento de la capa de datos
+Ejecutar desde la raíz del proyecto, por ejemplo: python -m benchmarks.bench_conexion
+"""
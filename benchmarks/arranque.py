@@ -0,0 +1,94 @@
+"""
+Benchmark de arranque - Etapas del inicio de la aplicación, sin la interfaz gráfica
+Cada repetición corre en un proceso nuevo (las importaciones solo cuestan la primera vez)
+y registra las mismas etapas que main.py y MainWindow anotan en su TrazaArranque:
+importaciones, conexión, esquema y datos iniciales (la lista de atrasados del día y el resumen
+del dashboard).
+Sin base de datos, genera una biblioteca sintética (benchmarks.generador).
+Uso: python -m benchmarks.arranque [inventario.db] [--escala pequena] [--repeticiones 10]
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+from utils.arranque import TrazaArranque
+from utils.config import (DB_PERFIL, DB_PERSISTENTE, DB_TAMANO_POOL, INSTRUMENTAR_CONSULTAS, PERFILES_DB,
+                          UMBRAL_CONSULTA_LENTA_MS)
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def arrancar(db_path: str, perfil: Optional[str] = None) -> Dict[str, float]:
+    """Inicio sin interfaz, tal como lo hace main.py; retorna la duración de cada etapa en ms"""
+    traza = TrazaArranque()
+    from database.conexion import DatabaseConnection
+    from database.instrumentacion import Instrumentacion
+    from database.modelos import DatabaseModels
+    for modulo in ("models.libro", "models.alumno", "models.transaccion"):
+        importlib.import_module(modulo)  # No se usan aquí, pero main.py los carga al arrancar
+    from models.estadistica import EstadisticaModel
+    from models.atraso import AtrasoModel
+    traza.marcar("importaciones")
+
+    instrumentacion = Instrumentacion(UMBRAL_CONSULTA_LENTA_MS) if INSTRUMENTAR_CONSULTAS else None
+    db = DatabaseConnection(db_path, persistente=DB_PERSISTENTE, tamano_pool=DB_TAMANO_POOL, perfil=perfil,
+                            instrumentacion=instrumentacion)
+    traza.marcar("conexion")
+    DatabaseModels(db).inicializar_db()
+    traza.marcar("esquema")
+    AtrasoModel(db).actualizar_si_hace_falta()
+    EstadisticaModel(db).obtener_resumen()
+    traza.marcar("datos_iniciales")
+    db.cerrar()
+    return traza.a_dict()
+
+
+def medir_arranque(db_path: str, repeticiones: int, perfil: Optional[str] = None) -> Dict[str, List[float]]:
+    """Corre `repeticiones` arranques en procesos nuevos; retorna los tiempos (ms) de cada etapa"""
+    comando = [sys.executable, "-m", "benchmarks.arranque", db_path, "--una-vez"]
+    if perfil:
+        comando += ["--perfil", perfil]
+    tiempos: Dict[str, List[float]] = {}
+    for _ in range(repeticiones):
+        salida = subprocess.run(comando, cwd=RAIZ_PROYECTO, capture_output=True, text=True, check=True).stdout
+        for etapa, ms in json.loads(salida).items():
+            tiempos.setdefault(etapa, []).append(ms)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db", nargs="?", help="Base de datos (por defecto, una generada)")
+    parser.add_argument("--escala", default="pequena", help="Escala de la base generada")
+    parser.add_argument("--perfil", choices=PERFILES_DB, default=DB_PERFIL)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--una-vez", action="store_true", help=argparse.SUPPRESS)  # Proceso hijo
+    args = parser.parse_args()
+
+    if args.una_vez:
+        print(json.dumps(arrancar(args.db, args.perfil)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db
+        if db_path is None:
+            from benchmarks.generador import ESCALAS, generar_db
+            db_path = os.path.join(tmp, "arranque.db")
+            generar_db(db_path, **ESCALAS[args.escala])
+        tiempos = medir_arranque(db_path, args.repeticiones, args.perfil)
+
+    print(f"Arranque sin interfaz ({args.repeticiones} procesos)")
+    print(f"{'ETAPA':<18} {'MEDIANA ms':>11} {'MÁX ms':>9}")
+    for etapa, valores in tiempos.items():
+        print(f"{etapa:<18} {statistics.median(valores):>11.2f} {max(valores):>9.2f}")
+    totales = [sum(v) for v in zip(*tiempos.values())]
+    print(f"{'total':<18} {statistics.median(totales):>11.2f} {max(totales):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
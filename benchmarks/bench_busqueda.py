@@ -0,0 +1,81 @@
+"""
+Benchmark de búsqueda - LIKE (buscar_libros) contra FTS5 (buscar_libros_fts)
+Uso: python -m benchmarks.bench_busqueda [--tamanos 10000 100000 1000000] [--repeticiones 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from models.libro import LibroModel
+
+PALABRAS = [
+    "año", "árbol", "aventura", "camino", "canción", "ciudad", "cóndor", "corazón", "cuento",
+    "destino", "guerra", "historia", "isla", "jardín", "leyenda", "luna", "mar", "memoria",
+    "montaña", "noche", "país", "pájaro", "río", "secreto", "silencio", "sol", "sombra",
+    "tiempo", "tierra", "viaje", "viento", "volcán",
+]
+AUTORES = ["Neruda", "Mistral", "Allende", "Bolaño", "Donoso", "Huidobro", "Parra", "Coloane",
+           "Cortázar", "Borges", "García Márquez", "Vargas Llosa", "Rulfo", "Storni"]
+CATEGORIAS = ["Novela", "Poesía", "Cuento", "Historia", "Ciencias", "Infantil", "Juvenil"]
+TERMINOS = ["cond", "memoria mar", "neruda", "volcan", "año", "silencio noche"]
+
+
+def poblar_db(db_path: str, n_libros: int):
+    """Crea el esquema (con FTS5) y carga libros con títulos en español"""
+    db = DatabaseConnection(db_path)
+    DatabaseModels(db).inicializar_db()
+    rnd = random.Random(n_libros)
+    lote = []
+    for i in range(n_libros):
+        titulo = " ".join(rnd.sample(PALABRAS, rnd.randint(2, 5))).capitalize()
+        lote.append((f"978{i:010d}", titulo, rnd.choice(AUTORES), "Editorial Universitaria",
+                     rnd.randint(1950, 2024), rnd.choice(CATEGORIAS), 2, 2))
+        if len(lote) == 50000:
+            _insertar(db, lote)
+            lote = []
+    if lote:
+        _insertar(db, lote)
+    return db
+
+
+def _insertar(db: DatabaseConnection, lote):
+    db.ejecutar_muchos("""
+        INSERT INTO Libros (ISBN, Título, Autor, Editorial, Año_Publicacion, Categoría,
+                            Total_Ejemplares, Disponibles)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, lote)
+
+
+def medir(operacion, repeticiones: int) -> float:
+    """Latencia media en milisegundos"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        operacion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'LIBROS':>9} {'TÉRMINO':<18} {'LIKE (ms)':>10} {'FTS5 (ms)':>10} {'FILAS LIKE':>11} {'FILAS FTS':>10}")
+    for n in args.tamanos:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = poblar_db(os.path.join(tmp, "bench.db"), n)
+            libros = LibroModel(db)
+            for termino in TERMINOS:
+                t_like = medir(lambda: libros.buscar_libros(termino), args.repeticiones)
+                t_fts = medir(lambda: libros.buscar_libros_fts(termino), args.repeticiones)
+                filas_like = len(libros.buscar_libros(termino))
+                filas_fts = len(libros.buscar_libros_fts(termino))
+                print(f"{n:>9} {termino:<18} {t_like:>10.2f} {t_fts:>10.2f} {filas_like:>11} {filas_fts:>10}")
+            db.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de conexión - Latencia por operación con y sin conexiones persistentes
+Uso: python -m benchmarks.bench_conexion [--libros 50000] [--repeticiones 2000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from models.libro import LibroModel
+from models.alumno import AlumnoModel
+
+
+def poblar_db(db_path: str, n_libros: int, n_alumnos: int = 2000):
+    """Crea el esquema y carga libros y alumnos sintéticos"""
+    db = DatabaseConnection(db_path, persistente=False)
+    DatabaseModels(db).inicializar_db()
+    libros = [
+        (f"978{i:010d}", f"Libro {i}", f"Autor {i % 997}", "Editorial", 2000 + i % 24,
+         "General", 3, 3, "2024-01-01")
+        for i in range(n_libros)
+    ]
+    db.ejecutar_muchos("""
+        INSERT INTO Libros (ISBN, Título, Autor, Editorial, Año_Publicacion, Categoría,
+                            Total_Ejemplares, Disponibles, Fecha_Ingreso_Donacion)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, libros)
+    alumnos = [(f"{10000000 + i}-{i % 10}", f"Alumno {i}", f"{1 + i % 8}°A") for i in range(n_alumnos)]
+    db.ejecutar_muchos("INSERT INTO Prestatarios (RUT, Nombre, Curso) VALUES (?, ?, ?)", alumnos)
+
+
+def medir(operacion, repeticiones: int) -> float:
+    """Ejecuta la operación `repeticiones` veces y retorna la latencia media en microsegundos"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        operacion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def escenarios(db: DatabaseConnection, n_libros: int, n_alumnos: int):
+    """Operaciones representativas de un préstamo"""
+    libros = LibroModel(db)
+    alumnos = AlumnoModel(db)
+    rnd = random.Random(42)
+    return {
+        "obtener_libro_por_id": lambda: libros.obtener_libro_por_id(rnd.randint(1, n_libros)),
+        "obtener_libro_por_isbn": lambda: libros.obtener_libro_por_isbn(f"978{rnd.randrange(n_libros):010d}"),
+        "obtener_alumno_por_id": lambda: alumnos.obtener_alumno_por_id(rnd.randint(1, n_alumnos)),
+        "restar/sumar_disponibles": lambda: (libros.restar_disponibles(1), libros.sumar_disponibles(1)),
+        "get_last_row_id": db.get_last_row_id,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--libros", type=int, default=50000)
+    parser.add_argument("--alumnos", type=int, default=2000)
+    parser.add_argument("--repeticiones", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        poblar_db(db_path, args.libros, args.alumnos)
+
+        resultados = {}
+        for modo, persistente in (("por consulta", False), ("persistente", True)):
+            db = DatabaseConnection(db_path, persistente=persistente)
+            for nombre, op in escenarios(db, args.libros, args.alumnos).items():
+                resultados.setdefault(nombre, {})[modo] = medir(op, args.repeticiones)
+            db.cerrar()
+
+    print(f"Latencia media por operación ({args.libros} libros, {args.repeticiones} repeticiones)")
+    print(f"{'OPERACIÓN':<28} {'POR CONSULTA':>14} {'PERSISTENTE':>14} {'MEJORA':>8}")
+    for nombre, r in resultados.items():
+        antes, despues = r["por consulta"], r["persistente"]
+        print(f"{nombre:<28} {antes:>11.1f} µs {despues:>11.1f} µs {antes / despues:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
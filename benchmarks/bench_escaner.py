@@ -0,0 +1,96 @@
+"""
+Benchmark del escáner - costo por lectura de préstamos y devoluciones por ISBN
+Compara la búsqueda anterior (ISBN = ? OR Título LIKE '%x%') con la búsqueda exacta por
+índice, y mide prestar/devolver de a un libro, prestar_isbns con lotes de un alumno y la
+devolución por código de ejemplar.
+Uso: python -m benchmarks.bench_escaner [--libros 50000] [--lecturas 500]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from models.libro import LibroModel
+from models.transaccion import TransaccionModel
+from utils.validators import calcular_digito_rut
+
+OBJETIVO_MS = 10.0
+
+CONSULTA_ANTERIOR = """
+    SELECT ID_Libro, Título, Disponibles FROM Libros 
+    WHERE (ISBN = ? OR Título LIKE ?) AND Disponibles > 0
+    LIMIT 1
+"""
+
+
+def isbn13(n: int) -> str:
+    """ISBN-13 válido a partir de un número"""
+    digitos = f"978{n:09d}"
+    control = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digitos)) % 10) % 10
+    return f"{digitos}{control}"
+
+
+def poblar_db(db_path: str, n_libros: int, n_alumnos: int):
+    """Crea el esquema con un catálogo y una nómina sintéticos"""
+    db = DatabaseConnection(db_path)
+    DatabaseModels(db).inicializar_db()
+    db.ejecutar_muchos("""
+        INSERT INTO Libros (ISBN, Título, Autor, Total_Ejemplares, Disponibles) VALUES (?, ?, ?, 3, 3)
+    """, [(isbn13(i), f"Libro número {i}", f"Autor {i % 500}") for i in range(n_libros)])
+    ruts = [f"{10_000_000 + i}-{calcular_digito_rut(str(10_000_000 + i))}" for i in range(n_alumnos)]
+    db.ejecutar_muchos("INSERT INTO Prestatarios (RUT, Nombre, Curso) VALUES (?, ?, '1°A')",
+                       [(rut, f"Alumno {i}") for i, rut in enumerate(ruts)])
+    db.ejecutar("ANALYZE")
+    db.cerrar()
+    return ruts
+
+
+def medir(nombre: str, operaciones: int, operacion):
+    """Ejecuta la operación y muestra los ms promedio por lectura"""
+    inicio = time.perf_counter()
+    operacion()
+    ms = (time.perf_counter() - inicio) * 1000 / max(operaciones, 1)
+    estado = "ok" if ms <= OBJETIVO_MS else f"sobre {OBJETIVO_MS:.0f} ms"
+    print(f"{nombre:<38} {operaciones:>8} {ms:>12.3f}  {estado}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--libros", type=int, default=50000)
+    parser.add_argument("--lecturas", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.libros)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        ruts = poblar_db(db_path, args.libros, args.lecturas)
+        db = DatabaseConnection(db_path)
+        libros = LibroModel(db)
+        transacciones = TransaccionModel(db)
+        isbns = [isbn13(n) for n in rnd.sample(range(args.libros), args.lecturas)]
+
+        print(f"Catálogo de {args.libros} libros, objetivo {OBJETIVO_MS:.0f} ms por lectura")
+        print(f"{'OPERACIÓN':<38} {'LECTURAS':>8} {'MS/LECTURA':>12}")
+        medir("búsqueda anterior (ISBN o LIKE)", len(isbns),
+              lambda: [db.consultar_uno(CONSULTA_ANTERIOR, (i, f"%{i}%")) for i in isbns])
+        medir("búsqueda exacta por índice", len(isbns),
+              lambda: [libros.obtener_libro_por_titulo_o_isbn(i) for i in isbns])
+        medir("prestar (una transacción por libro)", len(isbns),
+              lambda: [transacciones.prestar(rut, i) for rut, i in zip(ruts, isbns)])
+        medir("devolver (una transacción por libro)", len(isbns),
+              lambda: [transacciones.devolver(i) for i in isbns])
+        lote = 10
+        medir(f"prestar_isbns (lotes de {lote} libros)", len(isbns),
+              lambda: [transacciones.prestar_isbns(ruts[k // lote], isbns[k:k + lote])
+                       for k in range(0, len(isbns), lote)])
+        codigos = [fila[0] for fila in db.consultar_todos(
+            "SELECT Codigo FROM Ejemplares WHERE ID_Transaccion IS NOT NULL")]
+        medir("devolver por código de ejemplar", len(codigos),
+              lambda: [transacciones.devolver(c) for c in codigos])
+        db.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark de recorrido - consultar_todos (fetchall) contra iterar (fetchmany) sobre el historial
+Mide el tiempo y el pico de memoria de recorrer todas las transacciones, como lo haría una exportación.
+Uso: python -m benchmarks.bench_iterar [--transacciones 500000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+
+CONSULTA = """
+    SELECT ID_Transaccion, ID_Libro, ID_Prestatario, Fecha_Entrega, Fecha_Devolucion_Real, Estado
+    FROM Transacciones ORDER BY Fecha_Entrega, ID_Transaccion
+"""
+
+
+def poblar_db(db_path: str, n_transacciones: int):
+    """Crea el esquema y carga un historial de préstamos sintético"""
+    db = DatabaseConnection(db_path)
+    DatabaseModels(db).inicializar_db()
+    db.ejecutar_muchos("INSERT INTO Libros (ISBN, Título, Autor, Total_Ejemplares, Disponibles) VALUES (?, ?, ?, 1, 1)",
+                       [(f"978{i:010d}", f"Libro {i}", "Autor") for i in range(1000)])
+    db.ejecutar_muchos("INSERT INTO Prestatarios (RUT, Nombre) VALUES (?, ?)",
+                       [(f"{10000000 + i}-0", f"Alumno {i}") for i in range(1000)])
+    rnd = random.Random(n_transacciones)
+    for inicio in range(0, n_transacciones, 50000):
+        db.ejecutar_muchos("""
+            INSERT INTO Transacciones (ID_Libro, ID_Prestatario, Fecha_Entrega, Fecha_Devolucion_Real, Estado)
+            VALUES (?, ?, ?, ?, 'Devuelto')
+        """, [(rnd.randint(1, 1000), rnd.randint(1, 1000), f"20{rnd.randint(10, 24)}-03-{rnd.randint(10, 28)}",
+               "2025-01-01") for _ in range(min(50000, n_transacciones - inicio))])
+    db.cerrar()
+
+
+def medir(recorrer):
+    """Retorna (filas recorridas, segundos, pico de memoria en MB)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    filas = recorrer()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return filas, segundos, pico / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transacciones", type=int, default=500000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        poblar_db(db_path, args.transacciones)
+        db = DatabaseConnection(db_path)
+
+        def contar(filas):
+            return sum(1 for _ in filas)
+
+        escenarios = {
+            "consultar_todos": lambda: contar(db.consultar_todos(CONSULTA)),
+            "iterar (tuplas)": lambda: contar(db.iterar(CONSULTA)),
+            "iterar (nombrada)": lambda: contar(db.iterar(CONSULTA, registro="nombrada")),
+            "iterar (slots)": lambda: contar(db.iterar(CONSULTA, registro="slots")),
+        }
+        print(f"Recorrido de {args.transacciones} transacciones")
+        print(f"{'MODO':<20} {'FILAS':>9} {'TIEMPO':>9} {'PICO MEMORIA':>13}")
+        for nombre, recorrer in escenarios.items():
+            filas, segundos, pico = medir(recorrer)
+            print(f"{nombre:<20} {filas:>9} {segundos:>8.2f}s {pico:>10.1f} MB")
+        db.cerrar()
+
+
+if __name__ == "__main__":
+    main()
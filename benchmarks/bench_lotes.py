@@ -0,0 +1,87 @@
+"""
+Benchmark de préstamos a curso - prestar/devolver de a uno contra prestar_lote/devolver_lote
+Presta un set de aula (un libro, un ejemplar por alumno) a cada curso y luego lo recibe de vuelta.
+Uso: python -m benchmarks.bench_lotes [--cursos 20] [--alumnos-por-curso 35]
+"""
+import argparse
+import os
+import tempfile
+import time
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from models.alumno import AlumnoModel
+from models.transaccion import TransaccionModel
+from benchmarks.bench_escaner import isbn13
+from utils.validators import calcular_digito_rut
+
+
+def poblar_db(db_path: str, n_cursos: int, por_curso: int):
+    """Crea cursos completos y un set de aula por curso para cada modo"""
+    db = DatabaseConnection(db_path)
+    DatabaseModels(db).inicializar_db()
+    alumnos = []
+    for c in range(n_cursos):
+        for a in range(por_curso):
+            cuerpo = str(10_000_000 + c * por_curso + a)
+            alumnos.append((f"{cuerpo}-{calcular_digito_rut(cuerpo)}", f"Alumno {c}-{a}", f"Curso {c:02d}"))
+    db.ejecutar_muchos("INSERT INTO Prestatarios (RUT, Nombre, Curso) VALUES (?, ?, ?)", alumnos)
+    db.ejecutar_muchos("""
+        INSERT INTO Libros (ISBN, Título, Autor, Total_Ejemplares, Disponibles) VALUES (?, ?, 'Autor', ?, ?)
+    """, [(isbn13(i), f"Set de aula {i}", por_curso, por_curso) for i in range(2 * n_cursos)])
+    db.cerrar()
+
+
+def medir(nombre: str, prestamos: int, operacion):
+    inicio = time.perf_counter()
+    operacion()
+    segundos = time.perf_counter() - inicio
+    print(f"{nombre:<34} {prestamos:>9} {segundos * 1000:>10.0f} {segundos * 1e6 / prestamos:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cursos", type=int, default=20)
+    parser.add_argument("--alumnos-por-curso", type=int, default=35)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        poblar_db(db_path, args.cursos, args.alumnos_por_curso)
+        db = DatabaseConnection(db_path)
+        alumnos = AlumnoModel(db)
+        transacciones = TransaccionModel(db)
+        cursos = alumnos.obtener_cursos()
+        ruts = {curso: [alumnos.obtener_alumno_por_id(pid)[1] for pid in alumnos.obtener_ids_por_curso(curso)]
+                for curso in cursos}
+        total = len(cursos) * args.alumnos_por_curso
+
+        def uno_a_uno_prestar():
+            for c, curso in enumerate(cursos):
+                for rut in ruts[curso]:
+                    transacciones.prestar(rut, isbn13(c))
+
+        def uno_a_uno_devolver():
+            for c in range(len(cursos)):
+                for tid in transacciones.obtener_prestamos_curso(c + 1, cursos[c]):
+                    transacciones.registrar_devolucion(tid)
+                    db.ejecutar("UPDATE Libros SET Disponibles = Disponibles + 1 WHERE ID_Libro = ?", (c + 1,))
+
+        def lote_prestar():
+            for c, curso in enumerate(cursos):
+                transacciones.prestar_lote(len(cursos) + c + 1, alumnos.obtener_ids_por_curso(curso))
+
+        def lote_devolver():
+            for c, curso in enumerate(cursos):
+                transacciones.devolver_lote(transacciones.obtener_prestamos_curso(len(cursos) + c + 1, curso))
+
+        print(f"{len(cursos)} cursos de {args.alumnos_por_curso} alumnos")
+        print(f"{'OPERACIÓN':<34} {'PRÉSTAMOS':>9} {'TOTAL ms':>10} {'µs/PRÉSTAMO':>12}")
+        medir("prestar de a uno", total, uno_a_uno_prestar)
+        medir("prestar_lote por curso", total, lote_prestar)
+        medir("devolver de a uno", total, uno_a_uno_devolver)
+        medir("devolver_lote por curso", total, lote_devolver)
+        db.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark de perfiles de SQLite - préstamos por segundo con cada perfil de PERFILES_DB
+Para cada perfil (y sin perfil, los valores por defecto de SQLite) crea una base nueva y mide
+prestar + devolver de a un libro, primero solo y luego con otro hilo leyendo el catálogo al
+mismo tiempo (el caso de la interfaz refrescando listas mientras se atiende el mesón).
+Uso: python -m benchmarks.bench_perfiles [--libros 20000] [--prestamos 500]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from database.conexion import DatabaseConnection
+from models.estadistica import EstadisticaModel
+from models.libro import LibroModel
+from models.transaccion import TransaccionModel
+from benchmarks.bench_escaner import isbn13, poblar_db
+from utils.config import PERFILES_DB
+
+
+def prestar_y_devolver(transacciones: TransaccionModel, ruts, isbns) -> float:
+    """Presta y devuelve cada libro; retorna los préstamos por segundo"""
+    inicio = time.perf_counter()
+    for rut, isbn in zip(ruts, isbns):
+        transacciones.prestar(rut, isbn)
+    for isbn in isbns:
+        transacciones.devolver(isbn)
+    return len(isbns) / (time.perf_counter() - inicio)
+
+
+def medir_perfil(perfil, db_path: str, ruts, isbns):
+    """Retorna (préstamos/s solo, préstamos/s con lector, lecturas/s del lector)"""
+    db = DatabaseConnection(db_path, perfil=perfil)
+    transacciones = TransaccionModel(db)
+    solo = prestar_y_devolver(transacciones, ruts, isbns)
+
+    detener = threading.Event()
+    lecturas = [0]
+
+    def lector():
+        libros, estadisticas = LibroModel(db), EstadisticaModel(db)
+        while not detener.is_set():
+            libros.buscar_libros_pagina()
+            estadisticas.obtener_resumen()
+            lecturas[0] += 1
+
+    hilo = threading.Thread(target=lector)
+    inicio = time.perf_counter()
+    hilo.start()
+    con_lector = prestar_y_devolver(transacciones, ruts, isbns)
+    detener.set()
+    hilo.join()
+    lecturas_s = lecturas[0] / (time.perf_counter() - inicio)
+    db.cerrar()
+    return solo, con_lector, lecturas_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--libros", type=int, default=20000)
+    parser.add_argument("--prestamos", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.libros)
+    isbns = [isbn13(n) for n in rnd.sample(range(args.libros), args.prestamos)]
+    print(f"Catálogo de {args.libros} libros, {args.prestamos} préstamos y devoluciones por medición")
+    print(f"{'PERFIL':<12} {'PRÉSTAMOS/s':>12} {'CON LECTOR':>12} {'LECTURAS/s':>12}")
+    for perfil in (None, *PERFILES_DB):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            ruts = poblar_db(db_path, args.libros, args.prestamos)
+            solo, con_lector, lecturas_s = medir_perfil(perfil, db_path, ruts, isbns)
+        print(f"{perfil or '(ninguno)':<12} {solo:>12.0f} {con_lector:>12.0f} {lecturas_s:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
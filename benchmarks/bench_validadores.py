@@ -0,0 +1,81 @@
+"""
+Benchmark de validadores - validar_rut/validar_isbn uno a uno contra validar_ruts/validar_isbns por lote
+Uso: python -m benchmarks.bench_validadores [--cantidad 1000000]
+"""
+import argparse
+import random
+import time
+from utils.validators import (
+    calcular_digito_rut, validar_rut, validar_isbn, validar_ruts, validar_isbns
+)
+
+
+def generar_ruts(cantidad: int, rnd: random.Random):
+    """RUTs en formatos variados; cerca de un 20% con dígito verificador incorrecto"""
+    ruts = []
+    for _ in range(cantidad):
+        cuerpo = str(rnd.randint(1_000_000, 26_000_000))
+        dv = calcular_digito_rut(cuerpo) if rnd.random() < 0.8 else rnd.choice("0123456789K")
+        formato = rnd.random()
+        if formato < 0.4:
+            ruts.append(f"{int(cuerpo):,}".replace(",", ".") + "-" + dv)
+        elif formato < 0.8:
+            ruts.append(f"{cuerpo}-{dv}")
+        else:
+            ruts.append(cuerpo + dv.lower())
+    return ruts
+
+
+def generar_isbns(cantidad: int, rnd: random.Random):
+    """Mitad ISBN-13 y mitad ISBN-10; cerca de un 20% con dígito de control alterado"""
+    isbns = []
+    for _ in range(cantidad):
+        if rnd.random() < 0.5:
+            digitos = [9, 7, 8] + [rnd.randint(0, 9) for _ in range(9)]
+            control = (10 - sum(d * (3 if i % 2 else 1) for i, d in enumerate(digitos)) % 10) % 10
+            isbn = "".join(map(str, digitos)) + str(control)
+        else:
+            digitos = [rnd.randint(0, 9) for _ in range(9)]
+            control = (11 - sum(d * (10 - i) for i, d in enumerate(digitos)) % 11) % 11
+            isbn = "".join(map(str, digitos)) + ("X" if control == 10 else str(control))
+        if rnd.random() < 0.2:
+            isbn = isbn[:-1] + str((int(isbn[-1]) + 1) % 10 if isbn[-1] != "X" else 0)
+        isbns.append(isbn[:3] + "-" + isbn[3:] if rnd.random() < 0.3 else isbn)
+    return isbns
+
+
+def medir(operacion):
+    """Retorna (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = operacion()
+    return resultado, time.perf_counter() - inicio
+
+
+def comparar(nombre: str, valores, uno_a_uno, por_lote):
+    esperado, t_uno = medir(lambda: [uno_a_uno(v) for v in valores])
+    obtenido, t_lote = medir(lambda: por_lote(valores))
+    coinciden = esperado == [bool(v) for v in obtenido]
+    print(f"{nombre:<6} {len(valores):>9} {sum(esperado):>9} "
+          f"{t_uno * 1000:>11.0f} {t_lote * 1000:>11.0f} {t_uno / t_lote:>7.1f}x  "
+          f"{'ok' if coinciden else 'DISTINTOS'}")
+    return coinciden
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cantidad", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.cantidad)
+    ruts = generar_ruts(args.cantidad, rnd)
+    isbns = generar_isbns(args.cantidad, rnd)
+
+    print(f"{'dato':<6} {'valores':>9} {'válidos':>9} {'1 a 1 (ms)':>11} {'lote (ms)':>11} {'mejora':>8}")
+    ok = comparar("RUT", ruts, validar_rut, validar_ruts)
+    ok = comparar("ISBN", isbns, validar_isbn, validar_isbns) and ok
+    if not ok:
+        raise SystemExit("Los validadores por lote no coinciden con los de un valor")
+
+
+if __name__ == "__main__":
+    main()
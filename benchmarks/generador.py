@@ -0,0 +1,288 @@
+"""
+Generador de datos sintéticos - Una biblioteca escolar completa y reproducible
+Con la misma semilla y los mismos tamaños se obtiene exactamente la misma base:
+catálogo con títulos en español (narrativa, textos escolares en sets de aula y
+obras de referencia), nómina por curso con RUT chilenos válidos y años de historial
+de préstamos concentrado en los libros populares y en los días de clases.
+Uso: python -m benchmarks.generador salida.db [--escala mediana] [--semilla 2024]
+"""
+import argparse
+import bisect
+import itertools
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from models.atraso import AtrasoModel
+from benchmarks.bench_escaner import isbn13
+from utils.plazos import fecha_devolucion
+from utils.validators import calcular_digito_rut
+
+SEMILLA = 2024
+
+# Tamaños predefinidos: libros, alumnos, años de historial, préstamos por alumno al año
+ESCALAS = {
+    "pequena": {"libros": 2_000, "alumnos": 400, "anios": 1, "prestamos_por_alumno": 10},
+    "mediana": {"libros": 10_000, "alumnos": 1_200, "anios": 3, "prestamos_por_alumno": 12},
+    "grande": {"libros": 50_000, "alumnos": 3_000, "anios": 5, "prestamos_por_alumno": 15},
+}
+
+CURSOS = ([f"{n}°{letra}" for n in range(1, 9) for letra in "AB"]
+          + [f"{n}°M{letra}" for n in ("I", "II", "III", "IV") for letra in "AB"])
+
+NOMBRES = ("Sofía", "Martina", "Florencia", "Isidora", "Agustina", "Josefa", "Emilia", "Catalina",
+           "Antonia", "Fernanda", "Valentina", "Trinidad", "Benjamín", "Vicente", "Martín", "Matías",
+           "Joaquín", "Agustín", "Tomás", "Cristóbal", "Maximiliano", "Sebastián", "Lucas", "Diego",
+           "Gaspar", "Alonso", "Felipe", "Ignacio", "Renata", "Amanda")
+APELLIDOS = ("González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Martínez",
+             "Sepúlveda", "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya",
+             "Flores", "Espinoza", "Valenzuela", "Castillo", "Tapia", "Reyes", "Gutiérrez", "Castro",
+             "Pizarro", "Álvarez", "Vásquez", "Sánchez", "Fernández", "Carrasco", "Cortés", "Núñez",
+             "Jara", "Vergara", "Riquelme", "Figueroa", "Cáceres", "Ñancupil", "Huenchumilla")
+EDITORIALES = ("Zig-Zag", "Santillana", "SM", "Planeta", "Alfaguara", "Editorial Universitaria",
+               "Andrés Bello", "Salesianos", "LOM", "Amanuta", "Ekaré Sur", "Barco de Vapor")
+
+# Sustantivos con su género, adjetivos (masculino, femenino) y lugares para armar títulos
+SUSTANTIVOS = (("casa", "f"), ("viaje", "m"), ("sombra", "f"), ("río", "m"), ("jardín", "m"),
+               ("ciudad", "f"), ("noche", "f"), ("mar", "m"), ("bosque", "m"), ("secreto", "m"),
+               ("camino", "m"), ("isla", "f"), ("memoria", "f"), ("fuego", "m"), ("luna", "f"),
+               ("montaña", "f"), ("invierno", "m"), ("carta", "f"), ("espejo", "m"), ("sueño", "m"),
+               ("historia", "f"), ("cóndor", "m"), ("zorro", "m"), ("ballena", "f"), ("tormenta", "f"))
+ADJETIVOS = (("oscuro", "oscura"), ("perdido", "perdida"), ("encantado", "encantada"),
+             ("último", "última"), ("antiguo", "antigua"), ("dormido", "dormida"), ("azul", "azul"),
+             ("eterno", "eterna"), ("escondido", "escondida"), ("valiente", "valiente"))
+LUGARES = ("Chiloé", "Valparaíso", "la Araucanía", "Atacama", "Magallanes", "los Andes", "Rapa Nui",
+           "Isla Negra", "la Patagonia", "Santiago", "Aysén", "el Elqui")
+ASIGNATURAS = ("Lenguaje y Comunicación", "Matemática", "Ciencias Naturales", "Historia y Geografía",
+               "Inglés", "Física", "Química", "Biología", "Filosofía", "Artes Visuales")
+CLASICOS = (("Papelucho", "Marcela Paz"), ("Subterra", "Baldomero Lillo"), ("Martín Rivas", "Alberto Blest Gana"),
+            ("Alsino", "Pedro Prado"), ("Hijo de ladrón", "Manuel Rojas"), ("La amortajada", "María Luisa Bombal"),
+            ("Veinte poemas de amor y una canción desesperada", "Pablo Neruda"), ("Desolación", "Gabriela Mistral"),
+            ("Cien años de soledad", "Gabriel García Márquez"), ("El principito", "Antoine de Saint-Exupéry"),
+            ("Don Quijote de la Mancha", "Miguel de Cervantes"), ("La casa de los espíritus", "Isabel Allende"))
+
+# Categorías del catálogo: (nombre, peso, función de ejemplares)
+CATEGORIAS = (
+    ("Narrativa", 55, lambda r: r.choices((1, 2, 3, 4), (50, 30, 15, 5))[0]),
+    ("Poesía", 8, lambda r: r.choices((1, 2), (70, 30))[0]),
+    ("Texto escolar", 12, lambda r: r.randint(30, 45)),  # sets de aula
+    ("Ciencias", 10, lambda r: r.choices((1, 2, 3), (60, 30, 10))[0]),
+    ("Historia", 8, lambda r: r.choices((1, 2), (70, 30))[0]),
+    ("Referencia", 3, lambda r: 1),
+    ("Diccionario", 2, lambda r: r.randint(5, 15)),
+    ("Enciclopedia", 2, lambda r: 1),
+)
+
+MESES_CLASES = range(3, 13)  # Marzo a diciembre
+PROBABILIDAD_ATRASO = 0.12  # Préstamos devueltos después del vencimiento
+DIAS_PRESTAMOS_ABIERTOS = 21  # Los préstamos de las últimas semanas pueden seguir sin devolver
+
+
+def nombre_persona(rnd: random.Random) -> str:
+    """Nombre y dos apellidos"""
+    return f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}"
+
+
+def titulo_libro(rnd: random.Random, categoria: str) -> str:
+    """Título en español acorde a la categoría"""
+    if categoria == "Texto escolar":
+        return f"{rnd.choice(ASIGNATURAS)} {rnd.choice(CURSOS)[:-1]} - Texto del estudiante"
+    if categoria == "Diccionario":
+        return rnd.choice(("Diccionario escolar de la lengua española", "Diccionario de sinónimos y antónimos",
+                           "Diccionario inglés-español"))
+    if categoria == "Enciclopedia":
+        return f"Enciclopedia {rnd.choice(('escolar', 'de la naturaleza', 'de Chile'))} tomo {rnd.randint(1, 12)}"
+    if categoria == "Referencia":
+        return f"Atlas {rnd.choice(('de Chile', 'universal', 'de la Región de ' + rnd.choice(LUGARES)))}"
+    sustantivo, genero = rnd.choice(SUSTANTIVOS)
+    articulo = "La" if genero == "f" else "El"
+    adjetivo = rnd.choice(ADJETIVOS)[genero == "f"]
+    plantilla = rnd.randrange(4)
+    if plantilla == 0:
+        return f"{articulo} {sustantivo} {adjetivo}"
+    if plantilla == 1:
+        return f"{articulo} {sustantivo} de {rnd.choice(LUGARES)}"
+    if plantilla == 2:
+        return f"Cuentos de {rnd.choice(LUGARES)}"
+    return f"{articulo} {sustantivo} {adjetivo} de {rnd.choice(LUGARES)}"
+
+
+def rut_alumno(cuerpo: int, con_puntos: bool) -> str:
+    """RUT con dígito verificador válido, con o sin puntos (como llegan en las nóminas)"""
+    dv = calcular_digito_rut(str(cuerpo))
+    if con_puntos:
+        return f"{cuerpo:,}".replace(",", ".") + f"-{dv}"
+    return f"{cuerpo}-{dv}"
+
+
+def generar_libros(rnd: random.Random, cantidad: int) -> List[Tuple]:
+    """Filas de Libros (ISBN, Título, Autor, Editorial, Año, Categoría, Total, Disponibles, Ingreso)"""
+    autores = [nombre_persona(rnd).rsplit(" ", 1)[0] for _ in range(max(cantidad // 8, 1))]
+    nombres = [c[0] for c in CATEGORIAS]
+    pesos = list(itertools.accumulate(c[1] for c in CATEGORIAS))
+    ejemplares = {c[0]: c[2] for c in CATEGORIAS}
+    filas = []
+    for i in range(cantidad):
+        if i < len(CLASICOS) and cantidad >= 10 * len(CLASICOS):
+            (titulo, autor), categoria = CLASICOS[i], "Narrativa"
+            total = rnd.randint(5, 20)
+        else:
+            categoria = rnd.choices(nombres, cum_weights=pesos)[0]
+            titulo, autor = titulo_libro(rnd, categoria), rnd.choice(autores)
+            total = ejemplares[categoria](rnd)
+        anio = min(2025, int(2026 - rnd.expovariate(1 / 12)))  # más libros recientes
+        ingreso = date(max(anio, 2000), rnd.randint(1, 12), rnd.randint(1, 28)).isoformat()
+        filas.append((isbn13(i), titulo, autor, rnd.choice(EDITORIALES), anio, categoria, total, total, ingreso))
+    return filas
+
+
+def generar_alumnos(rnd: random.Random, cantidad: int) -> List[Tuple[str, str, str]]:
+    """Filas (RUT, Nombre, Curso) repartidas por curso; RUT de alumnos nacidos entre 2008 y 2019"""
+    cuerpos = rnd.sample(range(21_000_000, 28_000_000), cantidad)
+    return [(rut_alumno(cuerpo, rnd.random() < 0.3), nombre_persona(rnd), CURSOS[i * len(CURSOS) // cantidad])
+            for i, cuerpo in enumerate(cuerpos)]
+
+
+def dias_de_clases(desde: date, hasta: date) -> List[date]:
+    """Días hábiles de marzo a diciembre entre dos fechas"""
+    dias, dia = [], desde
+    while dia <= hasta:
+        if dia.weekday() < 5 and dia.month in MESES_CLASES:
+            dias.append(dia)
+        dia += timedelta(days=1)
+    return dias
+
+
+def generar_prestamos(rnd: random.Random, libros: Sequence[Tuple], alumnos: Sequence[Tuple],
+                      anios: int, prestamos_por_alumno: int, hoy: date) -> List[Tuple]:
+    """
+    Historial de Transacciones (ID_Libro, ID_Prestatario, Entrega, Vencimiento, Devolución, Estado)
+    La popularidad de los libros sigue una ley de Zipf; los préstamos de las últimas semanas
+    pueden seguir abiertos mientras el libro tenga ejemplares libres y el alumno no lo tenga ya.
+    """
+    dias = dias_de_clases(hoy - timedelta(days=365 * anios), hoy)
+    if not dias or not libros or not alumnos:
+        return []
+    orden = list(range(1, len(libros) + 1))
+    rnd.shuffle(orden)
+    popularidad = list(itertools.accumulate(1 / (rango + 1) ** 0.9 for rango in range(len(orden))))
+    libres = {i + 1: fila[6] for i, fila in enumerate(libros)}
+    abiertos = set()
+
+    prestamos = []
+    for _ in range(len(alumnos) * anios * prestamos_por_alumno):
+        id_libro = orden[bisect.bisect_left(popularidad, rnd.random() * popularidad[-1])]
+        id_alumno = rnd.randint(1, len(alumnos))
+        entrega = rnd.choice(dias)
+        vencimiento = fecha_devolucion(entrega, libros[id_libro - 1][5], alumnos[id_alumno - 1][2])
+        dias_fuera = rnd.randint(1, 14) if rnd.random() > PROBABILIDAD_ATRASO else rnd.randint(15, 60)
+        devolucion = entrega + timedelta(days=dias_fuera)
+        abierto = (devolucion > hoy or (hoy - entrega).days <= DIAS_PRESTAMOS_ABIERTOS and rnd.random() < 0.5)
+        if abierto and libres[id_libro] > 0 and (id_libro, id_alumno) not in abiertos:
+            libres[id_libro] -= 1
+            abiertos.add((id_libro, id_alumno))
+            prestamos.append((id_libro, id_alumno, entrega.isoformat(), vencimiento, None, "Prestado"))
+        elif devolucion <= hoy:
+            prestamos.append((id_libro, id_alumno, entrega.isoformat(), vencimiento, devolucion.isoformat(),
+                              "Devuelto"))
+    prestamos.sort(key=lambda p: p[2])
+    return prestamos
+
+
+def generar_db(db_path: str, libros: int, alumnos: int, anios: int, prestamos_por_alumno: int,
+               semilla: int = SEMILLA, hoy: Optional[date] = None) -> Dict[str, int]:
+    """
+    Crea (o completa) la base en `db_path` con datos sintéticos reproducibles
+    Args:
+        hoy: Fecha de referencia del historial (por defecto la actual; fijarla hace la base
+             idéntica entre días)
+    Returns: Cantidad de libros, ejemplares, alumnos, transacciones y préstamos activos
+    """
+    rnd = random.Random(semilla)
+    hoy = hoy or date.today()
+    filas_libros = generar_libros(rnd, libros)
+    filas_alumnos = generar_alumnos(rnd, alumnos)
+    prestamos = generar_prestamos(rnd, filas_libros, filas_alumnos, anios, prestamos_por_alumno, hoy)
+
+    db = DatabaseConnection(db_path)
+    DatabaseModels(db).inicializar_db()
+    with db.transaccion() as conn:
+        conn.executemany("""
+            INSERT INTO Libros (ISBN, Título, Autor, Editorial, Año_Publicacion, Categoría,
+                                Total_Ejemplares, Disponibles, Fecha_Ingreso_Donacion)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, filas_libros)
+        conn.executemany("INSERT INTO Prestatarios (RUT, Nombre, Curso) VALUES (?, ?, ?)", filas_alumnos)
+        conn.executemany("""
+            INSERT INTO Transacciones (ID_Libro, ID_Prestatario, Fecha_Entrega, Fecha_Devolucion_Estimada,
+                                       Fecha_Devolucion_Real, Estado)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, prestamos)
+        conn.execute("""
+            UPDATE Libros SET Disponibles = Total_Ejemplares - (
+                SELECT COUNT(*) FROM Transacciones t
+                WHERE t.ID_Libro = Libros.ID_Libro AND t.Estado = 'Prestado')
+            WHERE ID_Libro IN (SELECT ID_Libro FROM Transacciones WHERE Estado = 'Prestado')
+        """)
+    AtrasoModel(db).actualizar(hoy.isoformat())
+    db.ejecutar("ANALYZE")
+    db.cerrar()
+
+    activos = sum(1 for p in prestamos if p[5] == "Prestado")
+    return {"libros": len(filas_libros), "ejemplares": sum(f[6] for f in filas_libros),
+            "alumnos": len(filas_alumnos), "transacciones": len(prestamos), "prestamos_activos": activos}
+
+
+def generar_nomina_excel(ruta: str, alumnos: Sequence[Tuple[str, str, str]], semilla: int = SEMILLA,
+                         nuevos: float = 0.1, cambios_curso: float = 0.1, retirados: float = 0.05,
+                         invalidos: float = 0.01) -> int:
+    """
+    Escribe la nómina del año siguiente (columnas RUT, Nombre, Curso) a partir de los alumnos
+    actuales: algunos se retiran, otros cambian de curso, llegan alumnos nuevos y unas pocas
+    filas vienen con el RUT mal digitado
+    Returns: Filas escritas
+    """
+    from openpyxl import Workbook
+
+    rnd = random.Random(semilla + 1)
+    filas = [(rut, nombre, rnd.choice(CURSOS) if rnd.random() < cambios_curso else curso)
+             for rut, nombre, curso in alumnos if rnd.random() >= retirados]
+    cuerpos = rnd.sample(range(15_000_000, 21_000_000), int(len(alumnos) * nuevos))
+    filas += [(rut_alumno(c, rnd.random() < 0.3), nombre_persona(rnd), rnd.choice(CURSOS)) for c in cuerpos]
+    for i in rnd.sample(range(len(filas)), int(len(filas) * invalidos)):
+        rut, nombre, curso = filas[i]
+        filas[i] = (rut[:-1] + ("0" if rut[-1] != "0" else "1"), nombre, curso)
+    rnd.shuffle(filas)
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(["RUT", "Nombre", "Curso"])
+    for fila in filas:
+        hoja.append(list(fila))
+    libro.save(ruta)
+    return len(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("salida", help="Archivo .db a crear")
+    parser.add_argument("--escala", choices=ESCALAS, default="mediana")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    for opcion in ("libros", "alumnos", "anios", "prestamos-por-alumno"):
+        parser.add_argument(f"--{opcion}", type=int, help="Reemplaza el valor de la escala")
+    args = parser.parse_args()
+
+    if os.path.exists(args.salida):
+        parser.error(f"'{args.salida}' ya existe")
+    tamanos = dict(ESCALAS[args.escala])
+    for clave in tamanos:
+        if getattr(args, clave) is not None:
+            tamanos[clave] = getattr(args, clave)
+    resumen = generar_db(args.salida, semilla=args.semilla, **tamanos)
+    print(", ".join(f"{clave}: {valor}" for clave, valor in resumen.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Verificación de planes de consulta - Detecta recorridos completos de tabla
+Ejecuta cada método público de los modelos (y las importaciones de alumnos y libros)
+sobre una BD temporal, captura el SQL que envían a DatabaseConnection, incluido el que
+corre con conn.execute dentro de db.transaccion(), y revisa su EXPLAIN QUERY PLAN.
+Termina con código 1 si alguna consulta recorre una tabla completa sin estar en
+ESCANEOS_PERMITIDOS, o si un método público no tiene argumentos de ejemplo.
+Uso: python -m benchmarks.planes_consulta [-v]
+"""
+import argparse
+import inspect
+import os
+import random
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from models.libro import LibroModel
+from models.alumno import AlumnoModel
+from models.transaccion import TransaccionModel
+from models.estadistica import EstadisticaModel
+from models.atraso import AtrasoModel
+from models.ejemplar import EjemplarModel
+from utils import import_excel
+from utils.import_libros import importar_libros
+from utils.paginacion import codificar_cursor
+from benchmarks.generador import generar_alumnos, generar_nomina_excel
+
+
+# Métodos que todavía recorren una tabla completa, con el motivo
+ESCANEOS_PERMITIDOS = {
+    "LibroModel.buscar_libros": "LIKE '%x%' sobre título/autor/ISBN no puede usar índices",
+    "LibroModel.obtener_libro_por_titulo_o_isbn": "Título LIKE '%x%'",
+    "LibroModel.obtener_todos": "listado completo del catálogo",
+    "LibroModel.obtener_pagina": "recorre idx_libros_titulo en orden y se detiene tras LIMIT filas",
+    "LibroModel.buscar_libros_pagina": "recorre idx_libros_titulo en orden hasta completar la página (LIKE '%x%')",
+    "AlumnoModel.buscar_alumnos": "LIKE '%x%' sobre RUT/nombre/curso",
+    "AlumnoModel.obtener_todos": "listado completo de alumnos",
+    "AlumnoModel.obtener_pagina": "recorre idx_prestatarios_nombre en orden y se detiene tras LIMIT filas",
+    "TransaccionModel.prestar": "usa obtener_libro_por_titulo_o_isbn",
+    "TransaccionModel.devolver": "Título LIKE '%x%'",
+    "TransaccionModel.obtener_todas_transacciones": "historial completo cuando no se filtra por alumno",
+    "TransaccionModel.iterar_historial": "exportación del historial completo cuando no se filtra por alumno",
+    "TransaccionModel.obtener_transacciones_pagina": "recorre idx_transacciones_fecha en orden y se detiene tras LIMIT filas",
+    "EstadisticaModel.calcular_resumen": "recálculo completo de los contadores",
+    "EstadisticaModel.verificar_consistencia": "usa calcular_resumen",
+    "AtrasoModel.obtener_atrasados": "recorre la tabla Atrasados, que solo contiene los préstamos vencidos",
+    "AtrasoModel.actualizar": "vacía la tabla Atrasados antes de reconstruirla",
+    "AtrasoModel.actualizar_si_hace_falta": "usa actualizar",
+    "import_excel.sincronizar_alumnos_desde_excel": "compara la nómina con todos los alumnos registrados",
+}
+
+# Argumentos de ejemplo para cada método público
+LLAMADAS = {
+    LibroModel: {
+        "crear_libro": [("9791000000001", "Libro nuevo", "Autor")],
+        "obtener_libro_por_isbn": [("9780000000002",)],
+        "obtener_libro_por_id": [(1,)],
+        "obtener_libro_por_titulo_o_isbn": [("9780000000002",), ("9780306406157",)],
+        "obtener_libro_por_isbn_exacto": [("978-0-306-40615-7",), ("9780000000002", False)],
+        "buscar_libros": [("", ), ("quijote",)],
+        "buscar_libros_fts": [("quijote cervantes",)],
+        "buscar_libros_pagina": [("",), ("quijote", codificar_cursor("Libro", 1))],
+        "buscar_libros_fts_pagina": [("quijote",), ("quijote", codificar_cursor(-1.5, 1))],
+        "filtrar_libros": [([], "quijote")],
+        "filtrar_libros_fts": [([], "quijote")],
+        "fts_disponible": [()],
+        "actualizar_libro": [(2, "9780000000002", "Título", "Autor")],
+        "sumar_ejemplares": [("9780000000002", 1)],
+        "restar_disponibles": [(1,)],
+        "sumar_disponibles": [(1,)],
+        "eliminar_libro": [(999999,)],
+        "tiene_prestamos_activos": [(1,)],
+        "obtener_todos": [()],
+        "obtener_pagina": [(), (codificar_cursor("Libro", 1),)],
+        "obtener_estadisticas": [()],
+    },
+    AlumnoModel: {
+        "crear_alumno": [("99999999-9", "Alumno nuevo")],
+        "obtener_alumno_por_rut": [("10000001-1",)],
+        "obtener_alumno_por_id": [(1,)],
+        "buscar_alumnos": [("",), ("pérez",), ("10.000.00",)],
+        "buscar_alumnos_pagina": [("",), ("10.000.00", codificar_cursor("Alumno", 1))],
+        "actualizar_alumno": [(1, "10000001-1", "Alumno 1")],
+        "eliminar_alumno": [(999999,)],
+        "obtener_total_alumnos": [()],
+        "tiene_prestamos_activos": [(1,)],
+        "obtener_libros_en_poder": [(1,)],
+        "normalizar_rut": [("10.000.001-1",)],
+        "filtrar_alumnos": [([], "pérez")],
+        "obtener_cursos": [()],
+        "obtener_ids_por_curso": [("1°A",)],
+        "obtener_todos": [()],
+        "obtener_pagina": [(), (codificar_cursor("Alumno", 1),)],
+    },
+    TransaccionModel: {
+        "crear_prestamo": [(1, 1)],
+        "prestar": [("10000002-2", "9780000000003"), ("10000003-3", "000009-001")],
+        "prestar_isbns": [("10000004-4", ["9780000000005", "9780000000006", "9780000000005"])],
+        "prestar_lote": [(7, [5, 6, 7, 999999])],
+        "devolver_lote": [([1, 2, 3, 999999],)],
+        "obtener_prestamos_curso": [(7, "1°A")],
+        "devolver": [("9780000000003",), ("9780306406157",), ("000009-001",)],
+        "existe_prestamo_duplicado": [(1, 1)],
+        "obtener_prestamo_activo": [(1,)],
+        "registrar_devolucion": [(1,)],
+        "obtener_todas_transacciones": [(), (1,)],
+        "obtener_transacciones_pagina": [(), (1, codificar_cursor("2025-01-01", 10))],
+        "iterar_historial": [(), (1, "nombrada")],
+        "obtener_prestamo_por_libro": [(1,)],
+        "obtener_total_prestamos_activos": [()],
+    },
+    EstadisticaModel: {
+        "obtener_resumen": [()],
+        "calcular_resumen": [()],
+        "verificar_consistencia": [(False,), ()],
+    },
+    EjemplarModel: {
+        "obtener_por_codigo": [("000001-001",)],
+        "obtener_disponibles": [(1,), (2, 5)],
+        "obtener_ejemplares": [(1,)],
+    },
+    AtrasoModel: {
+        "calcular_vencimiento": [(1, 1, "2025-03-10")],
+        "actualizar": [(), ("2025-03-20",)],
+        "actualizar_si_hace_falta": [()],
+        "contar_atrasados": [()],
+        "obtener_atrasados": [()],
+    },
+}
+
+
+# Sentencias de control que aparecen en la traza de una transacción
+CONTROL_TRANSACCION = ("BEGIN", "COMMIT", "END", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+class ConexionCaptura(DatabaseConnection):
+    """
+    DatabaseConnection que registra cada consulta enviada: las de sus métodos y, dentro
+    de transaccion(), todas las que corren en la conexión (set_trace_callback entrega el
+    SQL con los parámetros ya reemplazados)
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self.capturadas: List[Tuple[str, Tuple]] = []
+
+    def _capturar(self, query, params):
+        # Dentro de una transacción la traza de la conexión ya registra la consulta
+        if getattr(self._tx, "nivel", 0) == 0:
+            self.capturadas.append((query, params))
+
+    def _trazar(self, sql: str):
+        """Callback de la traza de SQLite (se omiten el control de la transacción y los triggers)"""
+        inicio = sql.lstrip()
+        if inicio.startswith("--") or inicio.upper().startswith(CONTROL_TRANSACCION):
+            return
+        self.capturadas.append((sql, ()))
+
+    @contextmanager
+    def transaccion(self, inmediata: bool = True):
+        exterior = getattr(self._tx, "nivel", 0) == 0
+        with super().transaccion(inmediata) as conn:
+            if not exterior:
+                yield conn
+                return
+            conn.set_trace_callback(self._trazar)
+            try:
+                yield conn
+            finally:
+                conn.set_trace_callback(None)
+
+    def ejecutar(self, query, params=()):
+        self._capturar(query, params)
+        return super().ejecutar(query, params)
+
+    def ejecutar_muchos(self, query, params_list):
+        self._capturar(query, params_list[0] if params_list else ())
+        return super().ejecutar_muchos(query, params_list)
+
+    def consultar_uno(self, query, params=()):
+        self._capturar(query, params)
+        return super().consultar_uno(query, params)
+
+    def consultar_todos(self, query, params=()):
+        self._capturar(query, params)
+        return super().consultar_todos(query, params)
+
+    def iterar(self, query, params=(), *args, **kwargs):
+        self._capturar(query, params)
+        return super().iterar(query, params, *args, **kwargs)
+
+
+def poblar(db: DatabaseConnection):
+    """Carga algunos datos para que el planificador tenga tablas no vacías"""
+    db.ejecutar_muchos("""
+        INSERT INTO Libros (ISBN, Título, Autor, Total_Ejemplares, Disponibles)
+        VALUES (?, ?, ?, 2, 2)
+    """, [(f"978{i:010d}", f"Libro {i}", f"Autor {i}") for i in range(1, 200)])
+    db.ejecutar_muchos("INSERT INTO Prestatarios (RUT, Nombre, Curso) VALUES (?, ?, ?)",
+                       [(f"{10000000 + i}-{i % 10}", f"Alumno {i}", "1°A") for i in range(1, 200)])
+    db.ejecutar_muchos("""
+        INSERT INTO Transacciones (ID_Libro, ID_Prestatario, Fecha_Entrega, Estado)
+        VALUES (?, ?, '2024-03-01', ?)
+    """, [(i % 199 + 1, i % 199 + 1, "Prestado" if i % 5 == 0 else "Devuelto") for i in range(1000)])
+    db.ejecutar("ANALYZE")
+
+
+def indices_parciales(db: DatabaseConnection) -> List[str]:
+    """Nombres de los índices parciales (recorrerlos solo visita las filas que cumplen su WHERE)"""
+    filas = db.consultar_todos("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+    return [nombre for nombre, sql in filas if " WHERE " in sql.upper()]
+
+
+def escaneos_completos(db: DatabaseConnection, query: str, params: Tuple, parciales: List[str]) -> List[str]:
+    """
+    Retorna las líneas del plan que recorren una tabla completa, ya sea directamente
+    o a través de un índice no parcial (SCAN ... USING INDEX). Las consultas MATCH
+    sobre tablas FTS5 aparecen como SCAN ... VIRTUAL TABLE INDEX y no cuentan.
+    """
+    plan = db.consultar_todos(f"EXPLAIN QUERY PLAN {query}", params)
+    return [
+        fila[3] for fila in plan
+        if fila[3].startswith("SCAN ") and not fila[3].startswith("SCAN sqlite_")
+        and fila[3] != "SCAN CONSTANT ROW"  # SELECT sin FROM (subconsultas escalares)
+        and "VIRTUAL TABLE INDEX" not in fila[3]
+        and not any(fila[3].endswith(f"INDEX {p}") for p in parciales)
+    ]
+
+
+def importaciones(db: DatabaseConnection, tmp: str) -> List[Tuple[str, Callable[[], object]]]:
+    """Llamadas de ejemplo a las importaciones, con una nómina Excel y un catálogo CSV pequeños"""
+    nomina = os.path.join(tmp, "nomina.xlsx")
+    generar_nomina_excel(nomina, generar_alumnos(random.Random(1), 30))
+    catalogo = os.path.join(tmp, "catalogo.csv")
+    with open(catalogo, "w", encoding="utf-8") as archivo:
+        archivo.write("ISBN,Título,Ejemplares\n9780306406157,Libro importado,2\n9780000000002,Libro 2,1\n")
+    return [
+        ("import_excel.importar_alumnos_desde_excel", lambda: import_excel.importar_alumnos_desde_excel(nomina, db)),
+        ("import_excel.sincronizar_alumnos_desde_excel",
+         lambda: import_excel.sincronizar_alumnos_desde_excel(nomina, db, simular=True)),
+        ("import_excel.sincronizar_alumnos_desde_excel",
+         lambda: import_excel.sincronizar_alumnos_desde_excel(nomina, db, eliminar_retirados=True)),
+        ("import_libros.importar_libros", lambda: importar_libros(catalogo, db)),
+    ]
+
+
+def revisar(db: ConexionCaptura, metodo: str, llamada: Callable[[], object], parciales: List[str],
+            verbose: bool) -> int:
+    """Ejecuta una llamada y revisa el plan de cada consulta capturada; retorna los problemas"""
+    problemas = 0
+    db.capturadas.clear()
+    try:
+        resultado = llamada()
+        if inspect.isgenerator(resultado):
+            list(resultado)  # El SQL de un generador se ejecuta al recorrerlo
+    except ValueError:
+        pass  # Reglas de negocio (p. ej. préstamo duplicado): el SQL ya quedó capturado
+    # Una consulta repetida con los mismos parámetros (executemany, bucles) se revisa una vez
+    for query, params in dict.fromkeys(db.capturadas):
+        if query.lstrip().upper().startswith(("PRAGMA", "ANALYZE")):
+            continue
+        escaneos = escaneos_completos(db, query, params, parciales)
+        if escaneos and metodo not in ESCANEOS_PERMITIDOS:
+            print(f"❌ {metodo}: {'; '.join(escaneos)}")
+            if verbose:
+                print(f"    {' '.join(query.split())}")
+            problemas += 1
+        elif verbose:
+            estado = f"permitido ({ESCANEOS_PERMITIDOS[metodo]})" if escaneos else "ok"
+            print(f"✅ {metodo}: {estado}")
+    return problemas
+
+
+def verificar(verbose: bool = False) -> int:
+    """Revisa los planes de todos los métodos públicos; retorna la cantidad de problemas"""
+    problemas = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ConexionCaptura(os.path.join(tmp, "planes.db"))
+        DatabaseModels(db).inicializar_db()
+        poblar(db)
+        parciales = indices_parciales(db)
+
+        for clase, llamadas in LLAMADAS.items():
+            modelo = clase(db)
+            publicos = [n for n, _ in inspect.getmembers(clase, inspect.isfunction) if not n.startswith("_")]
+            for nombre in publicos:
+                metodo = f"{clase.__name__}.{nombre}"
+                if nombre not in llamadas:
+                    print(f"❌ {metodo}: sin argumentos de ejemplo en LLAMADAS")
+                    problemas += 1
+                    continue
+                for args in llamadas[nombre]:
+                    problemas += revisar(db, metodo, lambda: getattr(modelo, nombre)(*args), parciales, verbose)
+
+        for funcion, llamada in importaciones(db, tmp):
+            problemas += revisar(db, funcion, llamada, parciales, verbose)
+        db.cerrar()
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    problemas = verificar(args.verbose)
+    print(f"{problemas} consulta(s) con recorrido completo no permitido.")
+    sys.exit(1 if problemas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+Suite de benchmarks - Un escenario por cada método público de LibroModel, AlumnoModel,
+TransaccionModel y utils.import_excel sobre una biblioteca sintética (benchmarks.generador),
+más las etapas del arranque sin interfaz ("Arranque.<etapa>", benchmarks.arranque)
+La misma semilla y escala generan los mismos datos, así que dos corridas son comparables:
+los resultados se guardan en JSON y --comparar marca las regresiones contra una corrida
+anterior (código de salida 1). También falla si un método público no tiene escenario.
+Uso: python -m benchmarks.suite [--escala mediana] [--semilla 2024] [--perfil escritorio]
+                                [--salida archivo.json] [--comparar anterior.json] [--solo Libro]
+"""
+import argparse
+import inspect
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from models.libro import LibroModel
+from models.alumno import AlumnoModel
+from models.transaccion import TransaccionModel
+from utils import import_excel
+from utils.config import PERFILES_DB
+from benchmarks.arranque import medir_arranque
+from benchmarks.bench_escaner import isbn13
+from benchmarks.generador import ESCALAS, SEMILLA, generar_db, generar_nomina_excel, rut_alumno
+
+# Repeticiones según el costo de la operación
+RAPIDO, MEDIO, LENTO, MUY_LENTO = 300, 50, 10, 3
+TOLERANCIA = 0.25  # Aumento de la mediana que se considera regresión
+PISO_RUIDO_MS = 0.05  # Diferencias menores se ignoran aunque superen la tolerancia
+DIRECTORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+Escenario = namedtuple("Escenario", "nombre repeticiones llamada preparar", defaults=(None,))
+# nombre = "Clase.metodo" o "Clase.metodo (variante)"; llamada(x) se mide, con x = preparar(i) o i
+
+
+class Contexto:
+    """Modelos, muestras de datos y contadores compartidos por los escenarios"""
+
+    def __init__(self, db: DatabaseConnection, tmp: str, semilla: int):
+        self.db = db
+        self.tmp = tmp
+        self.libros = LibroModel(db)
+        self.alumnos = AlumnoModel(db)
+        self.transacciones = TransaccionModel(db)
+        self._contador = itertools.count()
+        rnd = random.Random(semilla)
+
+        self.todos_libros = self.libros.obtener_todos()
+        self.todos_alumnos = self.alumnos.obtener_todos()
+        self.muestra_libros = rnd.sample(self.todos_libros, min(500, len(self.todos_libros)))
+        self.muestra_alumnos = rnd.sample(self.todos_alumnos, min(500, len(self.todos_alumnos)))
+        # Cada préstamo de los escenarios usa un libro distinto, así no se agotan los ejemplares
+        self.disponibles = [fila for fila in self.todos_libros if fila[6] != "Texto escolar" and fila[8] > 0]
+        rnd.shuffle(self.disponibles)
+        self.sets_aula = [(fila[0], fila[8]) for fila in self.todos_libros
+                          if fila[6] == "Texto escolar" and fila[8] >= 30]
+        self.cursos = self.alumnos.obtener_cursos()
+        self.activos = db.consultar_todos("""
+            SELECT ID_Libro, ID_Prestatario FROM Transacciones WHERE Estado = 'Prestado' LIMIT 500
+        """)
+        self.terminos = ("casa", "quijote", "neruda", "chiloé", "matemática", "cuentos de la")
+        self.apellidos = ("gonzález", "muñoz", "rojas", "díaz", "ñancupil")
+
+    def nuevo(self) -> int:
+        """Número que no se repite en toda la corrida (para ISBN, RUT y pares libro-alumno nuevos)"""
+        return next(self._contador)
+
+    def par_prestamo(self):
+        """(rut, isbn, id_libro, id_prestatario) de un préstamo que todavía no existe"""
+        k = self.nuevo()
+        libro = self.disponibles[k % len(self.disponibles)]
+        alumno = self.muestra_alumnos[(k * 7) % len(self.muestra_alumnos)]
+        return alumno[1], libro[1], libro[0], alumno[0]
+
+    def prestar(self) -> int:
+        """Registra un préstamo (fuera de la medición) y retorna su ID_Transaccion"""
+        while True:
+            rut, isbn, _, _ = self.par_prestamo()
+            try:
+                self.transacciones.prestar(rut, isbn)
+                return self.db.consultar_uno("SELECT MAX(ID_Transaccion) FROM Transacciones")[0]
+            except ValueError:
+                continue  # Sin ejemplares o préstamo repetido: se prueba con el par siguiente
+
+    def curso_con_set(self):
+        """(id de un set de aula sin usar, curso, ids de sus alumnos que alcanzan ejemplar)"""
+        k = self.nuevo()
+        curso = self.cursos[k % len(self.cursos)]
+        id_libro, copias = self.sets_aula[k % len(self.sets_aula)]
+        return id_libro, curso, self.alumnos.obtener_ids_por_curso(curso)[:copias]
+
+
+def escenarios_libros(ctx: Contexto) -> List[Escenario]:
+    L, m = ctx.libros, ctx.muestra_libros
+    termino = lambda i: ctx.terminos[i % len(ctx.terminos)]
+    pagina_2 = L.obtener_pagina()[1]
+    busqueda_2 = L.buscar_libros_pagina("cuentos")[1]
+
+    def crear_libro_nuevo(i):
+        isbn = isbn13(900_000_000 + ctx.nuevo())
+        L.crear_libro(isbn, "Libro de prueba", "Autor de prueba")
+        return L.obtener_libro_por_isbn(isbn)[0]
+
+    return [
+        Escenario("LibroModel.crear_libro", MEDIO,
+                  lambda i: L.crear_libro(isbn13(900_000_000 + ctx.nuevo()), "Libro nuevo", "Autor nuevo")),
+        Escenario("LibroModel.eliminar_libro", MEDIO, L.eliminar_libro, crear_libro_nuevo),
+        Escenario("LibroModel.obtener_libro_por_isbn", RAPIDO, lambda i: L.obtener_libro_por_isbn(m[i % len(m)][1])),
+        Escenario("LibroModel.obtener_libro_por_id", RAPIDO, lambda i: L.obtener_libro_por_id(m[i % len(m)][0])),
+        Escenario("LibroModel.obtener_libro_por_isbn_exacto", RAPIDO,
+                  lambda i: L.obtener_libro_por_isbn_exacto(m[i % len(m)][1])),
+        Escenario("LibroModel.obtener_libro_por_titulo_o_isbn (isbn)", RAPIDO,
+                  lambda i: L.obtener_libro_por_titulo_o_isbn(m[i % len(m)][1])),
+        Escenario("LibroModel.obtener_libro_por_titulo_o_isbn (título)", MEDIO,
+                  lambda i: L.obtener_libro_por_titulo_o_isbn(m[i % len(m)][2][:12])),
+        Escenario("LibroModel.buscar_libros (todo)", LENTO, lambda i: L.buscar_libros("")),
+        Escenario("LibroModel.buscar_libros (término)", LENTO, lambda i: L.buscar_libros(termino(i))),
+        Escenario("LibroModel.buscar_libros_pagina (primera)", MEDIO, lambda i: L.buscar_libros_pagina("")),
+        Escenario("LibroModel.buscar_libros_pagina (término)", MEDIO, lambda i: L.buscar_libros_pagina(termino(i))),
+        Escenario("LibroModel.buscar_libros_pagina (siguiente)", MEDIO,
+                  lambda i: L.buscar_libros_pagina("cuentos", busqueda_2)),
+        Escenario("LibroModel.buscar_libros_fts", MEDIO, lambda i: L.buscar_libros_fts(termino(i))),
+        Escenario("LibroModel.buscar_libros_fts_pagina", MEDIO, lambda i: L.buscar_libros_fts_pagina(termino(i))),
+        Escenario("LibroModel.filtrar_libros", LENTO, lambda i: L.filtrar_libros(ctx.todos_libros, termino(i))),
+        Escenario("LibroModel.filtrar_libros_fts", LENTO,
+                  lambda i: L.filtrar_libros_fts(ctx.todos_libros, termino(i))),
+        Escenario("LibroModel.fts_disponible", RAPIDO, lambda i: L.fts_disponible()),
+        Escenario("LibroModel.actualizar_libro", MEDIO, lambda i: L.actualizar_libro(*m[i % len(m)][:7])),
+        Escenario("LibroModel.sumar_ejemplares", MEDIO, lambda i: L.sumar_ejemplares(m[i % len(m)][1], 1)),
+        Escenario("LibroModel.restar_disponibles", MEDIO, lambda i: L.restar_disponibles(m[i % len(m)][0])),
+        Escenario("LibroModel.sumar_disponibles", MEDIO, lambda i: L.sumar_disponibles(m[i % len(m)][0])),
+        Escenario("LibroModel.tiene_prestamos_activos", RAPIDO, lambda i: L.tiene_prestamos_activos(m[i % len(m)][0])),
+        Escenario("LibroModel.obtener_todos", LENTO, lambda i: L.obtener_todos()),
+        Escenario("LibroModel.obtener_pagina (primera)", MEDIO, lambda i: L.obtener_pagina()),
+        Escenario("LibroModel.obtener_pagina (siguiente)", MEDIO, lambda i: L.obtener_pagina(pagina_2)),
+        Escenario("LibroModel.obtener_estadisticas", RAPIDO, lambda i: L.obtener_estadisticas()),
+    ]
+
+
+def escenarios_alumnos(ctx: Contexto) -> List[Escenario]:
+    A, m = ctx.alumnos, ctx.muestra_alumnos
+    apellido = lambda i: ctx.apellidos[i % len(ctx.apellidos)]
+    pagina_2 = A.obtener_pagina()[1]
+    con_libros = [id_alumno for _, id_alumno in ctx.activos] or [m[0][0]]
+
+    def crear_alumno_nuevo(i):
+        rut = rut_alumno(30_000_000 + ctx.nuevo(), False)
+        A.crear_alumno(rut, "Alumno de prueba", "1°A")
+        return A.obtener_alumno_por_rut(rut)[0]
+
+    return [
+        Escenario("AlumnoModel.crear_alumno", MEDIO,
+                  lambda i: A.crear_alumno(rut_alumno(30_000_000 + ctx.nuevo(), True), "Alumno nuevo", "1°A")),
+        Escenario("AlumnoModel.eliminar_alumno", MEDIO, A.eliminar_alumno, crear_alumno_nuevo),
+        Escenario("AlumnoModel.normalizar_rut", RAPIDO, lambda i: A.normalizar_rut(m[i % len(m)][1])),
+        Escenario("AlumnoModel.obtener_alumno_por_rut", RAPIDO, lambda i: A.obtener_alumno_por_rut(m[i % len(m)][1])),
+        Escenario("AlumnoModel.obtener_alumno_por_id", RAPIDO, lambda i: A.obtener_alumno_por_id(m[i % len(m)][0])),
+        Escenario("AlumnoModel.buscar_alumnos (todo)", LENTO, lambda i: A.buscar_alumnos("")),
+        Escenario("AlumnoModel.buscar_alumnos (apellido)", MEDIO, lambda i: A.buscar_alumnos(apellido(i))),
+        Escenario("AlumnoModel.buscar_alumnos (rut)", MEDIO, lambda i: A.buscar_alumnos(m[i % len(m)][1][:8])),
+        Escenario("AlumnoModel.buscar_alumnos_pagina (primera)", MEDIO, lambda i: A.buscar_alumnos_pagina("")),
+        Escenario("AlumnoModel.buscar_alumnos_pagina (apellido)", MEDIO,
+                  lambda i: A.buscar_alumnos_pagina(apellido(i))),
+        Escenario("AlumnoModel.filtrar_alumnos", LENTO, lambda i: A.filtrar_alumnos(ctx.todos_alumnos, apellido(i))),
+        Escenario("AlumnoModel.actualizar_alumno", MEDIO, lambda i: A.actualizar_alumno(*m[i % len(m)])),
+        Escenario("AlumnoModel.obtener_total_alumnos", RAPIDO, lambda i: A.obtener_total_alumnos()),
+        Escenario("AlumnoModel.tiene_prestamos_activos", RAPIDO,
+                  lambda i: A.tiene_prestamos_activos(m[i % len(m)][0])),
+        Escenario("AlumnoModel.obtener_libros_en_poder", RAPIDO,
+                  lambda i: A.obtener_libros_en_poder(con_libros[i % len(con_libros)])),
+        Escenario("AlumnoModel.obtener_cursos", MEDIO, lambda i: A.obtener_cursos()),
+        Escenario("AlumnoModel.obtener_ids_por_curso", MEDIO,
+                  lambda i: A.obtener_ids_por_curso(ctx.cursos[i % len(ctx.cursos)])),
+        Escenario("AlumnoModel.obtener_todos", LENTO, lambda i: A.obtener_todos()),
+        Escenario("AlumnoModel.obtener_pagina (primera)", MEDIO, lambda i: A.obtener_pagina()),
+        Escenario("AlumnoModel.obtener_pagina (siguiente)", MEDIO, lambda i: A.obtener_pagina(pagina_2)),
+    ]
+
+
+def escenarios_transacciones(ctx: Contexto) -> List[Escenario]:
+    T, activos = ctx.transacciones, ctx.activos or [(1, 1)]
+    alumno = lambda i: ctx.muestra_alumnos[i % len(ctx.muestra_alumnos)][0]
+    pagina_2 = T.obtener_transacciones_pagina()[1]
+
+    def codigo_prestado(i):
+        return ctx.db.consultar_uno("SELECT Codigo FROM Ejemplares WHERE ID_Transaccion = ?", (ctx.prestar(),))
+
+    # Con ISBN o título se indica el alumno: el libro puede tener otros préstamos activos
+    def titulo_prestado(i):
+        return ctx.db.consultar_uno("""
+            SELECT l.Título, p.RUT FROM Transacciones t JOIN Libros l ON l.ID_Libro = t.ID_Libro
+            JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+            WHERE t.ID_Transaccion = ?
+        """, (ctx.prestar(),))
+
+    def isbn_prestado(i):
+        return ctx.db.consultar_uno("""
+            SELECT l.ISBN, p.RUT FROM Transacciones t JOIN Libros l ON l.ID_Libro = t.ID_Libro
+            JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+            WHERE t.ID_Transaccion = ?
+        """, (ctx.prestar(),))
+
+    def con_codigo(i):
+        rut, _, id_libro, _ = ctx.par_prestamo()
+        codigo = ctx.db.consultar_uno("""
+            SELECT Codigo FROM Ejemplares WHERE ID_Libro = ? AND ID_Transaccion IS NULL LIMIT 1
+        """, (id_libro,))
+        return rut, codigo[0] if codigo else ""
+
+    def con_titulo(i):
+        rut, _, id_libro, _ = ctx.par_prestamo()
+        return rut, ctx.libros.obtener_libro_por_id(id_libro)[2]
+
+    def prestamo_creado(i):
+        _, _, id_libro, id_alumno = ctx.par_prestamo()
+        T.crear_prestamo(id_libro, id_alumno)
+        return ctx.db.get_last_row_id()
+
+    def set_prestado(i):
+        id_libro, curso, ids = ctx.curso_con_set()
+        T.prestar_lote(id_libro, ids)
+        return id_libro, curso
+
+    return [
+        Escenario("TransaccionModel.crear_prestamo", MEDIO, lambda i: T.crear_prestamo(*ctx.par_prestamo()[2:])),
+        Escenario("TransaccionModel.registrar_devolucion", MEDIO, T.registrar_devolucion, prestamo_creado),
+        Escenario("TransaccionModel.prestar (isbn)", MEDIO, lambda p: T.prestar(p[0], p[1]),
+                  lambda i: ctx.par_prestamo()),
+        Escenario("TransaccionModel.prestar (código)", MEDIO, lambda p: T.prestar(*p), con_codigo),
+        Escenario("TransaccionModel.prestar (título)", LENTO, lambda p: T.prestar(*p), con_titulo),
+        Escenario("TransaccionModel.prestar_isbns", MEDIO,
+                  lambda p: T.prestar_isbns(p[0][0], [isbn for _, isbn, _, _ in p]),
+                  lambda i: [ctx.par_prestamo() for _ in range(3)]),
+        Escenario("TransaccionModel.prestar_lote", LENTO, lambda p: T.prestar_lote(p[0], p[2]),
+                  lambda i: ctx.curso_con_set()),
+        Escenario("TransaccionModel.obtener_prestamos_curso", LENTO,
+                  lambda p: T.obtener_prestamos_curso(*p), set_prestado),
+        Escenario("TransaccionModel.devolver_lote", LENTO, T.devolver_lote,
+                  lambda i: T.obtener_prestamos_curso(*set_prestado(i))),
+        Escenario("TransaccionModel.devolver (isbn)", MEDIO, lambda f: T.devolver(f[0], f[1]), isbn_prestado),
+        Escenario("TransaccionModel.devolver (código)", MEDIO, lambda f: T.devolver(f[0]), codigo_prestado),
+        Escenario("TransaccionModel.devolver (título)", LENTO, lambda f: T.devolver(f[0], f[1]), titulo_prestado),
+        Escenario("TransaccionModel.existe_prestamo_duplicado", RAPIDO,
+                  lambda i: T.existe_prestamo_duplicado(*activos[i % len(activos)])),
+        Escenario("TransaccionModel.obtener_prestamo_activo", RAPIDO,
+                  lambda i: T.obtener_prestamo_activo(activos[i % len(activos)][0])),
+        Escenario("TransaccionModel.obtener_prestamo_por_libro", RAPIDO,
+                  lambda i: T.obtener_prestamo_por_libro(activos[i % len(activos)][0])),
+        Escenario("TransaccionModel.obtener_todas_transacciones (todas)", MUY_LENTO,
+                  lambda i: T.obtener_todas_transacciones()),
+        Escenario("TransaccionModel.obtener_todas_transacciones (alumno)", RAPIDO,
+                  lambda i: T.obtener_todas_transacciones(alumno(i))),
+        Escenario("TransaccionModel.obtener_transacciones_pagina (primera)", MEDIO,
+                  lambda i: T.obtener_transacciones_pagina()),
+        Escenario("TransaccionModel.obtener_transacciones_pagina (siguiente)", MEDIO,
+                  lambda i: T.obtener_transacciones_pagina(None, pagina_2)),
+        Escenario("TransaccionModel.obtener_transacciones_pagina (alumno)", RAPIDO,
+                  lambda i: T.obtener_transacciones_pagina(alumno(i))),
+        Escenario("TransaccionModel.iterar_historial (todo)", MUY_LENTO, lambda i: T.iterar_historial()),
+        Escenario("TransaccionModel.iterar_historial (alumno, nombrada)", RAPIDO,
+                  lambda i: T.iterar_historial(alumno(i), "nombrada")),
+        Escenario("TransaccionModel.obtener_total_prestamos_activos", RAPIDO,
+                  lambda i: T.obtener_total_prestamos_activos()),
+    ]
+
+
+def escenarios_import_excel(ctx: Contexto) -> List[Escenario]:
+    nomina = os.path.join(ctx.tmp, "nomina.xlsx")
+    generar_nomina_excel(nomina, [fila[1:] for fila in ctx.todos_alumnos])
+    lote = list(import_excel.leer_filas_excel(nomina, import_excel.COLUMNAS_ALUMNOS)[1])[:import_excel.TAMANO_LOTE]
+    reporte = import_excel.sincronizar_alumnos_desde_excel(nomina, ctx.db, simular=True)
+
+    def base_vacia(i):
+        db = DatabaseConnection(os.path.join(ctx.tmp, f"vacia_{ctx.nuevo()}.db"))
+        DatabaseModels(db).inicializar_db()
+        return db
+
+    return [
+        Escenario("import_excel.abrir_excel", MUY_LENTO, lambda i: import_excel.abrir_excel(nomina)[2]),
+        Escenario("import_excel.leer_filas_excel", MUY_LENTO,
+                  lambda i: import_excel.leer_filas_excel(nomina, import_excel.COLUMNAS_ALUMNOS)[1]),
+        Escenario("import_excel.preparar_lote_alumnos", LENTO, lambda i: import_excel.preparar_lote_alumnos(lote)),
+        Escenario("import_excel.importar_alumnos_desde_excel", MUY_LENTO,
+                  lambda db: import_excel.importar_alumnos_desde_excel(nomina, db), base_vacia),
+        Escenario("import_excel.formatear_reporte_sincronizacion", RAPIDO,
+                  lambda i: import_excel.formatear_reporte_sincronizacion(reporte)),
+        Escenario("import_excel.sincronizar_alumnos_desde_excel (simular)", MUY_LENTO,
+                  lambda i: import_excel.sincronizar_alumnos_desde_excel(nomina, ctx.db, simular=True)),
+        # La primera aplica la nómina; las siguientes la encuentran sin cambios
+        Escenario("import_excel.sincronizar_alumnos_desde_excel (aplicar)", 1,
+                  lambda i: import_excel.sincronizar_alumnos_desde_excel(nomina, ctx.db)),
+        Escenario("import_excel.sincronizar_alumnos_desde_excel (sin cambios)", MUY_LENTO,
+                  lambda i: import_excel.sincronizar_alumnos_desde_excel(nomina, ctx.db)),
+    ]
+
+
+def escenarios(ctx: Contexto) -> List[Escenario]:
+    """Todos los escenarios, en el orden en que se ejecutan (import_excel al final: agrega alumnos)"""
+    return (escenarios_libros(ctx) + escenarios_alumnos(ctx) + escenarios_transacciones(ctx)
+            + escenarios_import_excel(ctx))
+
+
+def metodos_publicos() -> List[str]:
+    """Nombres "Clase.metodo" / "import_excel.funcion" que deben tener al menos un escenario"""
+    nombres = [f"{clase.__name__}.{n}" for clase in (LibroModel, AlumnoModel, TransaccionModel)
+               for n, _ in inspect.getmembers(clase, inspect.isfunction) if not n.startswith("_")]
+    nombres += [f"import_excel.{n}" for n, f in inspect.getmembers(import_excel, inspect.isfunction)
+                if not n.startswith("_") and f.__module__ == import_excel.__name__]
+    return nombres
+
+
+def medir(escenario: Escenario, factor: float = 1.0) -> Dict[str, Any]:
+    """Ejecuta el escenario y resume sus tiempos en ms (los ValueError cuentan como rechazos)"""
+    tiempos, rechazos = [], 0
+    for i in range(max(1, round(escenario.repeticiones * factor))):
+        argumento = escenario.preparar(i) if escenario.preparar else i
+        inicio = time.perf_counter()
+        try:
+            resultado = escenario.llamada(argumento)
+            if inspect.isgenerator(resultado):
+                deque(resultado, maxlen=0)  # Los generadores trabajan al recorrerlos
+        except ValueError:
+            rechazos += 1
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return resumir(tiempos, rechazos)
+
+
+def resumir(tiempos: List[float], rechazos: int = 0) -> Dict[str, Any]:
+    """Mediana, p95, mínimo y media de una lista de tiempos en ms"""
+    tiempos = sorted(tiempos)
+    return {
+        "repeticiones": len(tiempos),
+        "rechazos": rechazos,
+        "mediana_ms": round(statistics.median(tiempos), 4),
+        "p95_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 4),
+        "min_ms": round(tiempos[0], 4),
+        "media_ms": round(statistics.fmean(tiempos), 4),
+    }
+
+
+def comparar(actual: Dict[str, Any], anterior: Dict[str, Any], tolerancia: float = TOLERANCIA) -> List[str]:
+    """Escenarios cuya mediana creció más que `tolerancia` (y más que el piso de ruido)"""
+    for clave in ("escala", "semilla", "tamanos"):
+        if actual["meta"].get(clave) != anterior["meta"].get(clave):
+            print(f"⚠️ Las corridas difieren en {clave}: {anterior['meta'].get(clave)} -> {actual['meta'].get(clave)}")
+    regresiones = []
+    for nombre, nuevo in actual["escenarios"].items():
+        viejo = anterior["escenarios"].get(nombre)
+        if viejo is None:
+            continue
+        antes, ahora = viejo["mediana_ms"], nuevo["mediana_ms"]
+        if ahora > antes * (1 + tolerancia) and ahora - antes > PISO_RUIDO_MS:
+            regresiones.append(nombre)
+            print(f"❌ {nombre}: {antes:.3f} -> {ahora:.3f} ms (x{ahora / max(antes, 1e-9):.2f})")
+    return regresiones
+
+
+def ejecutar(escala: str, semilla: int, perfil: Optional[str] = None, solo: Optional[str] = None,
+             factor: float = 1.0) -> Dict[str, Any]:
+    """Genera la base, corre los escenarios y retorna los resultados"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "suite.db")
+        inicio = time.perf_counter()
+        tamanos = generar_db(db_path, semilla=semilla, **ESCALAS[escala])
+        print(f"Base '{escala}' generada en {time.perf_counter() - inicio:.1f} s: "
+              + ", ".join(f"{clave} {valor}" for clave, valor in tamanos.items()))
+
+        db = DatabaseConnection(db_path, perfil=perfil)
+        ctx = Contexto(db, tmp, semilla)
+        todos = escenarios(ctx)
+        sin_escenario = sorted(set(metodos_publicos()) - {e.nombre.split(" ")[0] for e in todos})
+        resultados = {}
+        print(f"{'ESCENARIO':<64} {'REP':>5} {'MEDIANA ms':>11} {'P95 ms':>10}")
+        for escenario in todos:
+            if solo and solo.lower() not in escenario.nombre.lower():
+                continue
+            resultados[escenario.nombre] = r = medir(escenario, factor)
+            rechazos = f"  ({r['rechazos']} rechazados)" if r["rechazos"] else ""
+            print(f"{escenario.nombre:<64} {r['repeticiones']:>5} {r['mediana_ms']:>11.3f} {r['p95_ms']:>10.3f}"
+                  f"{rechazos}")
+        db.cerrar()
+
+        # Arranque (--solo Arranque): cada repetición es un proceso nuevo, sobre la base ya usada
+        if not solo or solo.lower() in "arranque":
+            for etapa, tiempos in medir_arranque(db_path, max(1, round(LENTO * factor)), perfil).items():
+                nombre = f"Arranque.{etapa}"
+                resultados[nombre] = r = resumir(tiempos)
+                print(f"{nombre:<64} {r['repeticiones']:>5} {r['mediana_ms']:>11.3f} {r['p95_ms']:>10.3f}")
+
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "escala": escala,
+            "semilla": semilla,
+            "perfil": perfil,
+            "tamanos": tamanos,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+        },
+        "escenarios": resultados,
+        "sin_escenario": sin_escenario,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", choices=ESCALAS, default="mediana")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--perfil", choices=PERFILES_DB, help="Perfil de SQLite (por defecto, ninguno)")
+    parser.add_argument("--solo", help="Corre solo los escenarios cuyo nombre contiene este texto")
+    parser.add_argument("--factor", type=float, default=1.0, help="Multiplica las repeticiones")
+    parser.add_argument("--salida", help="Archivo JSON (por defecto en benchmarks/resultados/)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.escala, args.semilla, args.perfil, args.solo, args.factor)
+    for nombre in resultado["sin_escenario"]:
+        print(f"❌ {nombre}: sin escenario")
+
+    salida = args.salida
+    if salida is None:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        salida = os.path.join(DIRECTORIO_RESULTADOS, f"{args.escala}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {salida}")
+
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            regresiones = comparar(resultado, json.load(archivo), args.tolerancia)
+        print(f"{len(regresiones)} regresión(es) respecto de {args.comparar}")
+    sys.exit(1 if resultado["sin_escenario"] or regresiones else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+CLI - Operaciones de la biblioteca desde la terminal, sin interfaz gráfica
+Ejecutar desde la raíz del proyecto: python -m cli --help
+"""
@@ -0,0 +1,310 @@
+"""
+Punto de entrada de la CLI: python -m cli [--db RUTA] <comando> ...
+Cada comando importa solo lo que usa (SQLite y los modelos al ejecutarse, openpyxl solo
+al importar Excel; nunca customtkinter), así que la CLI arranca rápido y sirve
+para tareas programadas en el servidor de la biblioteca.
+Códigos de salida: 0 = todo bien, 1 = alguna operación rechazada o con error, 2 = uso incorrecto
+"""
+import argparse
+import os
+import sys
+from utils.config import DATABASE_PATH, DB_PERFIL, PERFILES_DB
+
+
+def conectar(args, crear: bool = False):
+    """Abre la base (y aplica las migraciones pendientes); salvo `crear`, la base debe existir"""
+    if not crear and not os.path.exists(args.db):
+        raise ValueError(f"No existe la base de datos '{args.db}'")
+    from database.conexion import DatabaseConnection
+    from database.modelos import DatabaseModels
+
+    db = DatabaseConnection(args.db, perfil=args.perfil)
+    DatabaseModels(db).inicializar_db()
+    return db
+
+
+def error(mensaje: str):
+    print(mensaje, file=sys.stderr)
+
+
+def mostrar_progreso(procesadas, total):
+    """Progreso de una importación en stderr (solo en una terminal, no en tareas programadas)"""
+    if sys.stderr.isatty():
+        avance = f"{procesadas}/{total} filas" if total else f"{procesadas} filas"
+        print(f"  {avance}", end="\r", file=sys.stderr)
+
+
+def imprimir_filas(encabezado, filas):
+    """Filas separadas por tabulación (fáciles de procesar con otras herramientas)"""
+    print("\t".join(encabezado))
+    for fila in filas:
+        print("\t".join("" if v is None else str(v) for v in fila))
+
+
+# --- Comandos ---
+def cmd_prestar(args, db) -> int:
+    from models.transaccion import TransaccionModel
+
+    transacciones = TransaccionModel(db)
+    if len(args.libros) == 1:
+        titulo, nombre = transacciones.prestar(args.rut, args.libros[0])
+        print(f"Prestado: {titulo} -> {nombre}")
+        return 0
+    # Varios códigos o ISBN (p. ej. leídos con el escáner): una sola transacción
+    nombre, titulos, rechazados = transacciones.prestar_isbns(args.rut, args.libros)
+    for titulo in titulos:
+        print(f"Prestado: {titulo} -> {nombre}")
+    for lectura, motivo in rechazados:
+        error(f"Rechazado: {lectura}: {motivo}")
+    return 1 if rechazados else 0
+
+
+def cmd_devolver(args, db) -> int:
+    from models.transaccion import TransaccionModel
+
+    transacciones = TransaccionModel(db)
+    fallidos = 0
+    for termino in args.libros:
+        try:
+            print(f"Devuelto: {transacciones.devolver(termino, args.rut)}")
+        except ValueError as e:
+            error(f"Rechazado: {termino}: {e}")
+            fallidos += 1
+    return 1 if fallidos else 0
+
+
+def cmd_prestar_curso(args, db) -> int:
+    from models.alumno import AlumnoModel
+    from models.libro import LibroModel
+    from models.transaccion import TransaccionModel
+
+    libro = LibroModel(db).obtener_libro_por_titulo_o_isbn(args.libro)
+    if not libro:
+        raise ValueError("Libro no disponible.")
+    prestados, omitidos = TransaccionModel(db).prestar_lote(libro[0], AlumnoModel(db).obtener_ids_por_curso(args.curso))
+    print(f"Préstamo: {libro[1]} -> {len(prestados)} alumno(s) de {args.curso}")
+    if omitidos:
+        print(f"{len(omitidos)} alumno(s) ya tenían el libro.")
+    return 0
+
+
+def cmd_devolver_curso(args, db) -> int:
+    from models.libro import LibroModel
+    from models.transaccion import TransaccionModel
+
+    libro = LibroModel(db).obtener_libro_por_titulo_o_isbn(args.libro, solo_disponibles=False)
+    if not libro:
+        raise ValueError("Libro no encontrado.")
+    transacciones = TransaccionModel(db)
+    n = transacciones.devolver_lote(transacciones.obtener_prestamos_curso(libro[0], args.curso))
+    print(f"Devueltos: {n} ejemplar(es) de {libro[1]} ({args.curso})")
+    return 0
+
+
+def cmd_buscar(args, db) -> int:
+    if args.tipo == "libros":
+        from models.libro import LibroModel
+
+        filas = LibroModel(db).buscar_libros_fts(args.termino, args.limite)
+        imprimir_filas(("ISBN", "Título", "Autor", "Categoría", "Disponibles", "Total"),
+                       ((f[1], f[2], f[3], f[6], f[8], f[7]) for f in filas[:args.limite]))
+    else:
+        from models.alumno import AlumnoModel
+
+        filas, _ = AlumnoModel(db).buscar_alumnos_pagina(args.termino, tamano=args.limite)
+        imprimir_filas(("RUT", "Nombre", "Curso", "Préstamos activos"), (f[1:5] for f in filas))
+    return 0
+
+
+def cmd_importar(args, db) -> int:
+    if args.tipo == "libros":
+        from utils.import_libros import importar_libros
+
+        nuevos, sumados, invalidos = importar_libros(args.archivo, db, progreso=mostrar_progreso)
+        print(f"Libros nuevos: {nuevos}\nLibros con ejemplares sumados: {sumados}\nFilas inválidas: {invalidos}")
+        return 0
+
+    from utils import import_excel
+
+    if args.sincronizar:
+        reporte = import_excel.sincronizar_alumnos_desde_excel(args.archivo, db, simular=args.simular,
+                                                               eliminar_retirados=args.eliminar_retirados)
+        print(import_excel.formatear_reporte_sincronizacion(reporte))
+        if args.simular:
+            print("Simulación: no se modificó la base de datos.")
+        return 0
+    insertados, ignorados, invalidos = import_excel.importar_alumnos_desde_excel(args.archivo, db,
+                                                                                 progreso=mostrar_progreso)
+    print(f"Alumnos nuevos: {insertados}\nOmitidos (RUT ya registrado): {ignorados}\nFilas inválidas: {invalidos}")
+    return 0
+
+
+def cmd_exportar(args, db) -> int:
+    import csv
+
+    if args.tipo == "historial":
+        from models.alumno import AlumnoModel
+        from models.transaccion import TransaccionModel
+
+        id_prestatario = None
+        if args.alumno:
+            alumno = AlumnoModel(db).obtener_alumno_por_rut(args.alumno)
+            if not alumno:
+                raise ValueError("Alumno no encontrado.")
+            id_prestatario = alumno[0]
+        encabezado = ("ID_Transaccion", "ISBN", "Título", "RUT", "Nombre", "Curso",
+                      "Fecha_Entrega", "Fecha_Devolucion_Real", "Estado")
+        filas = TransaccionModel(db).iterar_historial(id_prestatario)  # en streaming
+    else:
+        from models.atraso import AtrasoModel
+
+        encabezado = ("ID_Transaccion", "Título", "ISBN", "Nombre", "RUT", "Curso",
+                      "Fecha_Entrega", "Fecha_Devolucion_Estimada", "Dias_Atraso")
+        filas = AtrasoModel(db).obtener_atrasados()  # solo lectura, también si la lista es de otro día
+
+    salida = open(args.salida, "w", newline="", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        escritor = csv.writer(salida)
+        escritor.writerow(encabezado)
+        escritor.writerows(filas)
+    finally:
+        if args.salida:
+            salida.close()
+    return 0
+
+
+def cmd_estadisticas(args, db) -> int:
+    from models.estadistica import EstadisticaModel
+
+    resumen = EstadisticaModel(db).obtener_resumen()
+    if args.json:
+        import json
+
+        print(json.dumps(resumen, ensure_ascii=False))
+    else:
+        for clave, valor in resumen.items():
+            print(f"{clave}: {valor}")
+    return 0
+
+
+def cmd_mantenimiento(args, db) -> int:
+    from models.atraso import AtrasoModel
+    from models.estadistica import EstadisticaModel
+
+    codigo = 0
+    if args.integridad:
+        resultado = [fila[0] for fila in db.consultar_todos("PRAGMA integrity_check")]
+        print(f"Integridad: {', '.join(resultado)}")
+        if resultado != ["ok"]:
+            return 1  # No se repara nada sobre una base dañada
+
+    deriva = EstadisticaModel(db).verificar_consistencia(reparar=not args.solo_revisar)
+    for clave, (guardado, real) in deriva.items():
+        print(f"Contador {clave}: guardado {guardado}, real {real}")
+    if deriva:
+        print("Contadores reparados." if not args.solo_revisar else "Contadores con diferencias (sin reparar).")
+        codigo = 1 if args.solo_revisar else 0
+    else:
+        print("Contadores consistentes.")
+
+    if not args.solo_revisar:
+        print(f"Préstamos atrasados: {AtrasoModel(db).actualizar()}")  # Reconstrucción diaria
+    if args.optimizar:
+        db.ejecutar("ANALYZE")
+        db.ejecutar("PRAGMA wal_checkpoint(TRUNCATE)")
+        print("Estadísticas del planificador actualizadas.")
+    if args.vacuum:
+        db.ejecutar("VACUUM")
+        print("Base compactada.")
+    return codigo
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Sistema de Inventario CRA sin interfaz gráfica")
+    parser.add_argument("--db", default=os.environ.get("BIBLIOTECA_DB", DATABASE_PATH),
+                        help="Base de datos (por defecto $BIBLIOTECA_DB o la de la aplicación)")
+    parser.add_argument("--perfil", choices=PERFILES_DB, default=DB_PERFIL, help="Perfil de SQLite")
+    comandos = parser.add_subparsers(dest="comando", required=True, metavar="COMANDO")
+
+    p = comandos.add_parser("prestar", help="Presta uno o más libros a un alumno")
+    p.add_argument("rut")
+    p.add_argument("libros", nargs="+", metavar="LIBRO",
+                   help="Código de ejemplar, ISBN o (si es uno solo) parte del título")
+    p.set_defaults(funcion=cmd_prestar)
+
+    p = comandos.add_parser("devolver", help="Registra la devolución de uno o más libros")
+    p.add_argument("libros", nargs="+", metavar="LIBRO", help="Código de ejemplar, ISBN o parte del título")
+    p.add_argument("--rut", help="Alumno que devuelve (si el libro tiene varios préstamos activos)")
+    p.set_defaults(funcion=cmd_devolver)
+
+    p = comandos.add_parser("prestar-curso", help="Presta un libro a todos los alumnos de un curso")
+    p.add_argument("curso")
+    p.add_argument("libro", help="ISBN o parte del título")
+    p.set_defaults(funcion=cmd_prestar_curso)
+
+    p = comandos.add_parser("devolver-curso", help="Recibe la devolución de un libro prestado a un curso")
+    p.add_argument("curso")
+    p.add_argument("libro", help="ISBN o parte del título")
+    p.set_defaults(funcion=cmd_devolver_curso)
+
+    p = comandos.add_parser("buscar", help="Busca libros o alumnos")
+    p.add_argument("tipo", choices=("libros", "alumnos"))
+    p.add_argument("termino", nargs="?", default="",
+                   help="Texto a buscar (alumnos sin término: los que tienen préstamos)")
+    p.add_argument("--limite", type=int, default=50)
+    p.set_defaults(funcion=cmd_buscar)
+
+    p = comandos.add_parser("importar", help="Importa alumnos (Excel) o libros (Excel o CSV)")
+    p.add_argument("tipo", choices=("alumnos", "libros"))
+    p.add_argument("archivo")
+    p.add_argument("--sincronizar", action="store_true",
+                   help="Alumnos: actualiza nombres y cursos según la nómina en lugar de solo agregar")
+    p.add_argument("--simular", action="store_true", help="Con --sincronizar: solo muestra el reporte")
+    p.add_argument("--eliminar-retirados", action="store_true",
+                   help="Con --sincronizar: elimina a quienes ya no están en la nómina (sin préstamos activos)")
+    p.set_defaults(funcion=cmd_importar, crear=True)
+
+    p = comandos.add_parser("exportar", help="Exporta el historial de préstamos o los atrasados a CSV")
+    p.add_argument("tipo", choices=("historial", "atrasados"))
+    p.add_argument("--alumno", metavar="RUT", help="Historial: solo los préstamos de este alumno")
+    p.add_argument("--salida", help="Archivo CSV (por defecto, la salida estándar)")
+    p.set_defaults(funcion=cmd_exportar)
+
+    p = comandos.add_parser("estadisticas", help="Muestra los totales del dashboard")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(funcion=cmd_estadisticas)
+
+    p = comandos.add_parser("mantenimiento", help="Revisa y repara contadores y recalcula los atrasados")
+    p.add_argument("--solo-revisar", action="store_true", help="Informa diferencias sin modificar la base")
+    p.add_argument("--integridad", action="store_true", help="Ejecuta PRAGMA integrity_check antes")
+    p.add_argument("--optimizar", action="store_true", help="ANALYZE y checkpoint del WAL")
+    p.add_argument("--vacuum", action="store_true", help="Compacta el archivo (requiere acceso exclusivo)")
+    p.set_defaults(funcion=cmd_mantenimiento)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = crear_parser().parse_args(argv)
+    try:
+        db = conectar(args, crear=getattr(args, "crear", False))
+    except ValueError as e:
+        error(str(e))
+        return 1
+    try:
+        return args.funcion(args, db)
+    except BrokenPipeError:
+        # La salida se cortó antes (p. ej. `| head`): no es un error del comando
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except ValueError as e:
+        error(str(e))
+        return 1
+    except Exception as e:  # Errores de lectura de archivos en importar (formato, columnas faltantes)
+        error(f"Error: {e}")
+        return 1
+    finally:
+        db.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,109 +4,444 @@ Maneja todas las operaciones de conexión y consultas
 """
 import sqlite3
 import os
-from typing import Optional, List, Tuple, Any
+import queue
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Any, Iterator, Callable, Dict
+from database.instrumentacion import Instrumentacion, origen_llamada
+from utils.config import PERFILES_DB
+
+TAMANO_LOTE_ITERAR = 500  # Filas por fetchmany en DatabaseConnection.iterar
+# Orden en que se aplican los PRAGMA de un perfil (busy_timeout primero: el cambio
+# de journal_mode necesita esperar si otra conexión está escribiendo)
+PRAGMAS_PERFIL = ("busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store")
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones persistentes, una por hilo.
+    Cada hilo reutiliza su propia conexión mientras la tenga tomada; al
+    liberarla vuelve a la cola de conexiones inactivas (hasta `tamano`).
+    """
+
+    def __init__(self, fabrica, tamano: int = 5, intervalo_verificacion: float = 30.0):
+        """
+        Args:
+            fabrica: Función sin argumentos que crea una conexión nueva
+            tamano: Máximo de conexiones inactivas que se conservan abiertas
+            intervalo_verificacion: Segundos entre verificaciones de salud de una conexión
+        """
+        self._fabrica = fabrica
+        self.tamano = max(1, tamano)
+        self.intervalo_verificacion = intervalo_verificacion
+        self._inactivas = queue.LifoQueue(maxsize=self.tamano)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._todas = set()
+
+    def obtener(self) -> Optional[sqlite3.Connection]:
+        """
+        Obtiene la conexión del hilo actual (la crea o la toma del pool si no tiene)
+        Returns: Conexión a SQLite o None si hay error
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            if self._requiere_verificacion() and not self._esta_sana(conn):
+                self._descartar(conn)
+                conn = None
+            else:
+                return conn
+
+        while conn is None:
+            try:
+                candidata = self._inactivas.get_nowait()
+            except queue.Empty:
+                conn = self._crear()
+                break
+            if self._esta_sana(candidata):
+                conn = candidata
+            else:
+                self._descartar(candidata)
+
+        if conn is not None:
+            self._local.conn = conn
+            self._local.verificada = time.monotonic()
+        return conn
+
+    def liberar(self):
+        """Devuelve al pool la conexión del hilo actual (o la cierra si el pool está lleno)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._inactivas.put_nowait(conn)
+        except queue.Full:
+            self._descartar(conn)
+
+    def cerrar_todas(self):
+        """Cierra todas las conexiones abiertas por el pool"""
+        with self._lock:
+            conexiones = list(self._todas)
+            self._todas.clear()
+        while True:
+            try:
+                self._inactivas.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conexiones:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def _crear(self) -> Optional[sqlite3.Connection]:
+        """Crea una conexión nueva y la registra en el pool"""
+        conn = self._fabrica()
+        if conn is not None:
+            with self._lock:
+                self._todas.add(conn)
+        return conn
+
+    def _descartar(self, conn: sqlite3.Connection):
+        """Cierra una conexión y la quita del registro"""
+        with self._lock:
+            self._todas.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _requiere_verificacion(self) -> bool:
+        """Indica si ya pasó el intervalo de verificación de la conexión del hilo"""
+        ultima = getattr(self._local, "verificada", 0.0)
+        if time.monotonic() - ultima < self.intervalo_verificacion:
+            return False
+        self._local.verificada = time.monotonic()
+        return True
+
+    @staticmethod
+    def _esta_sana(conn: sqlite3.Connection) -> bool:
+        """Verifica que la conexión siga respondiendo"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
 
 class DatabaseConnection:
     """Maneja las conexiones a la base de datos SQLite"""
-    
-    def __init__(self, db_path: str):
+
+    def __init__(self, db_path: str, persistente: bool = True, tamano_pool: int = 5,
+                 perfil: Optional[str] = None, instrumentacion: Optional[Instrumentacion] = None):
+        """
+        Args:
+            db_path: Ruta al archivo de la base de datos
+            persistente: Si es True, reutiliza una conexión por hilo en lugar de
+                         abrir y cerrar una conexión en cada consulta
+            tamano_pool: Máximo de conexiones inactivas conservadas por el pool
+            perfil: Nombre de un perfil de PERFILES_DB (utils/config.py) cuyos PRAGMA
+                    se aplican a cada conexión; None deja los valores por defecto de SQLite
+            instrumentacion: Recolector que mide cada consulta y apertura de conexión (None = sin medir)
+        Raises: ValueError si el perfil no existe
+        """
+        if perfil is not None and perfil not in PERFILES_DB:
+            raise ValueError(f"Perfil de base de datos desconocido: {perfil!r} "
+                             f"(disponibles: {', '.join(PERFILES_DB)})")
         self.db_path = db_path
+        self.persistente = persistente
+        self.perfil = perfil
+        self.instrumentacion = instrumentacion
+        self._pool = ConnectionPool(self.conectar, tamano_pool) if persistente else None
+        self._tx = threading.local()
         self._ensure_db_exists()
-    
+
     def _ensure_db_exists(self):
         """Asegura que el archivo de BD exista"""
         if not os.path.exists(self.db_path):
             conn = sqlite3.connect(self.db_path)
             conn.close()
-    
+
     def conectar(self) -> Optional[sqlite3.Connection]:
         """
         Crea una conexión a la base de datos
         Returns: Conexión a SQLite o None si hay error
         """
+        inicio = time.perf_counter()
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite3.connect(self.db_path, check_same_thread=not self.persistente)
             conn.execute("PRAGMA foreign_keys = ON")
+            if self.perfil is not None:
+                self._aplicar_perfil(conn, PERFILES_DB[self.perfil])
+            if self.instrumentacion is not None:
+                self.instrumentacion.registrar_conexion(time.perf_counter() - inicio)
             return conn
         except sqlite3.Error as e:
             print(f"Error al conectar con la base de datos: {e}")
             return None
-    
+
+    @staticmethod
+    def _aplicar_perfil(conn: sqlite3.Connection, perfil: Dict[str, Any]):
+        """
+        Aplica los PRAGMA de un perfil. Si uno falla (p. ej. WAL en un sistema de
+        archivos que no lo admite) se informa y la conexión sigue con el valor anterior.
+        """
+        for pragma in PRAGMAS_PERFIL:
+            if pragma not in perfil:
+                continue
+            try:
+                # fetchall: journal_mode responde con una fila y debe leerse para aplicarse
+                conn.execute(f"PRAGMA {pragma} = {perfil[pragma]}").fetchall()
+            except sqlite3.Error as e:
+                print(f"No se pudo aplicar PRAGMA {pragma} = {perfil[pragma]}: {e}")
+
+    def _medir(self, operacion: str, query: str, inicio: float, filas: int = 0, error: bool = False):
+        """Registra la duración de una llamada desde `inicio` (si hay instrumentación)"""
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar(operacion, query, time.perf_counter() - inicio, filas, error)
+
+    def _obtener_conexion(self) -> Optional[sqlite3.Connection]:
+        """Obtiene una conexión: la de la transacción en curso, la del hilo (modo persistente) o una nueva"""
+        conn_tx = getattr(self._tx, "conn", None)
+        if conn_tx is not None:
+            return conn_tx
+        if self._pool is not None:
+            return self._pool.obtener()
+        return self.conectar()
+
+    def _soltar_conexion(self, conn: sqlite3.Connection):
+        """Cierra la conexión si no es persistente; en modo pool o dentro de una transacción se conserva"""
+        if self._pool is None and conn is not getattr(self._tx, "conn", None):
+            conn.close()
+
+    def en_transaccion(self) -> bool:
+        """Indica si el hilo actual está dentro de `transaccion()`"""
+        return getattr(self._tx, "nivel", 0) > 0
+
+    @contextmanager
+    def transaccion(self, inmediata: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Agrupa varias operaciones en una única transacción (un solo commit).
+        El nivel exterior abre BEGIN IMMEDIATE (reserva la escritura desde el inicio);
+        los niveles anidados usan SAVEPOINT y solo deshacen su propio bloque.
+        Mientras dura, ejecutar/consultar_* del mismo hilo usan esta conexión y no hacen commit.
+        Si el bloque lanza una excepción se hace rollback y la excepción se propaga.
+
+        Uso:
+            with db.transaccion() as conn:
+                conn.execute(...)
+        """
+        nivel = getattr(self._tx, "nivel", 0)
+
+        if nivel == 0:
+            conn = self._obtener_conexion()
+            if conn is None:
+                raise sqlite3.OperationalError("No se pudo conectar con la base de datos")
+            inicio = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE" if inmediata else "BEGIN")
+            self._tx.conn, self._tx.nivel = conn, 1
+            error = True
+            try:
+                yield conn
+                conn.commit()
+                error = False
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._tx.conn, self._tx.nivel = None, 0
+                self._soltar_conexion(conn)
+                # Duración total del bloque, incluidas las consultas hechas con `conn` directamente
+                self._medir("transaccion", "BEGIN ... COMMIT", inicio, error=error)
+        else:
+            conn = self._tx.conn
+            savepoint = f"sp_nivel_{nivel}"
+            conn.execute(f"SAVEPOINT {savepoint}")
+            self._tx.nivel = nivel + 1
+            try:
+                yield conn
+                conn.execute(f"RELEASE {savepoint}")
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                raise
+            finally:
+                self._tx.nivel = nivel
+
+    def liberar(self):
+        """Devuelve al pool la conexión del hilo actual (usar al terminar un hilo de trabajo)"""
+        if self._pool is not None:
+            self._pool.liberar()
+
+    def cerrar(self):
+        """Cierra todas las conexiones persistentes"""
+        if self._pool is not None:
+            self._pool.cerrar_todas()
+
     def ejecutar(self, query: str, params: Tuple = ()) -> bool:
         """
         Ejecuta una consulta que modifica datos (INSERT, UPDATE, DELETE)
         Returns: True si se ejecutó exitosamente, False en caso contrario
         """
-        conn = self.conectar()
+        conn = self._obtener_conexion()
         if conn is None:
             return False
+        inicio = time.perf_counter()
         try:
-            conn.execute(query, params)
-            conn.commit()
+            filas = conn.execute(query, params).rowcount
+            if not self.en_transaccion():
+                conn.commit()
+            self._medir("ejecutar", query, inicio, max(filas, 0))
             return True
         except sqlite3.Error as e:
             print(f"Error al ejecutar query: {e}")
+            if not self.en_transaccion():
+                conn.rollback()
+            self._medir("ejecutar", query, inicio, error=True)
             return False
         finally:
-            conn.close()
-    
+            self._soltar_conexion(conn)
+
     def ejecutar_muchos(self, query: str, params_list: List[Tuple]) -> bool:
         """
         Ejecuta múltiples consultas de una sola vez
         Returns: True si se ejecutaron exitosamente
         """
-        conn = self.conectar()
+        conn = self._obtener_conexion()
         if conn is None:
             return False
+        inicio = time.perf_counter()
         try:
-            conn.executemany(query, params_list)
-            conn.commit()
+            filas = conn.executemany(query, params_list).rowcount
+            if not self.en_transaccion():
+                conn.commit()
+            self._medir("ejecutar_muchos", query, inicio, max(filas, 0))
             return True
         except sqlite3.Error as e:
             print(f"Error al ejecutar queries múltiples: {e}")
+            if not self.en_transaccion():
+                conn.rollback()
+            self._medir("ejecutar_muchos", query, inicio, error=True)
             return False
         finally:
-            conn.close()
-    
+            self._soltar_conexion(conn)
+
     def consultar_uno(self, query: str, params: Tuple = ()) -> Optional[Tuple]:
         """
         Ejecuta una consulta y retorna una fila
         Returns: Una tupla con los datos o None
         """
-        conn = self.conectar()
+        conn = self._obtener_conexion()
         if conn is None:
             return None
+        inicio = time.perf_counter()
         try:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            return cursor.fetchone()
+            fila = cursor.fetchone()
+            self._medir("consultar_uno", query, inicio, fila is not None)
+            return fila
         except sqlite3.Error as e:
             print(f"Error en consulta: {e}")
+            self._medir("consultar_uno", query, inicio, error=True)
             return None
         finally:
-            conn.close()
-    
+            self._soltar_conexion(conn)
+
     def consultar_todos(self, query: str, params: Tuple = ()) -> List[Tuple]:
         """
         Ejecuta una consulta y retorna todas las filas
         Returns: Lista de tuplas con los datos
         """
-        conn = self.conectar()
+        conn = self._obtener_conexion()
         if conn is None:
             return []
+        inicio = time.perf_counter()
         try:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            return cursor.fetchall()
+            filas = cursor.fetchall()
+            self._medir("consultar_todos", query, inicio, len(filas))
+            return filas
         except sqlite3.Error as e:
             print(f"Error en consulta: {e}")
+            self._medir("consultar_todos", query, inicio, error=True)
             return []
         finally:
-            conn.close()
-    
+            self._soltar_conexion(conn)
+
+    def iterar(self, query: str, params: Tuple = (), tamano_lote: int = TAMANO_LOTE_ITERAR,
+               registro: Optional[str] = None) -> Iterator[Any]:
+        """
+        Recorre el resultado de una consulta sin cargarlo completo en memoria.
+        Las filas se leen con fetchmany de a `tamano_lote`; la conexión queda tomada
+        mientras dure el recorrido y el cursor se cierra al agotarlo, al salir del
+        for con break o al descartar el generador (close()).
+        La consulta se ejecuta en el primer next(), en el hilo que recorre: consumir
+        el generador en el mismo hilo y antes de liberar() la conexión.
+
+        Args:
+            registro: None para tuplas, "nombrada" para namedtuples con los nombres
+                      de las columnas o "slots" para objetos livianos con __slots__
+        Returns: Iterador de filas
+        """
+        conn = self._obtener_conexion()
+        if conn is None:
+            return
+        cursor = None
+        # Solo se mide el tiempo en SQLite (execute + fetchmany), no el de quien consume las filas
+        origen = origen_llamada() if self.instrumentacion is not None else None
+        segundos, total, error = 0.0, 0, False
+        try:
+            inicio = time.perf_counter()
+            cursor = conn.execute(query, params)
+            fabrica = self._fabrica_registros(cursor.description, registro)
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                segundos += time.perf_counter() - inicio
+                if not filas:
+                    break
+                total += len(filas)
+                if fabrica is None:
+                    yield from filas
+                else:
+                    yield from map(fabrica, filas)
+                inicio = time.perf_counter()
+        except sqlite3.Error as e:
+            print(f"Error en consulta: {e}")
+            error = True
+        finally:
+            if cursor is not None:
+                cursor.close()
+            self._soltar_conexion(conn)
+            if origen is not None:
+                self.instrumentacion.registrar("iterar", query, segundos, total, error, origen=origen)
+
+    @staticmethod
+    def _fabrica_registros(descripcion, registro: Optional[str]) -> Optional[Callable[[Tuple], Any]]:
+        """Función que convierte una fila en el tipo de registro pedido (None = tupla tal cual)"""
+        if registro is None or descripcion is None:
+            return None
+        # namedtuple valida los nombres y reemplaza los que no son identificadores (p. ej. COUNT(*))
+        Registro = namedtuple("Registro", [col[0] for col in descripcion], rename=True)
+        if registro == "nombrada":
+            return Registro._make
+        if registro == "slots":
+            return _clase_con_slots(Registro._fields)
+        raise ValueError(f"Tipo de registro desconocido: {registro!r}")
+
     def get_last_row_id(self) -> Optional[int]:
-        """Obtiene el ID de la última fila insertada"""
-        conn = self.conectar()
+        """
+        Obtiene el ID de la última fila insertada
+        (solo es significativo en modo persistente, donde la conexión se reutiliza)
+        """
+        conn = self._obtener_conexion()
         if conn is None:
             return None
         try:
@@ -115,4 +450,16 @@ class DatabaseConnection:
             result = cursor.fetchone()
             return result[0] if result else None
         finally:
-            conn.close()
+            self._soltar_conexion(conn)
+
+
+def _clase_con_slots(campos: Tuple[str, ...]) -> Callable[[Tuple], Any]:
+    """Crea una clase con __slots__ para los campos dados y retorna su constructor desde una fila"""
+    def __init__(self, fila):
+        for campo, valor in zip(campos, fila):
+            setattr(self, campo, valor)
+
+    def __repr__(self):
+        return "Registro(" + ", ".join(f"{c}={getattr(self, c)!r}" for c in campos) + ")"
+
+    return type("Registro", (), {"__slots__": campos, "__init__": __init__, "__repr__": __repr__})
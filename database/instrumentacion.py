@@ -0,0 +1,214 @@
+"""
+Módulo de instrumentación de consultas
+Mide cada consulta de DatabaseConnection, la asocia al método que la hizo
+(p. ej. LibroModel.buscar_libros) y acumula histogramas de latencia por origen
+"""
+import contextlib
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import logging  # Solo para la anotación; en ejecución se importa al crear el log
+
+# Límite superior (ms) de cada tramo del histograma; el tramo final cuenta lo que supera el último
+LIMITES_HISTOGRAMA_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Archivos cuyos marcos se saltan al buscar el origen de una consulta
+_ARCHIVOS_INTERNOS = {
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "conexion.py"),
+    os.path.abspath(__file__),
+    contextlib.__file__,
+}
+
+
+def origen_llamada() -> str:
+    """
+    Nombre calificado de la primera función fuera de la capa de conexión en la pila
+    (el método del modelo, o la función de la interfaz que consulta directamente)
+    """
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in _ARCHIVOS_INTERNOS:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    codigo = frame.f_code
+    return getattr(codigo, "co_qualname", codigo.co_name)
+
+
+def _compactar(consulta: str) -> str:
+    """Consulta en una sola línea (para el log y el volcado)"""
+    return " ".join(consulta.split())
+
+
+class Medicion:
+    """Acumulado de las llamadas de un origen: conteos, tiempos e histograma"""
+
+    __slots__ = ("llamadas", "errores", "total_ms", "max_ms", "filas", "tramos", "consulta_mas_lenta")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.filas = 0
+        self.tramos = [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)
+        self.consulta_mas_lenta = ""
+
+    def agregar(self, ms: float, filas: int, consulta: str, error: bool):
+        """Suma una llamada al acumulado"""
+        self.llamadas += 1
+        self.errores += error
+        self.total_ms += ms
+        self.filas += filas
+        if ms >= self.max_ms:
+            self.max_ms = ms
+            self.consulta_mas_lenta = consulta
+        tramo = 0
+        while tramo < len(LIMITES_HISTOGRAMA_MS) and ms > LIMITES_HISTOGRAMA_MS[tramo]:
+            tramo += 1
+        self.tramos[tramo] += 1
+
+    def percentil(self, p: float) -> float:
+        """Percentil aproximado (límite superior del tramo donde cae; el máximo en el último tramo)"""
+        if not self.llamadas:
+            return 0.0
+        objetivo, acumulado = p * self.llamadas, 0
+        for limite, cantidad in zip(LIMITES_HISTOGRAMA_MS, self.tramos):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(limite, self.max_ms)
+        return self.max_ms
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Representación para el volcado JSON"""
+        llamadas = max(self.llamadas, 1)
+        return {
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "total_ms": round(self.total_ms, 3),
+            "promedio_ms": round(self.total_ms / llamadas, 3),
+            "p50_ms": round(self.percentil(0.5), 3),
+            "p95_ms": round(self.percentil(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "filas": self.filas,
+            "histograma_ms": {**{f"<={limite}": n for limite, n in zip(LIMITES_HISTOGRAMA_MS, self.tramos)},
+                              f">{LIMITES_HISTOGRAMA_MS[-1]}": self.tramos[-1]},
+            "consulta_mas_lenta": _compactar(self.consulta_mas_lenta),
+        }
+
+
+class Instrumentacion:
+    """
+    Recolector de mediciones compartido por todas las conexiones de un DatabaseConnection.
+    Agrupa por (origen, operación); las consultas que superan `umbral_lento_ms` se
+    escriben en un log rotativo (sin parámetros, que pueden contener RUTs).
+    """
+
+    def __init__(self, umbral_lento_ms: float = 100.0, ruta_log: Optional[str] = None,
+                 max_bytes_log: int = 1024 * 1024, respaldos_log: int = 3):
+        """
+        Args:
+            umbral_lento_ms: Duración desde la que una consulta se considera lenta
+            ruta_log: Archivo del log de consultas lentas (None = no se escribe)
+            max_bytes_log: Tamaño en que el log rota
+            respaldos_log: Archivos rotados que se conservan
+        """
+        self.umbral_lento_ms = umbral_lento_ms
+        self._lock = threading.Lock()
+        self._mediciones: Dict[Tuple[str, str], Medicion] = {}
+        self.conexiones = Medicion()
+        self.lentas = 0
+        self.desde = datetime.now()
+        self._log = self._crear_log(ruta_log, max_bytes_log, respaldos_log) if ruta_log else None
+
+    @staticmethod
+    def _crear_log(ruta: str, max_bytes: int, respaldos: int) -> Optional["logging.Logger"]:
+        """Logger propio (no se propaga a la raíz) con rotación por tamaño"""
+        import logging.handlers  # Se importa solo si hay log: logging.handlers trae socket y pickle
+
+        try:
+            manejador = logging.handlers.RotatingFileHandler(ruta, maxBytes=max_bytes, backupCount=respaldos,
+                                                             encoding="utf-8", delay=True)
+        except OSError as e:
+            print(f"No se pudo abrir el log de consultas lentas: {e}")
+            return None
+        manejador.setFormatter(logging.Formatter("%(asctime)s | %(message)s"))
+        log = logging.getLogger(f"biblioteca.consultas_lentas.{os.path.abspath(ruta)}")
+        log.handlers[:] = [manejador]
+        log.setLevel(logging.WARNING)
+        log.propagate = False
+        return log
+
+    def registrar(self, operacion: str, consulta: str, segundos: float, filas: int = 0, error: bool = False,
+                  origen: Optional[str] = None):
+        """
+        Registra una llamada a la base de datos
+        Args:
+            origen: Método que la hizo (None = se busca en la pila actual)
+        """
+        origen = origen or origen_llamada()
+        ms = segundos * 1000
+        with self._lock:
+            medicion = self._mediciones.get((origen, operacion))
+            if medicion is None:
+                medicion = self._mediciones[(origen, operacion)] = Medicion()
+            medicion.agregar(ms, filas, consulta, error)
+            lenta = ms >= self.umbral_lento_ms
+            self.lentas += lenta
+        if lenta and self._log is not None:
+            self._log.warning("%.1f ms | %s | %s | %d filas | %s", ms, origen, operacion, filas,
+                              _compactar(consulta))
+
+    def registrar_conexion(self, segundos: float):
+        """Registra el costo de abrir una conexión (connect + PRAGMA)"""
+        with self._lock:
+            self.conexiones.agregar(segundos * 1000, 0, "", False)
+
+    def resumen(self) -> List[Tuple[str, str, Medicion]]:
+        """(origen, operación, medición) ordenados por tiempo total, de mayor a menor"""
+        with self._lock:
+            filas = [(origen, operacion, m) for (origen, operacion), m in self._mediciones.items()]
+        return sorted(filas, key=lambda fila: fila[2].total_ms, reverse=True)
+
+    def reiniciar(self):
+        """Descarta las mediciones acumuladas"""
+        with self._lock:
+            self._mediciones.clear()
+            self.conexiones = Medicion()
+            self.lentas = 0
+            self.desde = datetime.now()
+
+    def a_dict(self, contexto: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Todas las mediciones como diccionario
+        Args:
+            contexto: Datos extra para comparar volcados (p. ej. tamaño de la BD y cantidad de libros)
+        """
+        return {
+            "generado": datetime.now().isoformat(timespec="seconds"),
+            "desde": self.desde.isoformat(timespec="seconds"),
+            "umbral_lento_ms": self.umbral_lento_ms,
+            "consultas_lentas": self.lentas,
+            "contexto": contexto or {},
+            "conexiones": self.conexiones.a_dict(),
+            "operaciones": [dict(origen=origen, operacion=operacion, **m.a_dict())
+                            for origen, operacion, m in self.resumen()],
+        }
+
+    def volcar_json(self, ruta: str, contexto: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Guarda las mediciones en un archivo JSON
+        Returns: True si se guardó, False en caso contrario
+        """
+        import json
+
+        try:
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump(self.a_dict(contexto), archivo, ensure_ascii=False, indent=2)
+            return True
+        except OSError as e:
+            print(f"Error al guardar las mediciones: {e}")
+            return False
@@ -2,29 +2,551 @@
 Módulo de inicialización de modelos/tablas de base de datos
 Define la estructura de las tablas SQLite
 """
+import sqlite3
 from .conexion import DatabaseConnection
-from typing import Optional
+from utils.validators import limpiar_isbn, limpiar_rut
+from utils.plazos import fecha_devolucion, hoy
+from typing import Optional, List, Tuple, Callable
+
+# Código de barras de un ejemplar: ID del libro (6 dígitos) y número de copia, p. ej. "000042-003"
+CODIGO_EJEMPLAR = "printf('%06d-%03d', {libro}, {numero})"
+# Filas con key = 0..n-1 (un arreglo JSON de n ceros; ninguna si n <= 0, porque
+# printf('%.*c', 0, '0') igual escribe un '0'). Sirve dentro de triggers, donde
+# SQLite no admite WITH RECURSIVE.
+SERIE = ("json_each(CASE WHEN {n} > 0 "
+         "THEN '[' || rtrim(replace(printf('%.*c', {n}, '0'), '0', '0,'), ',') || ']' ELSE '[]' END)")
+# Valor de RUT_Limpio calculado en SQL (lo mismo que AlumnoModel.normalizar_rut)
+RUT_NORMALIZADO = "UPPER(REPLACE(REPLACE(REPLACE({rut}, '.', ''), '-', ''), ' ', ''))"
 
 class DatabaseModels:
     """Maneja la inicialización y creación de tablas en la base de datos"""
     
     def __init__(self, db_connection: DatabaseConnection):
         self.db = db_connection
+        # Migraciones en orden: (versión, descripción, método que la aplica).
+        # La versión aplicada se guarda en PRAGMA user_version.
+        self.migraciones: List[Tuple[int, str, Callable]] = [
+            (1, "Índices de Transacciones, Libros y Prestatarios", self._migracion_1_indices),
+            (2, "Búsqueda de texto completo (FTS5) en Libros", self._migracion_2_fts_libros),
+            (3, "RUT normalizado e indexado en Prestatarios", self._migracion_3_rut_limpio),
+            (4, "Contadores de Estadisticas mantenidos por triggers", self._migracion_4_estadisticas),
+            (5, "Fechas de devolución y lista de préstamos atrasados", self._migracion_5_atrasados),
+            (6, "Índice de Prestatarios por curso", self._migracion_6_cursos),
+            (7, "Ejemplares con código propio y préstamos por ejemplar", self._migracion_7_ejemplares),
+            (8, "Quitar copias sobrantes de Ejemplares", self._migracion_8_ejemplares_sobrantes),
+            (9, "ISBN sin guiones ni espacios en Libros", self._migracion_9_isbn_limpio),
+            (10, "RUT_Limpio único en Prestatarios", self._migracion_10_rut_limpio_unico),
+        ]
     
     def inicializar_db(self) -> bool:
         """
-        Crea todas las tablas necesarias si no existen
+        Crea todas las tablas necesarias si no existen y aplica las migraciones pendientes.
+        Si user_version ya está al día (el caso de cada inicio normal) no hay nada que
+        crear: basta una lectura del PRAGMA.
         Returns: True si se inicializó correctamente
         """
         try:
+            if self.obtener_version() >= self.version_actual:
+                return True
             self._crear_tabla_libros()
             self._crear_tabla_prestatarios()
             self._crear_tabla_transacciones()
-            return True
+            return self.migrar()
         except Exception as e:
             print(f"Error al inicializar BD: {e}")
             return False
     
+    def obtener_version(self) -> int:
+        """Obtiene la versión del esquema (PRAGMA user_version)"""
+        result = self.db.consultar_uno("PRAGMA user_version")
+        return result[0] if result else 0
+    
+    @property
+    def version_actual(self) -> int:
+        """Versión del esquema que espera esta versión del programa"""
+        return self.migraciones[-1][0] if self.migraciones else 0
+    
+    def migrar(self) -> bool:
+        """
+        Aplica en orden las migraciones con versión mayor a la registrada.
+        Cada migración corre en su propia transacción junto con la actualización
+        de user_version, de modo que una falla no deja el esquema a medias.
+        Returns: True si el esquema quedó al día
+        """
+        version = self.obtener_version()
+        for numero, descripcion, aplicar in self.migraciones:
+            if numero <= version:
+                continue
+            try:
+                with self.db.transaccion() as conn:
+                    aplicar(conn)
+                    conn.execute(f"PRAGMA user_version = {int(numero)}")
+            except sqlite3.Error as e:
+                print(f"Error en migración {numero} ({descripcion}): {e}")
+                return False
+        return True
+    
+    def _migracion_1_indices(self, conn: sqlite3.Connection):
+        """
+        Índices para las consultas de préstamos activos, historial y listados.
+        Los índices parciales (WHERE Estado='Prestado') solo contienen los préstamos
+        vigentes, así que no crecen con el historial.
+        """
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transacciones_libro ON Transacciones(ID_Libro)")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transacciones_prestatario_fecha 
+            ON Transacciones(ID_Prestatario, Fecha_Entrega)
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transacciones_fecha ON Transacciones(Fecha_Entrega)")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transacciones_libro_activo 
+            ON Transacciones(ID_Libro) WHERE Estado = 'Prestado'
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transacciones_prestatario_activo 
+            ON Transacciones(ID_Prestatario, ID_Libro) WHERE Estado = 'Prestado'
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_libros_titulo ON Libros(Título)")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_libros_prestados 
+            ON Libros(Título) WHERE Disponibles < Total_Ejemplares
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_prestatarios_nombre ON Prestatarios(Nombre)")
+    
+    def _migracion_2_fts_libros(self, conn: sqlite3.Connection):
+        """
+        Índice de texto completo LibrosFTS sobre Libros (contenido externo).
+        El tokenizador unicode61 con remove_diacritics ignora tildes y mayúsculas
+        ("Año" = "ano"). Los triggers lo mantienen sincronizado; el de UPDATE solo
+        se dispara con columnas indexadas, no con cada cambio de Disponibles.
+        Si SQLite no trae FTS5, se omite y LibroModel usa la búsqueda con LIKE.
+        """
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS LibrosFTS USING fts5(
+                    ISBN, Título, Autor, Editorial, Categoría,
+                    content='Libros', content_rowid='ID_Libro',
+                    tokenize="unicode61 remove_diacritics 2"
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 no disponible, se usará búsqueda con LIKE: {e}")
+            return
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS libros_fts_insert AFTER INSERT ON Libros BEGIN
+                INSERT INTO LibrosFTS(rowid, ISBN, Título, Autor, Editorial, Categoría)
+                VALUES (new.ID_Libro, new.ISBN, new.Título, new.Autor, new.Editorial, new.Categoría);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS libros_fts_delete AFTER DELETE ON Libros BEGIN
+                INSERT INTO LibrosFTS(LibrosFTS, rowid, ISBN, Título, Autor, Editorial, Categoría)
+                VALUES ('delete', old.ID_Libro, old.ISBN, old.Título, old.Autor, old.Editorial, old.Categoría);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS libros_fts_update 
+            AFTER UPDATE OF ISBN, Título, Autor, Editorial, Categoría ON Libros BEGIN
+                INSERT INTO LibrosFTS(LibrosFTS, rowid, ISBN, Título, Autor, Editorial, Categoría)
+                VALUES ('delete', old.ID_Libro, old.ISBN, old.Título, old.Autor, old.Editorial, old.Categoría);
+                INSERT INTO LibrosFTS(rowid, ISBN, Título, Autor, Editorial, Categoría)
+                VALUES (new.ID_Libro, new.ISBN, new.Título, new.Autor, new.Editorial, new.Categoría);
+            END
+        """)
+        # Indexar el catálogo existente
+        conn.execute("INSERT INTO LibrosFTS(LibrosFTS) VALUES ('rebuild')")
+    
+    def _migracion_3_rut_limpio(self, conn: sqlite3.Connection):
+        """
+        Columna RUT_Limpio (RUT sin puntos, guiones ni espacios, en mayúsculas) con índice,
+        para que la búsqueda por RUT no tenga que aplicar REPLACE() a cada fila.
+        AlumnoModel la llena con limpiar_rut; los triggers la completan cuando otro
+        código (p. ej. importar_alumnos.py) inserta o cambia el RUT sin llenarla.
+        """
+        columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(Prestatarios)")]
+        if "RUT_Limpio" not in columnas:
+            conn.execute("ALTER TABLE Prestatarios ADD COLUMN RUT_Limpio TEXT")
+        
+        # Rellenar filas existentes
+        filas = conn.execute("SELECT ID_Prestatario, RUT FROM Prestatarios").fetchall()
+        conn.executemany(
+            "UPDATE Prestatarios SET RUT_Limpio = ? WHERE ID_Prestatario = ?",
+            [(limpiar_rut(rut).upper(), pid) for pid, rut in filas]
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_prestatarios_rut_limpio ON Prestatarios(RUT_Limpio)")
+        
+        expr = RUT_NORMALIZADO.format(rut="new.RUT")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS prestatarios_rut_limpio_insert 
+            AFTER INSERT ON Prestatarios WHEN new.RUT_Limpio IS NULL BEGIN
+                UPDATE Prestatarios SET RUT_Limpio = {expr} WHERE ID_Prestatario = new.ID_Prestatario;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS prestatarios_rut_limpio_update 
+            AFTER UPDATE OF RUT ON Prestatarios 
+            WHEN new.RUT IS NOT old.RUT AND new.RUT_Limpio IS old.RUT_Limpio BEGIN
+                UPDATE Prestatarios SET RUT_Limpio = {expr} WHERE ID_Prestatario = new.ID_Prestatario;
+            END
+        """)
+    
+    def _migracion_4_estadisticas(self, conn: sqlite3.Connection):
+        """
+        Tabla Estadisticas de una sola fila con los contadores del dashboard.
+        Los triggers la mantienen al día en cada INSERT, UPDATE y DELETE de Libros,
+        Prestatarios y Transacciones (incluidos los borrados en cascada), así que
+        leer las estadísticas no recorre ninguna tabla.
+        Nota: INSERT OR REPLACE no dispara los triggers de DELETE (salvo con
+        recursive_triggers); EstadisticaModel.verificar_consistencia detecta esa deriva.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS Estadisticas (
+                ID INTEGER PRIMARY KEY CHECK (ID = 1),
+                Total_Libros INTEGER NOT NULL DEFAULT 0,
+                Total_Ejemplares INTEGER NOT NULL DEFAULT 0,
+                Disponibles INTEGER NOT NULL DEFAULT 0,
+                Total_Alumnos INTEGER NOT NULL DEFAULT 0,
+                Prestamos_Activos INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            INSERT OR REPLACE INTO Estadisticas 
+                (ID, Total_Libros, Total_Ejemplares, Disponibles, Total_Alumnos, Prestamos_Activos)
+            SELECT 1, COUNT(*), COALESCE(SUM(Total_Ejemplares), 0), COALESCE(SUM(Disponibles), 0),
+                   (SELECT COUNT(*) FROM Prestatarios),
+                   (SELECT COUNT(*) FROM Transacciones WHERE Estado = 'Prestado')
+            FROM Libros
+        """)
+        
+        triggers = {
+            "estadisticas_libros_insert": """
+                AFTER INSERT ON Libros BEGIN
+                    UPDATE Estadisticas SET Total_Libros = Total_Libros + 1,
+                        Total_Ejemplares = Total_Ejemplares + new.Total_Ejemplares,
+                        Disponibles = Disponibles + new.Disponibles
+                    WHERE ID = 1;
+                END""",
+            "estadisticas_libros_delete": """
+                AFTER DELETE ON Libros BEGIN
+                    UPDATE Estadisticas SET Total_Libros = Total_Libros - 1,
+                        Total_Ejemplares = Total_Ejemplares - old.Total_Ejemplares,
+                        Disponibles = Disponibles - old.Disponibles
+                    WHERE ID = 1;
+                END""",
+            "estadisticas_libros_update": """
+                AFTER UPDATE OF Total_Ejemplares, Disponibles ON Libros BEGIN
+                    UPDATE Estadisticas SET
+                        Total_Ejemplares = Total_Ejemplares + new.Total_Ejemplares - old.Total_Ejemplares,
+                        Disponibles = Disponibles + new.Disponibles - old.Disponibles
+                    WHERE ID = 1;
+                END""",
+            "estadisticas_prestatarios_insert": """
+                AFTER INSERT ON Prestatarios BEGIN
+                    UPDATE Estadisticas SET Total_Alumnos = Total_Alumnos + 1 WHERE ID = 1;
+                END""",
+            "estadisticas_prestatarios_delete": """
+                AFTER DELETE ON Prestatarios BEGIN
+                    UPDATE Estadisticas SET Total_Alumnos = Total_Alumnos - 1 WHERE ID = 1;
+                END""",
+            "estadisticas_transacciones_insert": """
+                AFTER INSERT ON Transacciones WHEN new.Estado = 'Prestado' BEGIN
+                    UPDATE Estadisticas SET Prestamos_Activos = Prestamos_Activos + 1 WHERE ID = 1;
+                END""",
+            "estadisticas_transacciones_delete": """
+                AFTER DELETE ON Transacciones WHEN old.Estado = 'Prestado' BEGIN
+                    UPDATE Estadisticas SET Prestamos_Activos = Prestamos_Activos - 1 WHERE ID = 1;
+                END""",
+            "estadisticas_transacciones_update": """
+                AFTER UPDATE OF Estado ON Transacciones 
+                WHEN (new.Estado = 'Prestado') <> (old.Estado = 'Prestado') BEGIN
+                    UPDATE Estadisticas 
+                    SET Prestamos_Activos = Prestamos_Activos + (new.Estado = 'Prestado') - (old.Estado = 'Prestado')
+                    WHERE ID = 1;
+                END""",
+        }
+        for nombre, cuerpo in triggers.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+    
+    def _migracion_5_atrasados(self, conn: sqlite3.Connection):
+        """
+        Índice (Estado, Fecha_Devolucion_Estimada) para encontrar los préstamos vencidos
+        con una búsqueda por rango, sin recorrer el historial, y tabla Atrasados con la
+        lista ya calculada (AtrasoModel la reconstruye una vez al día, en Estadisticas
+        quedan la fecha del cálculo y la cantidad). Los triggers sacan de la lista los
+        préstamos que se devuelven o se eliminan y mantienen la cantidad al día.
+        Los préstamos activos sin fecha de devolución reciben la que corresponde a su
+        fecha de entrega.
+        """
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transacciones_estado_vencimiento 
+            ON Transacciones(Estado, Fecha_Devolucion_Estimada)
+        """)
+        
+        sin_fecha = conn.execute("""
+            SELECT t.ID_Transaccion, t.Fecha_Entrega, l.Categoría, p.Curso
+            FROM Transacciones t
+            JOIN Libros l ON l.ID_Libro = t.ID_Libro
+            JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+            WHERE t.Estado = 'Prestado' AND t.Fecha_Devolucion_Estimada IS NULL
+        """).fetchall()
+        fechas = []
+        for tid, entrega, categoria, curso in sin_fecha:
+            try:
+                fechas.append((fecha_devolucion(str(entrega)[:10], categoria, curso), tid))
+            except ValueError:
+                pass  # Fecha de entrega con formato desconocido: queda sin vencimiento
+        conn.executemany("UPDATE Transacciones SET Fecha_Devolucion_Estimada = ? WHERE ID_Transaccion = ?", fechas)
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS Atrasados (
+                ID_Transaccion INTEGER PRIMARY KEY,
+                Fecha_Devolucion_Estimada TEXT NOT NULL
+            )
+        """)
+        columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(Estadisticas)")]
+        if "Fecha_Atrasados" not in columnas:
+            conn.execute("ALTER TABLE Estadisticas ADD COLUMN Fecha_Atrasados TEXT")
+        if "Atrasados" not in columnas:
+            conn.execute("ALTER TABLE Estadisticas ADD COLUMN Atrasados INTEGER NOT NULL DEFAULT 0")
+        
+        triggers = {
+            "atrasados_transacciones_update": """
+                AFTER UPDATE OF Estado ON Transacciones WHEN new.Estado <> 'Prestado' BEGIN
+                    DELETE FROM Atrasados WHERE ID_Transaccion = old.ID_Transaccion;
+                END""",
+            "atrasados_transacciones_delete": """
+                AFTER DELETE ON Transacciones BEGIN
+                    DELETE FROM Atrasados WHERE ID_Transaccion = old.ID_Transaccion;
+                END""",
+            "estadisticas_atrasados_insert": """
+                AFTER INSERT ON Atrasados BEGIN
+                    UPDATE Estadisticas SET Atrasados = Atrasados + 1 WHERE ID = 1;
+                END""",
+            "estadisticas_atrasados_delete": """
+                AFTER DELETE ON Atrasados BEGIN
+                    UPDATE Estadisticas SET Atrasados = Atrasados - 1 WHERE ID = 1;
+                END""",
+        }
+        for nombre, cuerpo in triggers.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+    
+    def _migracion_6_cursos(self, conn: sqlite3.Connection):
+        """
+        Índice (Curso, Nombre) para obtener los alumnos de un curso (préstamos y
+        devoluciones a un curso completo) y la lista de cursos sin leer la tabla.
+        """
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_prestatarios_curso ON Prestatarios(Curso, Nombre)")
+    
+    def _migracion_7_ejemplares(self, conn: sqlite3.Connection):
+        """
+        Tabla Ejemplares con una fila por copia física y su código de barras
+        (ID_Libro con 6 dígitos y número de copia, p. ej. "000042-003"). Cada
+        préstamo queda asociado a su ejemplar (Transacciones.ID_Ejemplar) y el
+        ejemplar apunta al préstamo vigente (Ejemplares.ID_Transaccion), así que una
+        devolución por código es una búsqueda en el índice único de Codigo.
+        El índice parcial idx_ejemplares_disponibles solo contiene las copias en
+        estante: elegir una copia para prestar no recorre las prestadas.
+        
+        Los triggers crean o quitan copias cuando cambia Total_Ejemplares (quienes
+        escriben en Libros no necesitan conocer la tabla), asignan una copia libre a
+        los préstamos que llegan sin ejemplar y liberan la copia al cerrar o borrar
+        el préstamo. Disponibles sigue siendo el contador para listados y dashboard.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS Ejemplares (
+                ID_Ejemplar INTEGER PRIMARY KEY AUTOINCREMENT,
+                ID_Libro INTEGER NOT NULL,
+                Numero INTEGER NOT NULL,
+                Codigo TEXT NOT NULL UNIQUE,
+                ID_Transaccion INTEGER NULL,
+                UNIQUE (ID_Libro, Numero),
+                FOREIGN KEY (ID_Libro) REFERENCES Libros(ID_Libro) ON DELETE CASCADE
+            )
+        """)
+        columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(Transacciones)")]
+        if "ID_Ejemplar" not in columnas:
+            conn.execute("""
+                ALTER TABLE Transacciones ADD COLUMN ID_Ejemplar INTEGER NULL 
+                REFERENCES Ejemplares(ID_Ejemplar) ON DELETE SET NULL
+            """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ejemplares_disponibles 
+            ON Ejemplares(ID_Libro, Numero) WHERE ID_Transaccion IS NULL
+        """)
+        
+        # Expandir los contadores existentes en copias numeradas desde 1
+        conn.execute(f"""
+            INSERT OR IGNORE INTO Ejemplares (ID_Libro, Numero, Codigo)
+            SELECT l.ID_Libro, s.key + 1, {CODIGO_EJEMPLAR.format(libro="l.ID_Libro", numero="s.key + 1")}
+            FROM Libros l, {SERIE.format(n="l.Total_Ejemplares")} s
+            WHERE l.Total_Ejemplares > 0
+        """)
+        # Los préstamos activos existentes toman las primeras copias de su libro
+        activos = conn.execute("""
+            SELECT ID_Transaccion, ID_Libro FROM Transacciones 
+            WHERE Estado = 'Prestado' AND ID_Ejemplar IS NULL
+            ORDER BY ID_Libro, ID_Transaccion
+        """).fetchall()
+        numero, anterior, asignaciones = 0, None, []
+        for tid, lid in activos:
+            numero = numero + 1 if lid == anterior else 1
+            anterior = lid
+            asignaciones.append((tid, lid, numero))
+        conn.executemany("""
+            UPDATE Ejemplares SET ID_Transaccion = ? 
+            WHERE ID_Libro = ? AND Numero = ? AND ID_Transaccion IS NULL
+        """, asignaciones)
+        conn.execute("""
+            UPDATE Transacciones SET ID_Ejemplar = (
+                SELECT e.ID_Ejemplar FROM Ejemplares e WHERE e.ID_Transaccion = Transacciones.ID_Transaccion
+            )
+            WHERE Estado = 'Prestado' AND ID_Ejemplar IS NULL
+        """)
+        
+        siguiente = "(SELECT COALESCE(MAX(Numero), 0) FROM Ejemplares WHERE ID_Libro = new.ID_Libro) + s.key + 1"
+        triggers = {
+            "ejemplares_libros_insert": f"""
+                AFTER INSERT ON Libros WHEN new.Total_Ejemplares > 0 BEGIN
+                    INSERT INTO Ejemplares (ID_Libro, Numero, Codigo)
+                    SELECT new.ID_Libro, s.key + 1, {CODIGO_EJEMPLAR.format(libro="new.ID_Libro", numero="s.key + 1")}
+                    FROM {SERIE.format(n="new.Total_Ejemplares")} s;
+                END""",
+            "ejemplares_libros_agregar": f"""
+                AFTER UPDATE OF Total_Ejemplares ON Libros 
+                WHEN new.Total_Ejemplares > old.Total_Ejemplares BEGIN
+                    INSERT INTO Ejemplares (ID_Libro, Numero, Codigo)
+                    SELECT new.ID_Libro, {siguiente}, {CODIGO_EJEMPLAR.format(libro="new.ID_Libro", numero=siguiente)}
+                    FROM {SERIE.format(n="new.Total_Ejemplares - old.Total_Ejemplares")} s;
+                END""",
+            "ejemplares_libros_quitar": """
+                AFTER UPDATE OF Total_Ejemplares ON Libros 
+                WHEN new.Total_Ejemplares < old.Total_Ejemplares BEGIN
+                    DELETE FROM Ejemplares WHERE ID_Ejemplar IN (
+                        SELECT ID_Ejemplar FROM Ejemplares 
+                        WHERE ID_Libro = new.ID_Libro AND ID_Transaccion IS NULL
+                        ORDER BY Numero DESC LIMIT old.Total_Ejemplares - new.Total_Ejemplares
+                    );
+                END""",
+            "ejemplares_transacciones_insert": """
+                AFTER INSERT ON Transacciones WHEN new.Estado = 'Prestado' BEGIN
+                    UPDATE Transacciones SET ID_Ejemplar = (
+                        SELECT ID_Ejemplar FROM Ejemplares 
+                        WHERE ID_Libro = new.ID_Libro AND ID_Transaccion IS NULL
+                        ORDER BY Numero LIMIT 1
+                    )
+                    WHERE ID_Transaccion = new.ID_Transaccion AND new.ID_Ejemplar IS NULL;
+                    UPDATE Ejemplares SET ID_Transaccion = new.ID_Transaccion 
+                    WHERE ID_Ejemplar = (SELECT ID_Ejemplar FROM Transacciones WHERE ID_Transaccion = new.ID_Transaccion);
+                END""",
+            "ejemplares_transacciones_update": """
+                AFTER UPDATE OF Estado ON Transacciones 
+                WHEN old.Estado = 'Prestado' AND new.Estado <> 'Prestado' BEGIN
+                    UPDATE Ejemplares SET ID_Transaccion = NULL 
+                    WHERE ID_Ejemplar = old.ID_Ejemplar AND ID_Transaccion = old.ID_Transaccion;
+                END""",
+            "ejemplares_transacciones_delete": """
+                AFTER DELETE ON Transacciones WHEN old.Estado = 'Prestado' BEGIN
+                    UPDATE Ejemplares SET ID_Transaccion = NULL 
+                    WHERE ID_Ejemplar = old.ID_Ejemplar AND ID_Transaccion = old.ID_Transaccion;
+                END""",
+        }
+        for nombre, cuerpo in triggers.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+    
+    def _migracion_8_ejemplares_sobrantes(self, conn: sqlite3.Connection):
+        """
+        Quita las copias libres que exceden Total_Ejemplares (la migración 7 creaba una
+        copia fantasma para los libros con 0 ejemplares). Se conservan las copias
+        prestadas y, entre las libres, las de menor número.
+        """
+        conn.execute("""
+            DELETE FROM Ejemplares WHERE ID_Ejemplar IN (
+                SELECT ID_Ejemplar FROM (
+                    SELECT e.ID_Ejemplar, e.ID_Transaccion, l.Total_Ejemplares,
+                           ROW_NUMBER() OVER (PARTITION BY e.ID_Libro 
+                                              ORDER BY e.ID_Transaccion IS NULL, e.Numero) AS Orden
+                    FROM Ejemplares e JOIN Libros l ON l.ID_Libro = e.ID_Libro
+                )
+                WHERE ID_Transaccion IS NULL AND Orden > Total_Ejemplares
+            )
+        """)
+    
+    def _migracion_9_isbn_limpio(self, conn: sqlite3.Connection):
+        """
+        Guarda los ISBN como los deja limpiar_isbn (igual que la importación), para que el
+        upsert por ISBN encuentre los libros creados a mano con guiones. Si el ISBN limpio
+        ya es de otro libro, se deja como está y se informa para unir ambos a mano.
+        """
+        libros = conn.execute("SELECT ID_Libro, ISBN FROM Libros WHERE ISBN IS NOT NULL").fetchall()
+        ocupados = {isbn for _, isbn in libros}
+        cambios = []
+        for id_libro, isbn in libros:
+            limpio = limpiar_isbn(isbn)
+            if limpio == isbn:
+                continue
+            if limpio in ocupados:
+                print(f"ISBN repetido, revisar libro {id_libro}: '{isbn}' (ya existe '{limpio}')")
+                continue
+            ocupados.add(limpio)
+            cambios.append((limpio, id_libro))
+        conn.executemany("UPDATE Libros SET ISBN = ? WHERE ID_Libro = ?", cambios)
+    
+    def _migracion_10_rut_limpio_unico(self, conn: sqlite3.Connection):
+        """
+        Índice único en RUT_Limpio: el mismo RUT escrito con y sin puntos es un solo
+        alumno, así que INSERT OR IGNORE lo omite y obtener_alumno_por_rut no es ambiguo.
+        El índice único sobre el RUT normalizado cubre los INSERT que no llenan RUT_Limpio:
+        INSERT OR IGNORE también ignora el choque en el UPDATE del trigger, que dejaría
+        un alumno repetido con RUT_Limpio NULL.
+        Los duplicados existentes se unen en el alumno más antiguo, que recibe sus préstamos.
+        Si ambos tenían prestado el mismo libro se cierra el préstamo más reciente (como
+        una devolución) y se informa para revisarlo a mano.
+        """
+        rut_normalizado = RUT_NORMALIZADO.format(rut="RUT")
+        conn.execute(f"UPDATE Prestatarios SET RUT_Limpio = {rut_normalizado} WHERE RUT_Limpio IS NULL")
+        duplicados = conn.execute("""
+            SELECT p.ID_Prestatario, (
+                SELECT MIN(o.ID_Prestatario) FROM Prestatarios o WHERE o.RUT_Limpio = p.RUT_Limpio
+            ) AS Conservado
+            FROM Prestatarios p
+            WHERE Conservado < p.ID_Prestatario
+        """).fetchall()
+        if duplicados:
+            print(f"Uniendo {len(duplicados)} alumno(s) con RUT repetido")
+            conservado_de = dict(duplicados)
+            ids = list(conservado_de) + list(set(conservado_de.values()))
+            activos = conn.execute(f"""
+                SELECT ID_Transaccion, ID_Libro, ID_Prestatario FROM Transacciones 
+                WHERE Estado = 'Prestado' AND ID_Prestatario IN ({", ".join("?" * len(ids))})
+                ORDER BY ID_Transaccion
+            """, ids).fetchall()
+            prestados, repetidos = set(), []
+            for tid, lid, pid in activos:
+                clave = (conservado_de.get(pid, pid), lid)
+                if clave in prestados:
+                    print(f"Préstamo repetido, revisar préstamo {tid}: el alumno {clave[0]} ya tiene "
+                          f"prestado el libro {lid} (se registra como devuelto)")
+                    repetidos.append((tid, lid))
+                prestados.add(clave)
+            # Los triggers liberan la copia y sacan el préstamo de Atrasados
+            conn.executemany("""
+                UPDATE Transacciones SET Estado = 'Devuelto', Fecha_Devolucion_Real = ? 
+                WHERE ID_Transaccion = ?
+            """, [(hoy(), tid) for tid, _ in repetidos])
+            conn.executemany("UPDATE Libros SET Disponibles = Disponibles + 1 WHERE ID_Libro = ?",
+                             [(lid,) for _, lid in repetidos])
+            conn.executemany("UPDATE Transacciones SET ID_Prestatario = ? WHERE ID_Prestatario = ?",
+                             [(conservado, pid) for pid, conservado in duplicados])
+            conn.executemany("DELETE FROM Prestatarios WHERE ID_Prestatario = ?",
+                             [(pid,) for pid, _ in duplicados])
+        conn.execute("DROP INDEX IF EXISTS idx_prestatarios_rut_limpio")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_prestatarios_rut_limpio ON Prestatarios(RUT_Limpio)")
+        conn.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_prestatarios_rut_normalizado 
+            ON Prestatarios({rut_normalizado})
+        """)
+    
     def _crear_tabla_libros(self) -> bool:
         """Crea la tabla de Libros"""
         query = """
@@ -79,8 +601,13 @@ class DatabaseModels:
         """
         try:
             self.db.ejecutar("DROP TABLE IF EXISTS Transacciones")
+            self.db.ejecutar("DROP TABLE IF EXISTS Ejemplares")
+            self.db.ejecutar("DROP TABLE IF EXISTS LibrosFTS")
             self.db.ejecutar("DROP TABLE IF EXISTS Libros")
             self.db.ejecutar("DROP TABLE IF EXISTS Prestatarios")
+            self.db.ejecutar("DROP TABLE IF EXISTS Estadisticas")
+            self.db.ejecutar("DROP TABLE IF EXISTS Atrasados")
+            self.db.ejecutar("PRAGMA user_version = 0")
             return True
         except Exception as e:
             print(f"Error al eliminar tablas: {e}")
@@ -1,13 +1,23 @@
-import pandas as pd
-import sqlite3
+import argparse
 import os
+from database.conexion import DatabaseConnection
+from database.modelos import DatabaseModels
+from utils.import_excel import (
+    importar_alumnos_desde_excel, sincronizar_alumnos_desde_excel, formatear_reporte_sincronizacion
+)
 
 # --- CONFIGURACIÓN ---
-RUTA_EXCEL = "alumnos.xlsx" 
+RUTA_EXCEL = "alumnos.xlsx"
 
 # 2. El nombre de tu base de datos
 DATABASE_NAME = "inventario.db"
 
+def mostrar_progreso(procesadas, total):
+    if total:
+        print(f"  {procesadas}/{total} filas ({procesadas * 100 // total}%)", end="\r")
+    else:
+        print(f"  {procesadas} filas", end="\r")
+
 def importar_datos():
     print(f"Iniciando importación desde '{RUTA_EXCEL}'...")
 
@@ -17,55 +27,57 @@ def importar_datos():
         print("Asegúrate de que el archivo esté en la misma carpeta que este script.")
         return
 
-    # 2. Leer el Excel usando Pandas
+    # 2. Importar por lotes (lectura en streaming y una sola transacción)
     try:
-        df = pd.read_excel(RUTA_EXCEL, dtype=str)
-        df = df.fillna("")
-        columnas_necesarias = ['RUT', 'Nombre', 'Curso']
-        if not all(col in df.columns for col in columnas_necesarias):
-            print("Error: El archivo de Excel NO tiene las columnas correctas.")
-            print(f"Asegúrate de que las cabeceras sean: {columnas_necesarias}")
-            return
-            
-        print(f"Se encontraron {len(df)} alumnos en el Excel.")
+        db = DatabaseConnection(DATABASE_NAME)
+        DatabaseModels(db).inicializar_db()
+        insertados, ignorados, invalidos = importar_alumnos_desde_excel(RUTA_EXCEL, db, progreso=mostrar_progreso)
+        db.cerrar()
+
+        print("\n--- ¡Importación Completa! ---")
+        print(f"✅ Alumnos nuevos importados: {insertados}")
+        print(f"🚫 Alumnos omitidos (RUT duplicado): {ignorados}")
+        print(f"⚠️ Filas inválidas (sin RUT o nombre válido): {invalidos}")
 
     except Exception as e:
-        print(f"Error leyendo el archivo de Excel: {e}")
+        print(f"Error importando los alumnos: {e}")
+
+
+def sincronizar_datos(simular, eliminar_retirados):
+    print(f"Sincronizando nómina desde '{RUTA_EXCEL}'{' (simulación)' if simular else ''}...")
+
+    if not os.path.exists(RUTA_EXCEL):
+        print(f"Error: No se encontró el archivo '{RUTA_EXCEL}' en la carpeta.")
         return
 
+    # Compara la nómina con los alumnos registrados y aplica solo las diferencias
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        registros_importados = 0
-        registros_omitidos = 0
-
-        for index, fila in df.iterrows():
-            try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO Prestatarios (RUT, Nombre, Curso) 
-                    VALUES (?, ?, ?)
-                """, (fila['RUT'], fila['Nombre'], fila['Curso']))
-                
-                if cursor.rowcount > 0:
-                    registros_importados += 1
-                else:
-                    registros_omitidos += 1
-                    
-            except sqlite3.Error as e:
-                print(f"Error insertando fila {index}: {e}")
-
-        conn.commit()
-        conn.close()
+        db = DatabaseConnection(DATABASE_NAME)
+        DatabaseModels(db).inicializar_db()
+        reporte = sincronizar_alumnos_desde_excel(RUTA_EXCEL, db, simular=simular,
+                                                  eliminar_retirados=eliminar_retirados)
+        db.cerrar()
 
-        print("\n--- ¡Importación Completa! ---")
-        print(f"✅ Alumnos nuevos importados: {registros_importados}")
-        print(f"🚫 Alumnos omitidos (RUT duplicado): {registros_omitidos}")
+        print("\n--- Sincronización " + ("simulada (sin cambios en la BD)" if simular else "completa") + " ---")
+        print(formatear_reporte_sincronizacion(reporte))
+        if reporte['retirados'] and not eliminar_retirados:
+            print("Los alumnos que ya no están en la nómina no se eliminaron (use --eliminar-retirados).")
 
     except Exception as e:
-        print(f"Error conectando o insertando en la base de datos: {e}")
+        print(f"Error sincronizando los alumnos: {e}")
 
 
 # --- Punto de entrada ---
 if __name__ == "__main__":
-    importar_datos()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Importa o sincroniza alumnos desde alumnos.xlsx")
+    parser.add_argument("--sincronizar", action="store_true",
+                        help="Actualiza nombres y cursos según la nómina en lugar de solo agregar nuevos")
+    parser.add_argument("--simular", action="store_true", help="Con --sincronizar: solo muestra el reporte")
+    parser.add_argument("--eliminar-retirados", action="store_true",
+                        help="Con --sincronizar: elimina a quienes ya no están en la nómina (sin préstamos activos)")
+    args = parser.parse_args()
+
+    if args.sincronizar:
+        sincronizar_datos(args.simular, args.eliminar_retirados)
+    else:
+        importar_datos()
@@ -2,31 +2,51 @@
 Sistema de Inventario CRA - Punto de Entrada
 Aplicación de gestión de biblioteca para escuelas
 """
+import time
+INICIO = time.perf_counter()  # Antes de las importaciones, para que la traza de arranque las incluya
+
 import customtkinter
 from database.conexion import DatabaseConnection
+from database.instrumentacion import Instrumentacion
 from database.modelos import DatabaseModels
 from ui.main_window import MainWindow
+from utils.arranque import TrazaArranque
 from utils.config import (
-    DATABASE_PATH, APPEARANCE_MODE, COLOR_THEME, WINDOW_TITLE
+    DATABASE_PATH, APPEARANCE_MODE, COLOR_THEME, WINDOW_TITLE,
+    DB_PERSISTENTE, DB_TAMANO_POOL, DB_PERFIL, INSTRUMENTAR_CONSULTAS, UMBRAL_CONSULTA_LENTA_MS,
+    LOG_CONSULTAS_LENTAS, LOG_CONSULTAS_LENTAS_BYTES, LOG_CONSULTAS_LENTAS_RESPALDOS
 )
 
 
 def main():
     """Función principal que inicia la aplicación"""
+    traza = TrazaArranque(INICIO)
+    traza.marcar("importaciones")
     
     # Configurar apariencia
     customtkinter.set_appearance_mode(APPEARANCE_MODE)
     customtkinter.set_default_color_theme(COLOR_THEME)
     
     # Inicializar base de datos
-    db_connection = DatabaseConnection(DATABASE_PATH)
+    instrumentacion = None
+    if INSTRUMENTAR_CONSULTAS:
+        instrumentacion = Instrumentacion(UMBRAL_CONSULTA_LENTA_MS, LOG_CONSULTAS_LENTAS,
+                                          LOG_CONSULTAS_LENTAS_BYTES, LOG_CONSULTAS_LENTAS_RESPALDOS)
+    db_connection = DatabaseConnection(DATABASE_PATH, persistente=DB_PERSISTENTE,
+                                       tamano_pool=DB_TAMANO_POOL, perfil=DB_PERFIL,
+                                       instrumentacion=instrumentacion)
     db_models = DatabaseModels(db_connection)
+    traza.marcar("conexion")
     
-    # Crear ventana principal
-    app = MainWindow(db_connection, db_models)
+    # Crear ventana principal (las pestañas y los datos iniciales se cargan después)
+    app = MainWindow(db_connection, db_models, traza)
     
     # Ejecutar
     app.mainloop()
+    
+    # Detener el hilo de consultas y cerrar conexiones persistentes
+    app.ejecutor.detener()
+    db_connection.cerrar()
 
 
 if __name__ == "__main__":
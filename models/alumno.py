@@ -2,6 +2,10 @@
 Módulo de Alumno/Prestatario - Contiene la lógica de negocio para alumnos
 """
 from database.conexion import DatabaseConnection
+from models.estadistica import EstadisticaModel
+from utils.validators import limpiar_rut
+from utils.texto import contiene_like
+from utils.paginacion import TAMANO_PAGINA, Pagina, armar_pagina, condicion_despues
 from typing import List, Tuple, Optional
 
 class AlumnoModel:
@@ -15,87 +19,152 @@ class AlumnoModel:
         Crea un nuevo alumno en la BD
         Returns: True si se creó exitosamente
         """
-        query = "INSERT INTO Prestatarios (RUT, Nombre, Curso) VALUES (?, ?, ?)"
-        return self.db.ejecutar(query, (rut, nombre, curso))
+        query = "INSERT INTO Prestatarios (RUT, RUT_Limpio, Nombre, Curso) VALUES (?, ?, ?, ?)"
+        return self.db.ejecutar(query, (rut, self.normalizar_rut(rut), nombre, curso))
+    
+    @staticmethod
+    def normalizar_rut(rut: str) -> str:
+        """RUT sin puntos, guiones ni espacios y en mayúsculas (valor de la columna RUT_Limpio)"""
+        return limpiar_rut(rut).upper()
     
     def obtener_alumno_por_rut(self, rut: str) -> Optional[Tuple]:
         """Obtiene un alumno por RUT (con búsqueda flexible sin puntos/guiones)"""
-        rut_limpio = rut.replace(".", "").replace("-", "")
-        query = """
-            SELECT ID_Prestatario, Nombre FROM Prestatarios 
-            WHERE REPLACE(REPLACE(RUT, '.', ''), '-', '') = ?
-        """
-        return self.db.consultar_uno(query, (rut_limpio,))
+        query = "SELECT ID_Prestatario, Nombre FROM Prestatarios WHERE RUT_Limpio = ?"
+        return self.db.consultar_uno(query, (self.normalizar_rut(rut),))
     
     def obtener_alumno_por_id(self, id_prestatario: int) -> Optional[Tuple]:
         """Obtiene un alumno por su ID"""
         query = "SELECT ID_Prestatario, RUT, Nombre, Curso FROM Prestatarios WHERE ID_Prestatario = ?"
         return self.db.consultar_uno(query, (id_prestatario,))
     
+    # Columnas de buscar_alumnos: datos del alumno y cantidad de préstamos activos
+    COLUMNAS_BUSQUEDA = """
+        p.ID_Prestatario, p.RUT, p.Nombre, p.Curso,
+        (SELECT COUNT(*) FROM Transacciones t 
+         WHERE t.ID_Prestatario=p.ID_Prestatario AND t.Estado='Prestado') as Activos
+    """
+    
     def buscar_alumnos(self, termino: str = "") -> List[Tuple]:
         """
         Busca alumnos por término. Si está vacío, muestra solo los con préstamos activos
         Returns: Lista de tuplas con datos de alumnos
         """
-        if termino:
-            termino_limpio = termino.replace(".", "").replace("-", "")
-            lk_limpio = f"%{termino_limpio}%"
-            lk_normal = f"%{termino}%"
-            query = """
-                SELECT p.ID_Prestatario, p.RUT, p.Nombre, p.Curso,
-                       (SELECT COUNT(*) FROM Transacciones t 
-                        WHERE t.ID_Prestatario=p.ID_Prestatario AND t.Estado='Prestado') as Activos
-                FROM Prestatarios p
-                WHERE
-                    (REPLACE(REPLACE(p.RUT, '.', ''), '-', '') LIKE ?) OR
-                    (p.Nombre LIKE ?) OR
-                    (p.Curso LIKE ?)
-                ORDER BY p.Nombre
-            """
-            return self.db.consultar_todos(query, (lk_limpio, lk_normal, lk_normal))
-        else:
-            query = """
-                SELECT p.ID_Prestatario, p.RUT, p.Nombre, p.Curso,
-                       (SELECT COUNT(*) FROM Transacciones t 
-                        WHERE t.ID_Prestatario=p.ID_Prestatario AND t.Estado='Prestado') as Activos
-                FROM Prestatarios p
-                WHERE (SELECT COUNT(*) FROM Transacciones t 
-                       WHERE t.ID_Prestatario=p.ID_Prestatario AND t.Estado='Prestado') > 0
-                ORDER BY p.Nombre
-            """
-            return self.db.consultar_todos(query)
+        condicion, params = self._condicion_busqueda(termino)
+        query = f"SELECT {self.COLUMNAS_BUSQUEDA} FROM Prestatarios p WHERE {condicion} ORDER BY p.Nombre"
+        return self.db.consultar_todos(query, params)
+    
+    def buscar_alumnos_pagina(self, termino: str = "", despues: Optional[str] = None,
+                              tamano: int = TAMANO_PAGINA) -> Pagina:
+        """
+        Igual que buscar_alumnos, pero entrega una página ordenada por (Nombre, ID)
+        Args:
+            despues: Cursor retornado por la página anterior (None = primera página)
+        Returns: (filas, cursor de la página siguiente o None)
+        """
+        condicion, params = self._condicion_busqueda(termino)
+        condicion_cursor, params_cursor = condicion_despues("(p.Nombre, p.ID_Prestatario)", despues)
+        query = f"""
+            SELECT {self.COLUMNAS_BUSQUEDA} FROM Prestatarios p
+            WHERE {condicion} AND {condicion_cursor}
+            ORDER BY p.Nombre, p.ID_Prestatario
+            LIMIT ?
+        """
+        filas = self.db.consultar_todos(query, params + tuple(params_cursor) + (tamano + 1,))
+        return armar_pagina(filas, tamano, lambda f: (f[2], f[0]))
+    
+    def _condicion_busqueda(self, termino: str) -> Tuple[str, Tuple]:
+        """Condición WHERE de buscar_alumnos (sobre el alias p de Prestatarios)"""
+        if not termino:
+            return """p.ID_Prestatario IN (SELECT ID_Prestatario FROM Transacciones 
+                                           WHERE Estado='Prestado')""", ()
+        
+        termino_limpio = self.normalizar_rut(termino)
+        if self._parece_rut(termino_limpio):
+            # Prefijo de RUT: rango sobre el índice de RUT_Limpio
+            return "(p.RUT_Limpio >= ? AND p.RUT_Limpio < ?)", (termino_limpio, termino_limpio + "\uffff")
+        
+        lk_limpio = f"%{termino_limpio}%"
+        lk_normal = f"%{termino}%"
+        return "(p.RUT_Limpio LIKE ? OR p.Nombre LIKE ? OR p.Curso LIKE ?)", (lk_limpio, lk_normal, lk_normal)
+    
+    @classmethod
+    def filtrar_alumnos(cls, filas: List[Tuple], termino: str) -> List[Tuple]:
+        """
+        Filtra en memoria filas de buscar_alumnos con el mismo criterio que su
+        búsqueda por término (prefijo de RUT, o RUT/nombre/curso que contienen el término)
+        """
+        termino_limpio = cls.normalizar_rut(termino)
+        if cls._parece_rut(termino_limpio):
+            return [f for f in filas if cls.normalizar_rut(f[1]).startswith(termino_limpio)]
+        return [f for f in filas
+                if contiene_like(cls.normalizar_rut(f[1]), termino_limpio)
+                or contiene_like(f[2], termino) or contiene_like(f[3], termino)]
+    
+    @staticmethod
+    def _parece_rut(termino_limpio: str) -> bool:
+        """Indica si un término ya normalizado es (el comienzo de) un RUT: 7+ dígitos y un posible K final"""
+        cuerpo = termino_limpio[:-1] if termino_limpio.endswith("K") else termino_limpio
+        return len(termino_limpio) >= 7 and cuerpo.isdigit()
     
     def actualizar_alumno(self, id_prestatario: int, rut: str, nombre: str, curso: str = "") -> bool:
         """Actualiza los datos de un alumno"""
-        query = "UPDATE Prestatarios SET RUT=?, Nombre=?, Curso=? WHERE ID_Prestatario=?"
-        return self.db.ejecutar(query, (rut, nombre, curso, id_prestatario))
+        query = "UPDATE Prestatarios SET RUT=?, RUT_Limpio=?, Nombre=?, Curso=? WHERE ID_Prestatario=?"
+        return self.db.ejecutar(query, (rut, self.normalizar_rut(rut), nombre, curso, id_prestatario))
     
     def eliminar_alumno(self, id_prestatario: int) -> bool:
         """Elimina un alumno de la BD"""
         query = "DELETE FROM Prestatarios WHERE ID_Prestatario=?"
         return self.db.ejecutar(query, (id_prestatario,))    
     def obtener_total_alumnos(self) -> int:
-        """Obtiene el total de alumnos registrados"""
-        query = "SELECT COUNT(*) FROM Prestatarios"
-        result = self.db.consultar_uno(query)
-        return result[0] if result else 0    
+        """Obtiene el total de alumnos registrados (desde los contadores de Estadisticas)"""
+        return EstadisticaModel(self.db).obtener_resumen()['total_alumnos']
+    
     def tiene_prestamos_activos(self, id_prestatario: int) -> bool:
         """Verifica si un alumno tiene préstamos activos"""
         query = "SELECT 1 FROM Transacciones WHERE ID_Prestatario=? AND Estado='Prestado'"
         return self.db.consultar_uno(query, (id_prestatario,)) is not None
     
     def obtener_libros_en_poder(self, id_prestatario: int) -> List[Tuple]:
-        """Obtiene los libros que un alumno tiene en préstamo activo"""
+        """
+        Obtiene los libros que un alumno tiene en préstamo activo
+        Returns: Lista de tuplas (ISBN, Título, Autor, Fecha_Entrega, Código del ejemplar o None)
+        """
         query = """
-            SELECT l.ISBN, l.Título, l.Autor, t.Fecha_Entrega 
+            SELECT l.ISBN, l.Título, l.Autor, t.Fecha_Entrega, e.Codigo 
             FROM Transacciones t 
             JOIN Libros l ON t.ID_Libro = l.ID_Libro 
+            LEFT JOIN Ejemplares e ON e.ID_Ejemplar = t.ID_Ejemplar
             WHERE t.ID_Prestatario = ? AND t.Estado = 'Prestado'
             ORDER BY t.Fecha_Entrega
         """
         return self.db.consultar_todos(query, (id_prestatario,))
     
+    def obtener_cursos(self) -> List[str]:
+        """Obtiene los cursos que tienen alumnos, en orden"""
+        query = "SELECT DISTINCT Curso FROM Prestatarios WHERE Curso IS NOT NULL AND Curso <> '' ORDER BY Curso"
+        return [fila[0] for fila in self.db.consultar_todos(query)]
+    
+    def obtener_ids_por_curso(self, curso: str) -> List[int]:
+        """Obtiene los IDs de los alumnos de un curso, ordenados por nombre"""
+        query = "SELECT ID_Prestatario FROM Prestatarios WHERE Curso = ? ORDER BY Nombre"
+        return [fila[0] for fila in self.db.consultar_todos(query, (curso,))]
+    
     def obtener_todos(self) -> List[Tuple]:
         """Obtiene todos los alumnos"""
         query = "SELECT ID_Prestatario, RUT, Nombre, Curso FROM Prestatarios ORDER BY Nombre"
         return self.db.consultar_todos(query)
+    
+    def obtener_pagina(self, despues: Optional[str] = None, tamano: int = TAMANO_PAGINA) -> Pagina:
+        """
+        Obtiene una página de alumnos ordenada por (Nombre, ID)
+        Returns: (filas, cursor de la página siguiente o None)
+        """
+        condicion_cursor, params_cursor = condicion_despues("(Nombre, ID_Prestatario)", despues)
+        query = f"""
+            SELECT ID_Prestatario, RUT, Nombre, Curso FROM Prestatarios
+            WHERE {condicion_cursor}
+            ORDER BY Nombre, ID_Prestatario
+            LIMIT ?
+        """
+        filas = self.db.consultar_todos(query, tuple(params_cursor) + (tamano + 1,))
+        return armar_pagina(filas, tamano, lambda f: (f[2], f[0]))
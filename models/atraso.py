@@ -0,0 +1,109 @@
+"""
+Módulo de Atraso - Fechas de devolución y préstamos atrasados
+"""
+from database.conexion import DatabaseConnection
+from utils.plazos import fecha_devolucion, hoy
+from typing import List, Optional, Tuple
+
+class AtrasoModel:
+    """Calcula vencimientos y mantiene la lista de préstamos atrasados"""
+
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+
+    def calcular_vencimiento(self, id_libro: int, id_prestatario: int, fecha_entrega: str) -> str:
+        """
+        Calcula la fecha de devolución de un préstamo según la categoría del libro
+        y el curso del alumno (ver utils/plazos.py)
+        Returns: Fecha YYYY-MM-DD
+        """
+        query = """
+            SELECT (SELECT Categoría FROM Libros WHERE ID_Libro = ?),
+                   (SELECT Curso FROM Prestatarios WHERE ID_Prestatario = ?)
+        """
+        result = self.db.consultar_uno(query, (id_libro, id_prestatario)) or (None, None)
+        return fecha_devolucion(fecha_entrega, result[0], result[1])
+
+    def obtener_atrasados(self) -> List[Tuple]:
+        """
+        Obtiene la lista de préstamos atrasados, del más atrasado al más reciente.
+        Solo lee: si la lista guardada es de otro día (aún no se corre actualizar_si_hace_falta),
+        los busca directamente en Transacciones con el índice (Estado, Fecha_Devolucion_Estimada)
+        Returns: Lista de tuplas (ID_Transaccion, Título, ISBN, Nombre, RUT, Curso,
+                 Fecha_Entrega, Fecha_Devolucion_Estimada, Días de atraso)
+        """
+        fecha = hoy()
+        if self._fecha_lista() == fecha:
+            query = """
+                SELECT t.ID_Transaccion, l.Título, l.ISBN, p.Nombre, p.RUT, p.Curso,
+                       t.Fecha_Entrega, a.Fecha_Devolucion_Estimada,
+                       CAST(julianday(?) - julianday(a.Fecha_Devolucion_Estimada) AS INTEGER) AS Dias
+                FROM Atrasados a
+                CROSS JOIN Transacciones t ON t.ID_Transaccion = a.ID_Transaccion
+                JOIN Libros l ON l.ID_Libro = t.ID_Libro
+                JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+                ORDER BY a.Fecha_Devolucion_Estimada, a.ID_Transaccion
+            """
+            return self.db.consultar_todos(query, (fecha,))
+        query = """
+            SELECT t.ID_Transaccion, l.Título, l.ISBN, p.Nombre, p.RUT, p.Curso,
+                   t.Fecha_Entrega, t.Fecha_Devolucion_Estimada,
+                   CAST(julianday(?) - julianday(t.Fecha_Devolucion_Estimada) AS INTEGER) AS Dias
+            FROM Transacciones t
+            JOIN Libros l ON l.ID_Libro = t.ID_Libro
+            JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+            WHERE t.Estado = 'Prestado' AND t.Fecha_Devolucion_Estimada < ?
+            ORDER BY t.Fecha_Devolucion_Estimada, t.ID_Transaccion
+        """
+        return self.db.consultar_todos(query, (fecha, fecha))
+
+    def contar_atrasados(self) -> int:
+        """
+        Cantidad de préstamos atrasados (contador de Estadisticas mantenido por triggers).
+        Solo lee: si la lista es de otro día, cuenta los vencidos por el índice de Transacciones
+        """
+        fecha = hoy()
+        result = self.db.consultar_uno("SELECT Fecha_Atrasados, Atrasados FROM Estadisticas WHERE ID = 1")
+        if result and result[0] == fecha:
+            return result[1]
+        result = self.db.consultar_uno("""
+            SELECT COUNT(*) FROM Transacciones
+            WHERE Estado = 'Prestado' AND Fecha_Devolucion_Estimada < ?
+        """, (fecha,))
+        return result[0] if result else 0
+
+    def actualizar_si_hace_falta(self) -> str:
+        """
+        Reconstruye la lista si fue calculada otro día (escritura: se llama al arrancar
+        la aplicación y en `mantenimiento`, no desde las lecturas)
+        Returns: Fecha de hoy (YYYY-MM-DD)
+        """
+        fecha = hoy()
+        if self._fecha_lista() != fecha:
+            self.actualizar(fecha)
+        return fecha
+
+    def _fecha_lista(self) -> Optional[str]:
+        """Día en que se calculó la lista de atrasados guardada"""
+        result = self.db.consultar_uno("SELECT Fecha_Atrasados FROM Estadisticas WHERE ID = 1")
+        return result[0] if result else None
+
+    def actualizar(self, fecha: Optional[str] = None) -> int:
+        """
+        Reconstruye la lista de atrasados: préstamos activos cuya fecha de devolución
+        es anterior a `fecha` (hoy por defecto). Usa el índice (Estado, Fecha_Devolucion_Estimada),
+        así que solo recorre los préstamos vencidos.
+        Returns: Cantidad de préstamos atrasados
+        """
+        fecha = fecha or hoy()
+        with self.db.transaccion() as conn:
+            conn.execute("DELETE FROM Atrasados")
+            cursor = conn.execute("""
+                INSERT INTO Atrasados (ID_Transaccion, Fecha_Devolucion_Estimada)
+                SELECT ID_Transaccion, Fecha_Devolucion_Estimada FROM Transacciones
+                WHERE Estado = 'Prestado' AND Fecha_Devolucion_Estimada < ?
+            """, (fecha,))
+            # Fija la cantidad además de la fecha por si la fila de Estadisticas fue reconstruida
+            conn.execute("UPDATE Estadisticas SET Fecha_Atrasados = ?, Atrasados = ? WHERE ID = 1",
+                         (fecha, cursor.rowcount))
+        return cursor.rowcount
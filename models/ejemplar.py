@@ -0,0 +1,51 @@
+"""
+Módulo de Ejemplar - Copias físicas de cada libro, identificadas por su código de barras
+"""
+from database.conexion import DatabaseConnection
+from typing import List, Optional, Tuple
+
+class EjemplarModel:
+    """Maneja las consultas sobre ejemplares (las copias se crean y liberan con triggers)"""
+    
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+    
+    def obtener_por_codigo(self, codigo: str) -> Optional[Tuple]:
+        """
+        Busca un ejemplar por su código de barras (índice único)
+        Returns: Tupla (ID_Ejemplar, ID_Libro, Título, ID_Transaccion del préstamo vigente o None)
+        """
+        query = """
+            SELECT e.ID_Ejemplar, e.ID_Libro, l.Título, e.ID_Transaccion
+            FROM Ejemplares e JOIN Libros l ON l.ID_Libro = e.ID_Libro
+            WHERE e.Codigo = ?
+        """
+        return self.db.consultar_uno(query, (codigo.strip(),))
+    
+    def obtener_disponibles(self, id_libro: int, cantidad: int = 1) -> List[int]:
+        """
+        Obtiene hasta `cantidad` ejemplares en estante de un libro (índice parcial de
+        copias no prestadas), por número de copia
+        Returns: Lista de ID_Ejemplar
+        """
+        query = """
+            SELECT ID_Ejemplar FROM Ejemplares 
+            WHERE ID_Libro = ? AND ID_Transaccion IS NULL
+            ORDER BY Numero LIMIT ?
+        """
+        return [fila[0] for fila in self.db.consultar_todos(query, (id_libro, cantidad))]
+    
+    def obtener_ejemplares(self, id_libro: int) -> List[Tuple]:
+        """
+        Obtiene las copias de un libro con el alumno que tiene cada una
+        Returns: Lista de tuplas (Codigo, Nombre del alumno o None, Fecha_Entrega o None)
+        """
+        query = """
+            SELECT e.Codigo, p.Nombre, t.Fecha_Entrega
+            FROM Ejemplares e
+            LEFT JOIN Transacciones t ON t.ID_Transaccion = e.ID_Transaccion
+            LEFT JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+            WHERE e.ID_Libro = ?
+            ORDER BY e.Numero
+        """
+        return self.db.consultar_todos(query, (id_libro,))
@@ -0,0 +1,108 @@
+"""
+Módulo de Estadística - Contiene las consultas agregadas del dashboard
+"""
+from database.conexion import DatabaseConnection
+from models.atraso import AtrasoModel
+from utils.plazos import hoy
+from typing import Dict, Optional, Tuple
+
+class EstadisticaModel:
+    """Maneja las estadísticas generales de la biblioteca"""
+
+    # Contadores guardados en la tabla Estadisticas (en el orden de sus columnas)
+    CONTADORES = ('total_libros', 'total_ejemplares', 'disponibles', 'total_alumnos', 'prestamos_activos')
+
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+
+    def obtener_resumen(self) -> Dict[str, int]:
+        """
+        Obtiene todas las estadísticas del dashboard leyendo la fila de
+        Estadisticas (mantenida por triggers) y la lista de Atrasados, sin
+        recorrer ninguna tabla
+        Returns: Diccionario con total_libros, total_ejemplares, disponibles,
+                 prestados, total_alumnos, prestamos_activos y atrasados
+        """
+        result = self._leer_contadores()
+        if not result:
+            return self.calcular_resumen()
+        resumen = self._armar_resumen(result)
+        resumen['atrasados'] = AtrasoModel(self.db).contar_atrasados()
+        return resumen
+
+    def calcular_resumen(self) -> Dict[str, int]:
+        """
+        Calcula las estadísticas desde cero, recorriendo las tablas
+        Returns: Diccionario con las mismas claves que obtener_resumen
+        """
+        query = """
+            SELECT COUNT(*), SUM(Total_Ejemplares), SUM(Disponibles),
+                   (SELECT COUNT(*) FROM Prestatarios),
+                   (SELECT COUNT(*) FROM Transacciones WHERE Estado = 'Prestado'),
+                   (SELECT COUNT(*) FROM Transacciones
+                    WHERE Estado = 'Prestado' AND Fecha_Devolucion_Estimada < ?)
+            FROM Libros
+        """
+        return self._armar_resumen(self.db.consultar_uno(query, (hoy(),)))
+
+    def verificar_consistencia(self, reparar: bool = True) -> Dict[str, Tuple[int, int]]:
+        """
+        Compara los contadores guardados con los valores reales y, si `reparar`,
+        corrige los que difieren (o crea la fila de Estadisticas si falta)
+        Returns: Diccionario {estadística: (guardado, real)} solo con las que difieren
+        """
+        with self.db.transaccion():
+            fila = self._leer_contadores()
+            guardado = self._armar_resumen(fila)
+            real = self.calcular_resumen()
+            deriva = {clave: (guardado[clave], real[clave])
+                      for clave in self.CONTADORES if guardado[clave] != real[clave]}
+            valores = tuple(real[clave] for clave in self.CONTADORES)
+            if reparar and not fila:
+                self.db.ejecutar("""
+                    INSERT INTO Estadisticas 
+                        (ID, Total_Libros, Total_Ejemplares, Disponibles, Total_Alumnos, Prestamos_Activos)
+                    VALUES (1, ?, ?, ?, ?, ?)
+                """, valores)
+            elif reparar and deriva:
+                # UPDATE y no REPLACE: conserva Atrasados y Fecha_Atrasados (la lista del día)
+                self.db.ejecutar("""
+                    UPDATE Estadisticas 
+                    SET Total_Libros = ?, Total_Ejemplares = ?, Disponibles = ?, Total_Alumnos = ?, 
+                        Prestamos_Activos = ?
+                    WHERE ID = 1
+                """, valores)
+        return deriva
+
+    def _leer_contadores(self) -> Optional[Tuple]:
+        """Lee la fila de Estadisticas (None si no existe)"""
+        query = """
+            SELECT Total_Libros, Total_Ejemplares, Disponibles, Total_Alumnos, Prestamos_Activos
+            FROM Estadisticas WHERE ID = 1
+        """
+        return self.db.consultar_uno(query)
+
+    @staticmethod
+    def _armar_resumen(result: Optional[Tuple]) -> Dict[str, int]:
+        """Convierte una fila (libros, ejemplares, disponibles, alumnos, préstamos[, atrasados]) en diccionario"""
+        resumen = {
+            'total_libros': 0,
+            'total_ejemplares': 0,
+            'disponibles': 0,
+            'prestados': 0,
+            'total_alumnos': 0,
+            'prestamos_activos': 0,
+            'atrasados': 0
+        }
+
+        if result:
+            resumen['total_libros'] = result[0] or 0
+            resumen['total_ejemplares'] = result[1] or 0
+            resumen['disponibles'] = result[2] or 0
+            resumen['prestados'] = resumen['total_ejemplares'] - resumen['disponibles']
+            resumen['total_alumnos'] = result[3] or 0
+            resumen['prestamos_activos'] = result[4] or 0
+            if len(result) > 5:
+                resumen['atrasados'] = result[5] or 0
+
+        return resumen
@@ -2,19 +2,29 @@
 Módulo de Libro - Contiene la lógica de negocio para libros
 """
 from database.conexion import DatabaseConnection
+from models.estadistica import EstadisticaModel
+from utils.texto import contiene_like, tokens_fts
+from utils.paginacion import TAMANO_PAGINA, Pagina, armar_pagina, condicion_despues
+from utils.validators import limpiar_isbn, validar_isbn
 from typing import List, Tuple, Optional, Dict
 from datetime import datetime
 
 class LibroModel:
     """Maneja todas las operaciones relacionadas con Libros"""
     
+    LIMITE_FTS = 200  # Máximo de resultados de buscar_libros_fts
+    # Columnas de los listados y búsquedas (en este orden)
+    COLUMNAS = ("ID_Libro, ISBN, Título, Autor, Editorial, Año_Publicacion, "
+                "Categoría, Total_Ejemplares, Disponibles")
+    
     def __init__(self, db_connection: DatabaseConnection):
         self.db = db_connection
     
     def crear_libro(self, isbn: str, titulo: str, autor: str, editorial: str = "", 
                    anio: int = None, categoria: str = "", ejemplares: int = 1) -> bool:
         """
-        Crea un nuevo libro en la BD
+        Crea un nuevo libro en la BD (el ISBN se guarda sin guiones ni espacios, igual
+        que en la importación, para que ambos coincidan)
         Returns: True si se creó exitosamente
         """
         query = """
@@ -23,24 +33,43 @@ class LibroModel:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         fecha = datetime.now().strftime("%Y-%m-%d")
-        return self.db.ejecutar(query, (isbn, titulo, autor, editorial, anio, 
+        return self.db.ejecutar(query, (limpiar_isbn(isbn), titulo, autor, editorial, anio, 
                                        categoria, ejemplares, ejemplares, fecha))
     
     def obtener_libro_por_isbn(self, isbn: str) -> Optional[Tuple]:
-        """Obtiene un libro por su ISBN"""
+        """Obtiene un libro por su ISBN (con o sin guiones)"""
         query = "SELECT * FROM Libros WHERE ISBN = ?"
-        return self.db.consultar_uno(query, (isbn,))
+        return self.db.consultar_uno(query, (limpiar_isbn(isbn),))
     
     def obtener_libro_por_id(self, id_libro: int) -> Optional[Tuple]:
         """Obtiene un libro por su ID"""
         query = "SELECT * FROM Libros WHERE ID_Libro = ?"
         return self.db.consultar_uno(query, (id_libro,))
     
-    def obtener_libro_por_titulo_o_isbn(self, termino: str) -> Optional[Tuple]:
-        """Busca un libro por título o ISBN exacto/similar"""
-        query = """
+    def obtener_libro_por_isbn_exacto(self, isbn: str, solo_disponibles: bool = True) -> Optional[Tuple]:
+        """
+        Busca un libro por ISBN exacto (con o sin guiones) usando el índice único,
+        p. ej. para un ISBN leído con el escáner
+        Returns: Tupla (ID_Libro, Título, Disponibles) o None
+        """
+        query = f"""
+            SELECT ID_Libro, Título, Disponibles FROM Libros 
+            WHERE ISBN IN (?, ?){" AND Disponibles > 0" if solo_disponibles else ""}
+            LIMIT 1
+        """
+        return self.db.consultar_uno(query, (isbn.strip(), limpiar_isbn(isbn)))
+    
+    def obtener_libro_por_titulo_o_isbn(self, termino: str, solo_disponibles: bool = True) -> Optional[Tuple]:
+        """
+        Busca un libro (por defecto, con ejemplares disponibles) por título o ISBN
+        exacto/similar. Un ISBN válido se busca solo por igualdad (índice), sin
+        recorrer los títulos.
+        """
+        if validar_isbn(termino):
+            return self.obtener_libro_por_isbn_exacto(termino, solo_disponibles)
+        query = f"""
             SELECT ID_Libro, Título, Disponibles FROM Libros 
-            WHERE (ISBN = ? OR Título LIKE ?) AND Disponibles > 0
+            WHERE (ISBN = ? OR Título LIKE ?){" AND Disponibles > 0" if solo_disponibles else ""}
             LIMIT 1
         """
         lk = f"%{termino}%"
@@ -51,35 +80,146 @@ class LibroModel:
         Busca libros por término. Si está vacío, muestra solo los con préstamos activos
         Returns: Lista de tuplas con datos de libros
         """
+        condicion, params = self._condicion_busqueda(termino)
+        query = f"SELECT {self.COLUMNAS} FROM Libros WHERE {condicion} ORDER BY Título"
+        return self.db.consultar_todos(query, params)
+    
+    def buscar_libros_pagina(self, termino: str = "", despues: Optional[str] = None,
+                             tamano: int = TAMANO_PAGINA) -> Pagina:
+        """
+        Igual que buscar_libros, pero entrega una página ordenada por (Título, ID)
+        Args:
+            despues: Cursor retornado por la página anterior (None = primera página)
+        Returns: (filas, cursor de la página siguiente o None)
+        """
+        condicion, params = self._condicion_busqueda(termino)
+        return self._pagina_por_titulo(condicion, params, despues, tamano)
+    
+    def _condicion_busqueda(self, termino: str) -> Tuple[str, Tuple]:
+        """Condición WHERE de buscar_libros: coincidencia por término o libros prestados"""
         if termino:
-            query = """
-                SELECT ID_Libro, ISBN, Título, Autor, Editorial, Año_Publicacion, 
-                       Categoría, Total_Ejemplares, Disponibles
-                FROM Libros 
-                WHERE Título LIKE ? OR Autor LIKE ? OR ISBN LIKE ?
-                ORDER BY Título
-            """
             lk = f"%{termino}%"
-            return self.db.consultar_todos(query, (lk, lk, lk))
-        else:
-            query = """
-                SELECT ID_Libro, ISBN, Título, Autor, Editorial, Año_Publicacion, 
-                       Categoría, Total_Ejemplares, Disponibles
-                FROM Libros
-                WHERE Disponibles < Total_Ejemplares
-                ORDER BY Título
-            """
-            return self.db.consultar_todos(query)
+            return "(Título LIKE ? OR Autor LIKE ? OR ISBN LIKE ?)", (lk, lk, lk)
+        return "Disponibles < Total_Ejemplares", ()
+    
+    def _pagina_por_titulo(self, condicion: str, params: Tuple, despues: Optional[str],
+                           tamano: int) -> Pagina:
+        """Página de libros que cumplen `condicion`, ordenada por (Título, ID_Libro)"""
+        condicion_cursor, params_cursor = condicion_despues("(Título, ID_Libro)", despues)
+        query = f"""
+            SELECT {self.COLUMNAS} FROM Libros
+            WHERE {condicion} AND {condicion_cursor}
+            ORDER BY Título, ID_Libro
+            LIMIT ?
+        """
+        filas = self.db.consultar_todos(query, params + tuple(params_cursor) + (tamano + 1,))
+        return armar_pagina(filas, tamano, lambda f: (f[2], f[0]))
+    
+    def buscar_libros_fts(self, termino: str, limite: int = LIMITE_FTS) -> List[Tuple]:
+        """
+        Busca libros con el índice de texto completo (título, autor, editorial,
+        categoría e ISBN). Cada palabra se busca como prefijo, sin distinguir
+        tildes ni mayúsculas, y los resultados se ordenan por relevancia (BM25).
+        Si FTS5 no está disponible, usa buscar_libros.
+        Returns: Lista de tuplas con datos de libros (mismas columnas que buscar_libros)
+        """
+        consulta_fts = self._consulta_fts(termino)
+        if consulta_fts is None:
+            return self.buscar_libros(termino)
+        
+        query = """
+            SELECT l.ID_Libro, l.ISBN, l.Título, l.Autor, l.Editorial, l.Año_Publicacion, 
+                   l.Categoría, l.Total_Ejemplares, l.Disponibles
+            FROM LibrosFTS
+            JOIN Libros l ON l.ID_Libro = LibrosFTS.rowid
+            WHERE LibrosFTS MATCH ?
+            ORDER BY bm25(LibrosFTS, 2.0, 10.0, 5.0, 1.0, 1.0)
+            LIMIT ?
+        """
+        return self.db.consultar_todos(query, (consulta_fts, limite))
+    
+    def buscar_libros_fts_pagina(self, termino: str, despues: Optional[str] = None,
+                                 tamano: int = TAMANO_PAGINA) -> Pagina:
+        """
+        Igual que buscar_libros_fts, pero sin límite fijo: entrega una página ordenada
+        por (relevancia, ID). Si FTS5 no está disponible, usa buscar_libros_pagina.
+        Returns: (filas, cursor de la página siguiente o None)
+        """
+        consulta_fts = self._consulta_fts(termino)
+        if consulta_fts is None:
+            return self.buscar_libros_pagina(termino, despues, tamano)
+        
+        condicion_cursor, params_cursor = condicion_despues("(Relevancia, ID_Libro)", despues)
+        query = f"""
+            SELECT * FROM (
+                SELECT l.ID_Libro, l.ISBN, l.Título, l.Autor, l.Editorial, l.Año_Publicacion, 
+                       l.Categoría, l.Total_Ejemplares, l.Disponibles,
+                       bm25(LibrosFTS, 2.0, 10.0, 5.0, 1.0, 1.0) AS Relevancia
+                FROM LibrosFTS
+                JOIN Libros l ON l.ID_Libro = LibrosFTS.rowid
+                WHERE LibrosFTS MATCH ?
+            )
+            WHERE {condicion_cursor}
+            ORDER BY Relevancia, ID_Libro
+            LIMIT ?
+        """
+        filas = self.db.consultar_todos(query, (consulta_fts,) + tuple(params_cursor) + (tamano + 1,))
+        filas, siguiente = armar_pagina(filas, tamano, lambda f: (f[9], f[0]))
+        return [f[:9] for f in filas], siguiente
+    
+    def _consulta_fts(self, termino: str) -> Optional[str]:
+        """
+        Expresión MATCH con cada palabra del término como prefijo
+        Returns: None si el término no tiene palabras o FTS5 no está disponible
+        """
+        palabras = [p.replace('"', '') for p in termino.split()]
+        palabras = [p for p in palabras if p]
+        if not palabras or not self.fts_disponible():
+            return None
+        return " ".join(f'"{p}"*' for p in palabras)
+    
+    @staticmethod
+    def filtrar_libros(filas: List[Tuple], termino: str) -> List[Tuple]:
+        """
+        Filtra en memoria filas de buscar_libros con el mismo criterio que su
+        búsqueda por término (título, autor o ISBN contienen el término)
+        """
+        return [f for f in filas
+                if contiene_like(f[2], termino) or contiene_like(f[3], termino) or contiene_like(f[1], termino)]
+    
+    @staticmethod
+    def filtrar_libros_fts(filas: List[Tuple], termino: str) -> List[Tuple]:
+        """
+        Filtra en memoria filas de buscar_libros_fts con el criterio de su consulta
+        MATCH: cada palabra del término es prefijo de alguna palabra del ISBN,
+        título, autor, editorial o categoría (se conserva el orden recibido)
+        """
+        frases = [tokens_fts(p.replace('"', '')) for p in termino.split()]
+        frases = [f for f in frases if f]
+        resultado = []
+        for fila in filas:
+            palabras = set(tokens_fts(" ".join(str(v) for v in (fila[1], fila[2], fila[3], fila[4], fila[6]) if v)))
+            if all(all(t in palabras for t in frase[:-1]) and any(p.startswith(frase[-1]) for p in palabras)
+                   for frase in frases):
+                resultado.append(fila)
+        return resultado
+    
+    def fts_disponible(self) -> bool:
+        """Indica si existe el índice LibrosFTS (se consulta una sola vez)"""
+        if not hasattr(self, "_fts"):
+            query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'LibrosFTS'"
+            self._fts = self.db.consultar_uno(query) is not None
+        return self._fts
     
     def actualizar_libro(self, id_libro: int, isbn: str, titulo: str, autor: str,
                         editorial: str = "", anio: int = None, categoria: str = "") -> bool:
-        """Actualiza los datos de un libro"""
+        """Actualiza los datos de un libro (ISBN normalizado, como en crear_libro)"""
         query = """
             UPDATE Libros 
             SET ISBN=?, Título=?, Autor=?, Editorial=?, Año_Publicacion=?, Categoría=?
             WHERE ID_Libro=?
         """
-        return self.db.ejecutar(query, (isbn, titulo, autor, editorial, anio, categoria, id_libro))
+        return self.db.ejecutar(query, (limpiar_isbn(isbn), titulo, autor, editorial, anio, categoria, id_libro))
     
     def sumar_ejemplares(self, isbn: str, cantidad: int) -> bool:
         """Suma ejemplares a un libro existente"""
@@ -88,7 +228,7 @@ class LibroModel:
             SET Total_Ejemplares=Total_Ejemplares+?, Disponibles=Disponibles+?
             WHERE ISBN=?
         """
-        return self.db.ejecutar(query, (cantidad, cantidad, isbn))
+        return self.db.ejecutar(query, (cantidad, cantidad, limpiar_isbn(isbn)))
     
     def restar_disponibles(self, id_libro: int, cantidad: int = 1) -> bool:
         """Reduce los ejemplares disponibles (préstamo)"""
@@ -112,30 +252,17 @@ class LibroModel:
     
     def obtener_todos(self) -> List[Tuple]:
         """Obtiene todos los libros"""
-        query = """
-            SELECT ID_Libro, ISBN, Título, Autor, Editorial, Año_Publicacion, 
-                   Categoría, Total_Ejemplares, Disponibles
-            FROM Libros
-            ORDER BY Título
-        """
+        query = f"SELECT {self.COLUMNAS} FROM Libros ORDER BY Título"
         return self.db.consultar_todos(query)
     
+    def obtener_pagina(self, despues: Optional[str] = None, tamano: int = TAMANO_PAGINA) -> Pagina:
+        """
+        Obtiene una página del catálogo ordenada por (Título, ID)
+        Returns: (filas, cursor de la página siguiente o None)
+        """
+        return self._pagina_por_titulo("1", (), despues, tamano)
+    
     def obtener_estadisticas(self) -> Dict[str, int]:
-        """Obtiene estadísticas generales de libros"""
-        stats = {
-            'total_libros': 0,
-            'total_ejemplares': 0,
-            'disponibles': 0,
-            'prestados': 0
-        }
-        
-        query = "SELECT COUNT(*), SUM(Total_Ejemplares), SUM(Disponibles) FROM Libros"
-        result = self.db.consultar_uno(query)
-        
-        if result:
-            stats['total_libros'] = result[0] or 0
-            stats['total_ejemplares'] = result[1] or 0
-            stats['disponibles'] = result[2] or 0
-            stats['prestados'] = stats['total_ejemplares'] - stats['disponibles']
-        
-        return stats
+        """Obtiene estadísticas generales de libros (desde los contadores de Estadisticas)"""
+        resumen = EstadisticaModel(self.db).obtener_resumen()
+        return {clave: resumen[clave] for clave in ('total_libros', 'total_ejemplares', 'disponibles', 'prestados')}
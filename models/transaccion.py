@@ -2,7 +2,15 @@
 Módulo de Transacción - Contiene la lógica de negocio para préstamos y devoluciones
 """
 from database.conexion import DatabaseConnection
-from typing import List, Tuple, Optional
+from models.alumno import AlumnoModel
+from models.libro import LibroModel
+from models.estadistica import EstadisticaModel
+from models.atraso import AtrasoModel
+from models.ejemplar import EjemplarModel
+from utils.paginacion import TAMANO_PAGINA, Pagina, armar_pagina, condicion_despues
+from utils.validators import validar_isbn
+from utils.plazos import fecha_devolucion
+from typing import Dict, Iterator, List, Tuple, Optional
 from datetime import datetime
 
 class TransaccionModel:
@@ -13,15 +21,276 @@ class TransaccionModel:
     
     def crear_prestamo(self, id_libro: int, id_prestatario: int) -> bool:
         """
-        Registra un nuevo préstamo
+        Registra un nuevo préstamo con su fecha de devolución según el plazo configurado
         Returns: True si se creó exitosamente
         """
         fecha_entrega = datetime.now().strftime("%Y-%m-%d")
+        vencimiento = AtrasoModel(self.db).calcular_vencimiento(id_libro, id_prestatario, fecha_entrega)
         query = """
-            INSERT INTO Transacciones (ID_Libro, ID_Prestatario, Fecha_Entrega, Estado)
-            VALUES (?, ?, ?, 'Prestado')
+            INSERT INTO Transacciones (ID_Libro, ID_Prestatario, Fecha_Entrega, Fecha_Devolucion_Estimada, Estado)
+            VALUES (?, ?, ?, ?, 'Prestado')
         """
-        return self.db.ejecutar(query, (id_libro, id_prestatario, fecha_entrega))
+        return self.db.ejecutar(query, (id_libro, id_prestatario, fecha_entrega, vencimiento))
+    
+    def prestar(self, rut: str, termino: str) -> Tuple[str, str]:
+        """
+        Realiza un préstamo completo (búsqueda de alumno y ejemplar, validación,
+        descuento de disponibles y registro) en una sola transacción.
+        `termino` es el código de un ejemplar, un ISBN o parte del título.
+        Returns: Tupla (título del libro, nombre del alumno)
+        Raises: ValueError si el préstamo no se puede realizar
+        """
+        with self.db.transaccion() as conn:
+            res_a = AlumnoModel(self.db).obtener_alumno_por_rut(rut)
+            if not res_a:
+                raise ValueError("Alumno no encontrado.")
+            pid, pnom = res_a
+            
+            lid, ltit, eid = self._elegir_ejemplar(termino)
+            
+            if self.existe_prestamo_duplicado(lid, pid):
+                raise ValueError("Préstamo duplicado.")
+            
+            # El filtro Disponibles > 0 evita dejar el contador en negativo
+            cursor = conn.execute(
+                "UPDATE Libros SET Disponibles = Disponibles - 1 WHERE ID_Libro = ? AND Disponibles > 0",
+                (lid,)
+            )
+            if cursor.rowcount == 0:
+                raise ValueError("Libro no disponible.")
+            
+            fecha_entrega = datetime.now().strftime("%Y-%m-%d")
+            vencimiento = AtrasoModel(self.db).calcular_vencimiento(lid, pid, fecha_entrega)
+            conn.execute("""
+                INSERT INTO Transacciones (ID_Libro, ID_Prestatario, ID_Ejemplar, Fecha_Entrega, 
+                                           Fecha_Devolucion_Estimada, Estado)
+                VALUES (?, ?, ?, ?, ?, 'Prestado')
+            """, (lid, pid, eid, fecha_entrega, vencimiento))
+        
+        return ltit, pnom
+    
+    def _elegir_ejemplar(self, termino: str, exacto: bool = False) -> Tuple[int, str, int]:
+        """
+        Resuelve qué copia prestar: el código de un ejemplar identifica la copia; un
+        ISBN o título, la primera copia en estante del libro (con `exacto`, solo ISBN exacto)
+        Returns: Tupla (ID_Libro, Título, ID_Ejemplar)
+        Raises: ValueError si no hay una copia disponible
+        """
+        ejemplares = EjemplarModel(self.db)
+        ejemplar = ejemplares.obtener_por_codigo(termino)
+        if ejemplar:
+            eid, lid, ltit, prestamo = ejemplar
+            if prestamo is not None:
+                raise ValueError("Ejemplar ya prestado.")
+            return lid, ltit, eid
+        
+        libros = LibroModel(self.db)
+        res_l = (libros.obtener_libro_por_isbn_exacto(termino) if exacto
+                 else libros.obtener_libro_por_titulo_o_isbn(termino))
+        disponibles = ejemplares.obtener_disponibles(res_l[0]) if res_l else []
+        if not disponibles:
+            raise ValueError("Libro no disponible.")
+        return res_l[0], res_l[1], disponibles[0]
+    
+    def prestar_isbns(self, rut: str, isbns: List[str]) -> Tuple[str, List[str], List[Tuple[str, str]]]:
+        """
+        Presta varios libros (p. ej. leídos con el escáner) a un mismo alumno en una
+        sola transacción. Cada lectura (código de ejemplar o ISBN) se busca por igualdad
+        en su índice; las que no se pueden prestar se informan sin deshacer las demás.
+        Returns: Tupla (nombre del alumno, títulos prestados, [(isbn, motivo)] rechazados)
+        Raises: ValueError si el alumno no existe
+        """
+        atraso = AtrasoModel(self.db)
+        prestados, rechazados = [], []
+        fecha_entrega = datetime.now().strftime("%Y-%m-%d")
+        with self.db.transaccion() as conn:
+            res_a = AlumnoModel(self.db).obtener_alumno_por_rut(rut)
+            if not res_a:
+                raise ValueError("Alumno no encontrado.")
+            pid, pnom = res_a
+            
+            for isbn in isbns:
+                try:
+                    lid, ltit, eid = self._elegir_ejemplar(isbn, exacto=True)
+                except ValueError as e:
+                    rechazados.append((isbn, str(e)))
+                    continue
+                if self.existe_prestamo_duplicado(lid, pid):
+                    rechazados.append((isbn, "Préstamo duplicado."))
+                    continue
+                
+                # Como en prestar: el contador no baja de cero aunque Ejemplares tenga una copia libre
+                cursor = conn.execute(
+                    "UPDATE Libros SET Disponibles = Disponibles - 1 WHERE ID_Libro = ? AND Disponibles > 0", (lid,)
+                )
+                if cursor.rowcount == 0:
+                    rechazados.append((isbn, "Libro no disponible."))
+                    continue
+                conn.execute("""
+                    INSERT INTO Transacciones (ID_Libro, ID_Prestatario, ID_Ejemplar, Fecha_Entrega, 
+                                               Fecha_Devolucion_Estimada, Estado)
+                    VALUES (?, ?, ?, ?, ?, 'Prestado')
+                """, (lid, pid, eid, fecha_entrega, atraso.calcular_vencimiento(lid, pid, fecha_entrega)))
+                prestados.append(ltit)
+        
+        return pnom, prestados, rechazados
+    
+    def prestar_lote(self, id_libro: int, ids_prestatarios: List[int]) -> Tuple[List[int], List[int]]:
+        """
+        Presta un mismo libro a varios alumnos (p. ej. un set de aula a un curso) en una
+        sola transacción: toma las copias en estante de una vez (índice parcial de
+        Ejemplares), descuenta Disponibles con un solo UPDATE e inserta los préstamos
+        con executemany
+        Returns: Tupla (IDs de alumnos con préstamo nuevo, IDs omitidos porque ya tenían
+                 el libro o no existen)
+        Raises: ValueError si el libro no existe o no alcanzan los ejemplares
+        """
+        ids = list(dict.fromkeys(ids_prestatarios))  # Sin repetidos, en el orden recibido
+        if not ids:
+            return [], []
+        fecha_entrega = datetime.now().strftime("%Y-%m-%d")
+        marcas = ", ".join("?" * len(ids))
+        with self.db.transaccion() as conn:
+            libro = conn.execute("SELECT Categoría FROM Libros WHERE ID_Libro = ?", (id_libro,)).fetchone()
+            if not libro:
+                raise ValueError("Libro no encontrado.")
+            categoria = libro[0]
+            
+            cursos = dict(conn.execute(f"""
+                SELECT p.ID_Prestatario, p.Curso FROM Prestatarios p
+                WHERE p.ID_Prestatario IN ({marcas}) AND NOT EXISTS (
+                    SELECT 1 FROM Transacciones t 
+                    WHERE t.ID_Prestatario = p.ID_Prestatario AND t.ID_Libro = ? AND t.Estado = 'Prestado'
+                )
+            """, (*ids, id_libro)).fetchall())
+            nuevos = [pid for pid in ids if pid in cursos]
+            omitidos = [pid for pid in ids if pid not in cursos]
+            if not nuevos:
+                return [], omitidos
+            copias = EjemplarModel(self.db).obtener_disponibles(id_libro, len(nuevos))
+            if len(copias) < len(nuevos):
+                raise ValueError(f"Solo hay {len(copias)} ejemplar(es) disponible(s) para {len(nuevos)} alumno(s).")
+            # El contador debe alcanzar para todos (si no coincide con Ejemplares, no se presta)
+            cursor = conn.execute(
+                "UPDATE Libros SET Disponibles = Disponibles - ? WHERE ID_Libro = ? AND Disponibles >= ?",
+                (len(nuevos), id_libro, len(nuevos))
+            )
+            if cursor.rowcount == 0:
+                raise ValueError(f"No hay {len(nuevos)} ejemplar(es) disponible(s) para prestar.")
+            
+            conn.executemany("""
+                INSERT INTO Transacciones (ID_Libro, ID_Prestatario, ID_Ejemplar, Fecha_Entrega, 
+                                           Fecha_Devolucion_Estimada, Estado)
+                VALUES (?, ?, ?, ?, ?, 'Prestado')
+            """, [(id_libro, pid, eid, fecha_entrega, fecha_devolucion(fecha_entrega, categoria, cursos[pid]))
+                  for pid, eid in zip(nuevos, copias)])
+        
+        return nuevos, omitidos
+    
+    def devolver_lote(self, ids_transacciones: List[int]) -> int:
+        """
+        Registra la devolución de varios préstamos en una sola transacción: cierra los
+        préstamos con executemany y suma Disponibles con un UPDATE por libro
+        Returns: Cantidad de préstamos devueltos (los ya cerrados o inexistentes se ignoran)
+        """
+        ids = list(dict.fromkeys(ids_transacciones))
+        if not ids:
+            return 0
+        marcas = ", ".join("?" * len(ids))
+        with self.db.transaccion() as conn:
+            activos = conn.execute(f"""
+                SELECT ID_Transaccion, ID_Libro FROM Transacciones 
+                WHERE ID_Transaccion IN ({marcas}) AND Estado = 'Prestado'
+            """, ids).fetchall()
+            if not activos:
+                return 0
+            
+            fecha = datetime.now().strftime("%Y-%m-%d")
+            conn.executemany("""
+                UPDATE Transacciones SET Estado = 'Devuelto', Fecha_Devolucion_Real = ? 
+                WHERE ID_Transaccion = ?
+            """, [(fecha, tid) for tid, _ in activos])
+            por_libro: Dict[int, int] = {}
+            for _, lid in activos:
+                por_libro[lid] = por_libro.get(lid, 0) + 1
+            conn.executemany("UPDATE Libros SET Disponibles = Disponibles + ? WHERE ID_Libro = ?",
+                             [(n, lid) for lid, n in por_libro.items()])
+        
+        return len(activos)
+    
+    def obtener_prestamos_curso(self, id_libro: int, curso: str) -> List[int]:
+        """Obtiene los IDs de los préstamos activos de un libro en manos de alumnos de un curso"""
+        query = """
+            SELECT t.ID_Transaccion FROM Transacciones t
+            JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+            WHERE t.ID_Libro = ? AND t.Estado = 'Prestado' AND p.Curso = ?
+        """
+        return [fila[0] for fila in self.db.consultar_todos(query, (id_libro, curso))]
+    
+    def devolver(self, termino: str, rut: Optional[str] = None) -> str:
+        """
+        Registra la devolución de un libro (cierre del préstamo y aumento de
+        disponibles) en una sola transacción. Con el código del ejemplar se cierra
+        exactamente el préstamo de esa copia; con ISBN o título, solo si el libro tiene
+        un único préstamo activo (o uno del alumno `rut`, si se indica).
+        Returns: Título del libro devuelto
+        Raises: ValueError si no hay libro o préstamo activo, o si hay varios y no se
+                sabe de quién es la copia devuelta
+        """
+        with self.db.transaccion() as conn:
+            ejemplar = EjemplarModel(self.db).obtener_por_codigo(termino)
+            if ejemplar:
+                _, lid, ltit, id_transaccion = ejemplar
+                if id_transaccion is None:
+                    raise ValueError("El ejemplar no está prestado.")
+                self._cerrar_prestamo(conn, id_transaccion, lid)
+                return ltit
+            
+            if validar_isbn(termino):
+                res = LibroModel(self.db).obtener_libro_por_isbn_exacto(termino, solo_disponibles=False)
+            else:
+                res = conn.execute("""
+                    SELECT ID_Libro, Título FROM Libros 
+                    WHERE ISBN = ? OR Título LIKE ?
+                    LIMIT 1
+                """, (termino, f"%{termino}%")).fetchone()
+            if not res:
+                raise ValueError("Libro no encontrado.")
+            lid, ltit = res[:2]
+            
+            if rut:
+                alumno = AlumnoModel(self.db).obtener_alumno_por_rut(rut)
+                if not alumno:
+                    raise ValueError("Alumno no encontrado.")
+                activos = conn.execute("""
+                    SELECT ID_Transaccion FROM Transacciones 
+                    WHERE ID_Prestatario = ? AND ID_Libro = ? AND Estado = 'Prestado'
+                """, (alumno[0], lid)).fetchall()
+            else:
+                activos = conn.execute("""
+                    SELECT ID_Transaccion FROM Transacciones 
+                    WHERE ID_Libro = ? AND Estado = 'Prestado' 
+                    LIMIT 2
+                """, (lid,)).fetchall()
+            if not activos:
+                raise ValueError("No hay préstamo activo.")
+            if len(activos) > 1:
+                # Cerrar uno cualquiera dejaría la copia a nombre de otro alumno
+                raise ValueError("El libro tiene varios préstamos activos: escanee el código del "
+                                 "ejemplar o indique el RUT del alumno.")
+            self._cerrar_prestamo(conn, activos[0][0], lid)
+        
+        return ltit
+    
+    @staticmethod
+    def _cerrar_prestamo(conn, id_transaccion: int, id_libro: int):
+        """Marca el préstamo como devuelto y repone el disponible (el trigger libera la copia)"""
+        conn.execute("""
+            UPDATE Transacciones 
+            SET Estado = 'Devuelto', Fecha_Devolucion_Real = ? 
+            WHERE ID_Transaccion = ?
+        """, (datetime.now().strftime("%Y-%m-%d"), id_transaccion))
+        conn.execute("UPDATE Libros SET Disponibles = Disponibles + 1 WHERE ID_Libro = ?", (id_libro,))
     
     def existe_prestamo_duplicado(self, id_libro: int, id_prestatario: int) -> bool:
         """Verifica si ya existe un préstamo activo del mismo libro al mismo alumno"""
@@ -76,6 +345,48 @@ class TransaccionModel:
             """
             return self.db.consultar_todos(query)
     
+    def obtener_transacciones_pagina(self, id_prestatario: int = None, despues: Optional[str] = None,
+                                     tamano: int = TAMANO_PAGINA) -> Pagina:
+        """
+        Igual que obtener_todas_transacciones, pero entrega una página ordenada
+        de la más reciente a la más antigua por (Fecha_Entrega, ID)
+        Returns: (filas, cursor de la página siguiente o None)
+        """
+        condicion_cursor, params_cursor = condicion_despues("(Fecha_Entrega, ID_Transaccion)", despues,
+                                                            descendente=True)
+        filtro, params = ("ID_Prestatario = ?", (id_prestatario,)) if id_prestatario else ("1", ())
+        query = f"""
+            SELECT ID_Transaccion, ID_Libro, ID_Prestatario, 
+                   Fecha_Entrega, Fecha_Devolucion_Real, Estado
+            FROM Transacciones
+            WHERE {filtro} AND {condicion_cursor}
+            ORDER BY Fecha_Entrega DESC, ID_Transaccion DESC
+            LIMIT ?
+        """
+        filas = self.db.consultar_todos(query, params + tuple(params_cursor) + (tamano + 1,))
+        return armar_pagina(filas, tamano, lambda f: (f[3], f[0]))
+    
+    def iterar_historial(self, id_prestatario: int = None, registro: Optional[str] = None) -> Iterator:
+        """
+        Recorre el historial de préstamos con los datos del libro y del alumno, del más
+        antiguo al más reciente, sin cargarlo completo en memoria (para exportar o reportes)
+        Args:
+            registro: Tipo de fila de DatabaseConnection.iterar (None, "nombrada" o "slots")
+        Returns: Iterador de filas (ID_Transaccion, ISBN, Título, RUT, Nombre, Curso,
+                 Fecha_Entrega, Fecha_Devolucion_Real, Estado)
+        """
+        filtro, params = ("t.ID_Prestatario = ?", (id_prestatario,)) if id_prestatario else ("1", ())
+        query = f"""
+            SELECT t.ID_Transaccion, l.ISBN, l.Título, p.RUT, p.Nombre, p.Curso,
+                   t.Fecha_Entrega, t.Fecha_Devolucion_Real, t.Estado
+            FROM Transacciones t
+            JOIN Libros l ON l.ID_Libro = t.ID_Libro
+            JOIN Prestatarios p ON p.ID_Prestatario = t.ID_Prestatario
+            WHERE {filtro}
+            ORDER BY t.Fecha_Entrega, t.ID_Transaccion
+        """
+        return self.db.iterar(query, params, registro=registro)
+    
     def obtener_prestamo_por_libro(self, id_libro: int) -> Optional[Tuple]:
         """Obtiene el préstamo activo de un libro"""
         query = """
@@ -86,7 +397,5 @@ class TransaccionModel:
         return self.db.consultar_uno(query, (id_libro,))
     
     def obtener_total_prestamos_activos(self) -> int:
-        """Obtiene el total de préstamos activos (no devueltos)"""
-        query = "SELECT COUNT(*) FROM Transacciones WHERE Estado = 'Prestado'"
-        result = self.db.consultar_uno(query)
-        return result[0] if result else 0
+        """Obtiene el total de préstamos activos (desde los contadores de Estadisticas)"""
+        return EstadisticaModel(self.db).obtener_resumen()['prestamos_activos']
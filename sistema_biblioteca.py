@@ -4,6 +4,8 @@ from tkinter import messagebox
 from datetime import datetime
 import sys
 import os
+from ui.widgets.lista_virtual import ListaVirtual
+from utils.plazos import fecha_devolucion
 
 # --- Configuración de Apariencia ---
 customtkinter.set_appearance_mode("System")
@@ -211,6 +213,56 @@ class VentanaDetalleLibros(customtkinter.CTkToplevel):
             self.textbox.configure(state="disabled")
         finally: conn.close()
 
+# --- FILAS REUTILIZABLES PARA LAS LISTAS VIRTUALES ---
+# (Solo se crean las filas visibles; al hacer scroll se vuelven a llenar)
+
+class FilaLibro:
+    def __init__(self, parent, app):
+        self.app = app
+        self.frame = customtkinter.CTkFrame(parent, fg_color="transparent")
+        for col, peso in enumerate((2, 5, 4, 1, 2)): self.frame.grid_columnconfigure(col, weight=peso, uniform="columnas") # ISBN, TÍTULO, AUTOR, DISP/TOT, ACCIONES
+        self.lbl_isbn = customtkinter.CTkLabel(self.frame, anchor="w"); self.lbl_isbn.grid(row=0, column=0, padx=5, sticky="w")
+        self.lbl_tit = customtkinter.CTkLabel(self.frame, anchor="w"); self.lbl_tit.grid(row=0, column=1, padx=5, sticky="w")
+        self.lbl_aut = customtkinter.CTkLabel(self.frame, anchor="w"); self.lbl_aut.grid(row=0, column=2, padx=5, sticky="w")
+        self.lbl_disp = customtkinter.CTkLabel(self.frame, anchor="center"); self.lbl_disp.grid(row=0, column=3, padx=5, sticky="ew")
+        frame_acciones = customtkinter.CTkFrame(self.frame, fg_color="transparent"); frame_acciones.grid(row=0, column=4, padx=10, sticky="e")
+        self.btn_editar = customtkinter.CTkButton(frame_acciones, text="Editar", width=60, fg_color="blue"); self.btn_editar.pack(side="left", padx=2)
+        self.btn_borrar = customtkinter.CTkButton(frame_acciones, text="X", width=30, fg_color="red"); self.btn_borrar.pack(side="left", padx=2)
+
+    def llenar(self, r):
+        lid, isbn, tit, aut, edit, anio, cat, tot, disp = r
+        # Truncar texto largo para que quepa bien
+        self.lbl_isbn.configure(text=str(isbn))
+        self.lbl_tit.configure(text=(tit[:35] + '...') if len(tit) > 35 else tit)
+        self.lbl_aut.configure(text=(aut[:25] + '...') if len(aut) > 25 else aut)
+        self.lbl_disp.configure(text=f"{disp}/{tot}")
+        datos_para_editar = (isbn, tit, aut, edit, anio, cat)
+        self.btn_editar.configure(command=lambda i=lid, d=datos_para_editar: self.app.abrir_editar_libro(i, d))
+        self.btn_borrar.configure(command=lambda i=lid, t=tit: self.app.eliminar_libro_id(i, t))
+
+class FilaPrestatario:
+    def __init__(self, parent, app):
+        self.app = app
+        self.frame = customtkinter.CTkFrame(parent, fg_color="transparent")
+        for col, peso in enumerate((2, 4, 2, 2, 2)): self.frame.grid_columnconfigure(col, weight=peso, uniform="columnas") # RUT, NOMBRE, CURSO, EN PODER, ACCIONES
+        self.lbl_rut = customtkinter.CTkLabel(self.frame, anchor="w"); self.lbl_rut.grid(row=0, column=0, padx=5, sticky="w")
+        self.lbl_nom = customtkinter.CTkLabel(self.frame, anchor="w"); self.lbl_nom.grid(row=0, column=1, padx=5, sticky="w")
+        self.lbl_cur = customtkinter.CTkLabel(self.frame, anchor="w"); self.lbl_cur.grid(row=0, column=2, padx=5, sticky="w")
+        self.btn_libros = customtkinter.CTkButton(self.frame, width=100); self.btn_libros.grid(row=0, column=3, padx=5, sticky="ew")
+        frame_acciones = customtkinter.CTkFrame(self.frame, fg_color="transparent"); frame_acciones.grid(row=0, column=4, padx=10, sticky="e")
+        self.btn_editar = customtkinter.CTkButton(frame_acciones, text="Editar", width=60, fg_color="blue"); self.btn_editar.pack(side="left", padx=2)
+        self.btn_borrar = customtkinter.CTkButton(frame_acciones, text="X", width=30, fg_color="red"); self.btn_borrar.pack(side="left", padx=2)
+
+    def llenar(self, r):
+        pid, rut, nom, cur, act = r
+        self.lbl_rut.configure(text=str(rut))
+        self.lbl_nom.configure(text=(nom[:25] + '...') if len(nom) > 25 else nom)
+        self.lbl_cur.configure(text=str(cur) if cur else "-")
+        self.btn_libros.configure(text=f"{act} Libros", fg_color="orange" if act > 0 else "gray", command=lambda p=pid, n=nom: self.app.ver_libros_alumno(p, n))
+        datos_edit = (rut, nom, cur)
+        self.btn_editar.configure(command=lambda p=pid, d=datos_edit: self.app.abrir_editar_alumno(p, d))
+        self.btn_borrar.configure(command=lambda p=pid, n=nom: self.app.eliminar_alumno_id(p, n))
+
 # --- APP PRINCIPAL ---
 
 class App(customtkinter.CTk):
@@ -256,11 +308,11 @@ class App(customtkinter.CTk):
         
         # --- Cabecera Tabla Libros (Ahora con GRID) ---
         hl = customtkinter.CTkFrame(tab_l, height=30, fg_color="gray40"); hl.pack(fill="x", padx=10)
-        hl.grid_columnconfigure(0, weight=2) # ISBN
-        hl.grid_columnconfigure(1, weight=5) # TÍTULO (Más espacio)
-        hl.grid_columnconfigure(2, weight=4) # AUTOR
-        hl.grid_columnconfigure(3, weight=1) # DISP/TOT
-        hl.grid_columnconfigure(4, weight=2) # ACCIONES
+        hl.grid_columnconfigure(0, weight=2, uniform="columnas") # ISBN
+        hl.grid_columnconfigure(1, weight=5, uniform="columnas") # TÍTULO (Más espacio)
+        hl.grid_columnconfigure(2, weight=4, uniform="columnas") # AUTOR
+        hl.grid_columnconfigure(3, weight=1, uniform="columnas") # DISP/TOT
+        hl.grid_columnconfigure(4, weight=2, uniform="columnas") # ACCIONES
         
         customtkinter.CTkLabel(hl, text="ISBN", anchor="w").grid(row=0, column=0, padx=5, sticky="w")
         customtkinter.CTkLabel(hl, text="TÍTULO", anchor="w").grid(row=0, column=1, padx=5, sticky="w")
@@ -268,7 +320,7 @@ class App(customtkinter.CTk):
         customtkinter.CTkLabel(hl, text="DISP/TOT", anchor="center").grid(row=0, column=3, padx=5, sticky="ew")
         customtkinter.CTkLabel(hl, text="ACCIONES", anchor="center").grid(row=0, column=4, padx=10, sticky="e")
 
-        self.scroll_libros = customtkinter.CTkScrollableFrame(tab_l); self.scroll_libros.pack(fill="both", expand=True, padx=10, pady=5)
+        self.lista_libros = ListaVirtual(tab_l, lambda parent: FilaLibro(parent, self), alto_fila=36); self.lista_libros.pack(fill="both", expand=True, padx=10, pady=5)
 
         # ===================================================
         # PESTAÑA 3: ALUMNOS (MODIFICADA CON GRID)
@@ -282,11 +334,11 @@ class App(customtkinter.CTk):
         
         # --- Cabecera Tabla Alumnos (Ahora con GRID) ---
         ha = customtkinter.CTkFrame(tab_a, height=30, fg_color="gray40"); ha.pack(fill="x", padx=10)
-        ha.grid_columnconfigure(0, weight=2) # RUT
-        ha.grid_columnconfigure(1, weight=4) # NOMBRE (Más espacio)
-        ha.grid_columnconfigure(2, weight=2) # CURSO
-        ha.grid_columnconfigure(3, weight=2) # EN PODER
-        ha.grid_columnconfigure(4, weight=2) # ACCIONES
+        ha.grid_columnconfigure(0, weight=2, uniform="columnas") # RUT
+        ha.grid_columnconfigure(1, weight=4, uniform="columnas") # NOMBRE (Más espacio)
+        ha.grid_columnconfigure(2, weight=2, uniform="columnas") # CURSO
+        ha.grid_columnconfigure(3, weight=2, uniform="columnas") # EN PODER
+        ha.grid_columnconfigure(4, weight=2, uniform="columnas") # ACCIONES
         
         customtkinter.CTkLabel(ha, text="RUT", anchor="w").grid(row=0, column=0, padx=5, sticky="w")
         customtkinter.CTkLabel(ha, text="NOMBRE", anchor="w").grid(row=0, column=1, padx=5, sticky="w")
@@ -294,7 +346,7 @@ class App(customtkinter.CTk):
         customtkinter.CTkLabel(ha, text="EN PODER", anchor="center").grid(row=0, column=3, padx=5, sticky="ew")
         customtkinter.CTkLabel(ha, text="ACCIONES", anchor="center").grid(row=0, column=4, padx=10, sticky="e")
 
-        self.scroll_alumnos = customtkinter.CTkScrollableFrame(tab_a); self.scroll_alumnos.pack(fill="both", expand=True, padx=10, pady=5)
+        self.lista_alumnos = ListaVirtual(tab_a, lambda parent: FilaPrestatario(parent, self), alto_fila=36); self.lista_alumnos.pack(fill="both", expand=True, padx=10, pady=5)
         
         self.win_n_libro=None; self.win_e_libro=None; self.win_n_alumno=None; self.win_e_alumno=None; self.win_detalle=None
 
@@ -317,7 +369,6 @@ class App(customtkinter.CTk):
 
     # --- LOGICA LIBROS (MODIFICADA CON GRID) ---
     def buscar_libros(self):
-        for w in self.scroll_libros.winfo_children(): w.destroy()
         term = self.entry_bus_l.get(); conn = conectar_db(); c = conn.cursor()
         q = "SELECT ID_Libro, ISBN, Título, Autor, Editorial, Año_Publicacion, Categoría, Total_Ejemplares, Disponibles FROM Libros"
         p = ()
@@ -325,39 +376,8 @@ class App(customtkinter.CTk):
         else: q += " WHERE Disponibles < Total_Ejemplares"
         q += " ORDER BY Título"; c.execute(q, p); rows = c.fetchall(); conn.close()
         
-        if not rows:
-            msg = "No se encontraron coincidencias." if term else "No hay libros con préstamos activos."
-            customtkinter.CTkLabel(self.scroll_libros, text=msg).pack(pady=10); return
-
-        for r in rows:
-            lid, isbn, tit, aut, edit, anio, cat, tot, disp = r
-            
-            # Fila
-            row_f = customtkinter.CTkFrame(self.scroll_libros, fg_color="transparent"); row_f.pack(fill="x", pady=2)
-            # Definir columnas (mismos pesos que la cabecera)
-            row_f.grid_columnconfigure(0, weight=2) # ISBN
-            row_f.grid_columnconfigure(1, weight=5) # TÍTULO
-            row_f.grid_columnconfigure(2, weight=4) # AUTOR
-            row_f.grid_columnconfigure(3, weight=1) # DISP/TOT
-            row_f.grid_columnconfigure(4, weight=2) # ACCIONES
-            
-            # Truncar texto largo para que quepa bien
-            tit_trunc = (tit[:35] + '...') if len(tit) > 35 else tit
-            aut_trunc = (aut[:25] + '...') if len(aut) > 25 else aut
-
-            # Añadir widgets al grid
-            customtkinter.CTkLabel(row_f, text=str(isbn), anchor="w").grid(row=0, column=0, padx=5, sticky="w")
-            customtkinter.CTkLabel(row_f, text=tit_trunc, anchor="w").grid(row=0, column=1, padx=5, sticky="w")
-            customtkinter.CTkLabel(row_f, text=aut_trunc, anchor="w").grid(row=0, column=2, padx=5, sticky="w")
-            customtkinter.CTkLabel(row_f, text=f"{disp}/{tot}", anchor="center").grid(row=0, column=3, padx=5, sticky="ew")
-
-            # Frame para acciones, alineado a la derecha de la celda de acciones
-            frame_acciones = customtkinter.CTkFrame(row_f, fg_color="transparent")
-            frame_acciones.grid(row=0, column=4, padx=10, sticky="e")
-            
-            datos_para_editar = (isbn, tit, aut, edit, anio, cat)
-            customtkinter.CTkButton(frame_acciones, text="Editar", width=60, fg_color="blue", command=lambda i=lid, d=datos_para_editar: self.abrir_editar_libro(i, d)).pack(side="left", padx=2)
-            customtkinter.CTkButton(frame_acciones, text="X", width=30, fg_color="red", command=lambda i=lid, t=tit: self.eliminar_libro_id(i, t)).pack(side="left", padx=2)
+        msg = "No se encontraron coincidencias." if term else "No hay libros con préstamos activos."
+        self.lista_libros.mostrar(rows, msg)
 
     def eliminar_libro_id(self, lid, titulo):
         conn = conectar_db(); c = conn.cursor()
@@ -369,7 +389,6 @@ class App(customtkinter.CTk):
 
     # --- LOGICA ALUMNOS (MODIFICADA CON GRID) ---
     def buscar_alumnos(self):
-        for w in self.scroll_alumnos.winfo_children(): w.destroy()
         term = self.entry_bus_a.get(); conn = conectar_db(); c = conn.cursor()
         q = """SELECT p.ID_Prestatario, p.RUT, p.Nombre, p.Curso,
                (SELECT COUNT(*) FROM Transacciones t WHERE t.ID_Prestatario=p.ID_Prestatario AND t.Estado='Prestado') as Activos
@@ -390,42 +409,8 @@ class App(customtkinter.CTk):
         else: q += " WHERE (SELECT COUNT(*) FROM Transacciones t WHERE t.ID_Prestatario=p.ID_Prestatario AND t.Estado='Prestado') > 0"
         q += " ORDER BY p.Nombre"; c.execute(q, p); rows = c.fetchall(); conn.close()
 
-        if not rows:
-            msg = "No se encontraron coincidencias." if term else "No hay alumnos con préstamos activos."
-            customtkinter.CTkLabel(self.scroll_alumnos, text=msg).pack(pady=10); return
-
-        for r in rows:
-            pid, rut, nom, cur, act = r
-            
-            # --- NUEVO CÓDIGO: Truncar nombre ---
-            nom_trunc = (nom[:25] + '...') if len(nom) > 25 else nom
-            # --- FIN NUEVO CÓDIGO ---
-
-            # Fila
-            row_f = customtkinter.CTkFrame(self.scroll_alumnos, fg_color="transparent"); row_f.pack(fill="x", pady=2)
-            # Definir columnas (mismos pesos que la cabecera)
-            row_f.grid_columnconfigure(0, weight=2) # RUT
-            row_f.grid_columnconfigure(1, weight=4) # NOMBRE
-            row_f.grid_columnconfigure(2, weight=2) # CURSO
-            row_f.grid_columnconfigure(3, weight=2) # EN PODER
-            row_f.grid_columnconfigure(4, weight=2) # ACCIONES
-            
-            customtkinter.CTkLabel(row_f, text=str(rut), anchor="w").grid(row=0, column=0, padx=5, sticky="w")
-            # --- MODIFICADO: Usar el nombre truncado ---
-            customtkinter.CTkLabel(row_f, text=nom_trunc, anchor="w").grid(row=0, column=1, padx=5, sticky="w")
-            # --- FIN MODIFICADO ---
-            customtkinter.CTkLabel(row_f, text=str(cur) if cur else "-", anchor="w").grid(row=0, column=2, padx=5, sticky="w")
-            
-            col_btn = "orange" if act > 0 else "gray"
-            customtkinter.CTkButton(row_f, text=f"{act} Libros", width=100, fg_color=col_btn, command=lambda p=pid, n=nom: self.ver_libros_alumno(p, n)).grid(row=0, column=3, padx=5, sticky="ew")
-            
-            # Frame para acciones, alineado a la derecha
-            frame_acciones = customtkinter.CTkFrame(row_f, fg_color="transparent")
-            frame_acciones.grid(row=0, column=4, padx=10, sticky="e")
-            
-            datos_edit = (rut, nom, cur)
-            customtkinter.CTkButton(frame_acciones, text="Editar", width=60, fg_color="blue", command=lambda p=pid, d=datos_edit: self.abrir_editar_alumno(p, d)).pack(side="left", padx=2)
-            customtkinter.CTkButton(frame_acciones, text="X", width=30, fg_color="red", command=lambda p=pid, n=nom: self.eliminar_alumno_id(p, n)).pack(side="left", padx=2)
+        msg = "No se encontraron coincidencias." if term else "No hay alumnos con préstamos activos."
+        self.lista_alumnos.mostrar(rows, msg)
             
     def eliminar_alumno_id(self, pid, nombre):
         conn = conectar_db(); c = conn.cursor()
@@ -442,17 +427,19 @@ class App(customtkinter.CTk):
         conn = conectar_db(); c = conn.cursor()
         try:
             rut_limpio = rut.replace(".", "").replace("-", "")
-            c.execute("SELECT ID_Prestatario, Nombre FROM Prestatarios WHERE REPLACE(REPLACE(RUT, '.', ''), '-', '') = ?", (rut_limpio,)); res_a = c.fetchone()
+            c.execute("SELECT ID_Prestatario, Nombre, Curso FROM Prestatarios WHERE REPLACE(REPLACE(RUT, '.', ''), '-', '') = ?", (rut_limpio,)); res_a = c.fetchone()
             if not res_a: return messagebox.showerror("Error", "Alumno no encontrado.")
-            pid, pnom = res_a
+            pid, pnom, curso = res_a
             lk = f"%{item}%"
-            c.execute("SELECT ID_Libro, Título, Disponibles FROM Libros WHERE (ISBN = ? OR Título LIKE ?) AND Disponibles > 0", (item, lk)); res_l = c.fetchone()
+            c.execute("SELECT ID_Libro, Título, Categoría FROM Libros WHERE (ISBN = ? OR Título LIKE ?) AND Disponibles > 0", (item, lk)); res_l = c.fetchone()
             if not res_l: return messagebox.showerror("Error", "Libro no disponible.")
-            lid, ltit, _ = res_l
+            lid, ltit, categoria = res_l
             c.execute("SELECT 1 FROM Transacciones WHERE ID_Libro = ? AND ID_Prestatario = ? AND Estado = 'Prestado'", (lid, pid))
             if c.fetchone(): return messagebox.showerror("Error", "Préstamo duplicado.")
             c.execute("UPDATE Libros SET Disponibles = Disponibles - 1 WHERE ID_Libro = ?", (lid,))
-            c.execute("INSERT INTO Transacciones (ID_Libro, ID_Prestatario, Fecha_Entrega, Estado) VALUES (?, ?, ?, 'Prestado')", (lid, pid, datetime.now().strftime("%Y-%m-%d")))
+            # Con fecha de devolución, para que el préstamo aparezca en Atrasados cuando venza
+            entrega = datetime.now().strftime("%Y-%m-%d")
+            c.execute("INSERT INTO Transacciones (ID_Libro, ID_Prestatario, Fecha_Entrega, Fecha_Devolucion_Estimada, Estado) VALUES (?, ?, ?, ?, 'Prestado')", (lid, pid, entrega, fecha_devolucion(entrega, categoria, curso)))
             conn.commit(); messagebox.showinfo("Éxito", f"Préstamo: {ltit} -> {pnom}"); self.entry_p_rut.delete(0, "end"); self.entry_p_isbn.delete(0, "end")
         except Exception as e: conn.rollback(); messagebox.showerror("Error", str(e))
         finally: conn.close()
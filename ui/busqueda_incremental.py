@@ -0,0 +1,127 @@
+"""
+Búsqueda Incremental - Búsqueda mientras se escribe, con retardo y refinamiento en memoria
+"""
+from typing import Any, Callable, List, Optional, Tuple
+from ui.ejecutor import EjecutorConsultas
+from utils.config import BUSQUEDA_RETARDO_MS
+
+# Función que filtra en memoria los resultados de un término para uno más largo.
+# Retorna None si el resultado no se puede obtener del caché (hay que consultar la BD).
+Refinador = Callable[[List[Tuple], str], Optional[List[Tuple]]]
+
+# Carga la página siguiente en el hilo de trabajo y retorna (filas, Continuacion o None)
+Continuacion = Callable[[], Tuple[List[Tuple], Any]]
+
+
+class BusquedaIncremental:
+    """
+    Conecta un campo de búsqueda con una consulta en segundo plano.
+
+    Al escribir, la búsqueda se lanza tras `retardo_ms` sin teclas nuevas. Si el
+    término nuevo extiende al anterior, los resultados se filtran en memoria a
+    partir del caché; solo se consulta la BD cuando el término se acorta, cambia
+    por completo, el caché se invalida o el refinador no puede responder.
+
+    Los resultados pueden llegar por páginas: mientras queden páginas, el
+    resultado está incompleto y no se usa para refinar.
+    """
+
+    def __init__(self, entry, ejecutor: EjecutorConsultas,
+                 consultar: Callable[[str], Tuple[List[Tuple], Optional[Refinador], Optional[Continuacion]]],
+                 mostrar: Callable[[List[Tuple], str, Optional[Callable]], None], clave: str,
+                 retardo_ms: int = BUSQUEDA_RETARDO_MS):
+        """
+        Args:
+            entry: Campo de texto con el término
+            ejecutor: Ejecutor donde corre la consulta
+            consultar: Recibe el término y retorna (filas, refinador, continuar); se ejecuta en el
+                       hilo de trabajo. El refinador es None si las filas no sirven para refinar
+                       (p. ej. resultado truncado) y continuar es None si no hay más páginas
+            mostrar: Recibe (filas, término, cargar_mas) en el hilo de Tk; cargar_mas es None o
+                     una función para ListaVirtual.mostrar que trae las páginas siguientes
+            clave: Clave de la tarea (una búsqueda nueva cancela la anterior)
+            retardo_ms: Espera tras la última tecla antes de buscar
+        """
+        self.entry = entry
+        self.ejecutor = ejecutor
+        self.consultar = consultar
+        self.mostrar = mostrar
+        self.clave = clave
+        self.retardo_ms = retardo_ms
+        self._clave_pagina = f"{clave}_pagina"
+        self._programada = None
+        self._ultimo: Optional[str] = None
+        self._cache: Optional[Tuple[str, List[Tuple], Refinador]] = None
+        self.entry.bind("<KeyRelease>", self._al_escribir, add="+")
+
+    def buscar(self, forzar: bool = False):
+        """Busca el término actual; con `forzar` ignora el caché y consulta la BD"""
+        self._cancelar_programada()
+        if forzar:
+            self.invalidar()
+        termino = self.entry.get()
+        if termino == self._ultimo and not forzar:
+            return
+        self._ultimo = termino
+
+        self.ejecutor.cancelar(self._clave_pagina)
+        refinadas = self._refinar(termino)
+        if refinadas is not None:
+            self.ejecutor.cancelar(self.clave)
+            self.mostrar(refinadas, termino, None)
+            return
+
+        self.ejecutor.enviar(self.consultar, termino, clave=self.clave,
+                             al_terminar=lambda resultado: self._recibir(termino, resultado))
+
+    def invalidar(self):
+        """Descarta el caché (usar después de modificar datos); la próxima búsqueda va a la BD"""
+        self._cache = None
+        self._ultimo = None
+
+    def _al_escribir(self, event=None):
+        """Reinicia la espera en cada tecla"""
+        self._cancelar_programada()
+        self._programada = self.entry.after(self.retardo_ms, self._buscar_programada)
+
+    def _buscar_programada(self):
+        self._programada = None
+        self.buscar()
+
+    def _cancelar_programada(self):
+        if self._programada is not None:
+            self.entry.after_cancel(self._programada)
+            self._programada = None
+
+    def _refinar(self, termino: str) -> Optional[List[Tuple]]:
+        """Filtra el caché si el término extiende al término cacheado; None si no es posible"""
+        if self._cache is None or not termino:
+            return None
+        termino_cache, filas, refinador = self._cache
+        if not termino_cache or not termino.startswith(termino_cache):
+            return None
+        refinadas = refinador(filas, termino)
+        if refinadas is not None:
+            # El resultado refinado es igual al de la BD: sirve de base para la próxima tecla
+            self._cache = (termino, refinadas, refinador)
+        return refinadas
+
+    def _recibir(self, termino: str,
+                 resultado: Tuple[List[Tuple], Optional[Refinador], Optional[Continuacion]]):
+        """Guarda el resultado de la BD en el caché (solo si está completo) y lo muestra"""
+        filas, refinador, continuar = resultado
+        completo = refinador is not None and continuar is None
+        self._cache = (termino, filas, refinador) if completo else None
+        self.mostrar(filas, termino, self._paginador(continuar) if continuar else None)
+
+    def _paginador(self, continuar: Continuacion) -> Callable:
+        """Función cargar_mas para ListaVirtual: trae cada página siguiente con el ejecutor"""
+        pendiente = [continuar]
+
+        def cargar_mas(agregar):
+            def recibir(pagina):
+                filas, pendiente[0] = pagina
+                agregar(filas, pendiente[0] is not None)
+            self.ejecutor.enviar(pendiente[0], clave=self._clave_pagina, al_terminar=recibir)
+
+        return cargar_mas
@@ -3,7 +3,7 @@ Módulo de Dialogs - Ventanas emergentes para crear/editar datos
 """
 import customtkinter
 from tkinter import messagebox
-from typing import Optional, Callable
+from typing import Callable, List, Optional
 from utils.theme import Colors, Styles
 
 
@@ -215,3 +215,99 @@ class AlumnoDialog(customtkinter.CTkToplevel):
         
         if self.on_save():
             self.destroy()
+
+
+class PrestamoCursoDialog(customtkinter.CTkToplevel):
+    """Diálogo para prestar un libro a todo un curso (o recibir su devolución)"""
+    
+    def __init__(self, master, cursos: List[str], on_prestar: Callable, on_devolver: Callable):
+        super().__init__(master)
+        self.title("👥 Préstamo a Curso")
+        self.geometry("450x260")
+        self.transient(master)
+        self.grab_set()
+        
+        # Aplicar tema
+        self.configure(fg_color=Colors.BG_DARK)
+        
+        self.cursos = cursos
+        self.on_prestar = on_prestar
+        self.on_devolver = on_devolver
+        
+        self._build_ui()
+    
+    def _build_ui(self):
+        """Construye la interfaz del diálogo"""
+        self.frame = customtkinter.CTkFrame(self, fg_color=Colors.BG_DARK)
+        self.frame.pack(pady=Styles.PADDING_LG, padx=Styles.PADDING_LG, fill="both", expand=True)
+        self.frame.grid_columnconfigure((0, 1), weight=1)
+        
+        # Curso
+        customtkinter.CTkLabel(
+            self.frame,
+            text="Curso:",
+            text_color=Colors.TEXT_PRIMARY,
+            font=Styles.FONT_REGULAR
+        ).grid(row=0, column=0, sticky="w", padx=Styles.PADDING_MD, pady=Styles.PADDING_MD)
+        
+        self.combo_curso = customtkinter.CTkComboBox(
+            self.frame,
+            values=self.cursos or [""],
+            fg_color=Colors.BG_TERTIARY,
+            border_color=Colors.BORDER_ACCENT,
+            text_color=Colors.TEXT_PRIMARY,
+            state="readonly"
+        )
+        self.combo_curso.set(self.cursos[0] if self.cursos else "")
+        self.combo_curso.grid(row=0, column=1, sticky="ew", padx=Styles.PADDING_MD, pady=Styles.PADDING_MD)
+        
+        # Libro
+        customtkinter.CTkLabel(
+            self.frame,
+            text="ISBN/Título:",
+            text_color=Colors.TEXT_PRIMARY,
+            font=Styles.FONT_REGULAR
+        ).grid(row=1, column=0, sticky="w", padx=Styles.PADDING_MD, pady=Styles.PADDING_MD)
+        
+        self.entry_libro = customtkinter.CTkEntry(
+            self.frame,
+            placeholder_text="Escanee o escriba...",
+            fg_color=Colors.BG_TERTIARY,
+            border_color=Colors.BORDER_ACCENT,
+            text_color=Colors.TEXT_PRIMARY,
+            placeholder_text_color=Colors.TEXT_TERTIARY
+        )
+        self.entry_libro.grid(row=1, column=1, sticky="ew", padx=Styles.PADDING_MD, pady=Styles.PADDING_MD)
+        
+        # Botones
+        customtkinter.CTkButton(
+            self.frame,
+            text="📤 Prestar al curso",
+            fg_color=Colors.SECONDARY,
+            hover_color=Colors.SECONDARY_LIGHT,
+            text_color=Colors.TEXT_INVERSE,
+            corner_radius=Styles.CORNER_RADIUS_SMALL,
+            font=Styles.FONT_BOLD,
+            command=lambda: self._confirmar(self.on_prestar)
+        ).grid(row=2, column=0, pady=Styles.PADDING_LG, padx=Styles.PADDING_SM, sticky="ew")
+        customtkinter.CTkButton(
+            self.frame,
+            text="📥 Devolución del curso",
+            fg_color=Colors.PRIMARY,
+            hover_color=Colors.PRIMARY_LIGHT,
+            text_color=Colors.TEXT_INVERSE,
+            corner_radius=Styles.CORNER_RADIUS_SMALL,
+            font=Styles.FONT_BOLD,
+            command=lambda: self._confirmar(self.on_devolver)
+        ).grid(row=2, column=1, pady=Styles.PADDING_LG, padx=Styles.PADDING_SM, sticky="ew")
+    
+    def _confirmar(self, accion: Callable):
+        """Valida los datos y ejecuta la acción con (curso, término)"""
+        curso = self.combo_curso.get()
+        termino = self.entry_libro.get()
+        
+        if not curso or not termino:
+            return messagebox.showerror("❌ Error", "Curso y libro obligatorios.", parent=self)
+        
+        accion(curso, termino)
+        self.destroy()
@@ -0,0 +1,176 @@
+"""
+Ejecutor de Consultas - Ejecuta las llamadas a los modelos fuera del hilo de Tk
+Los resultados vuelven al hilo de la interfaz mediante after(), de modo que
+la ventana sigue respondiendo aunque el disco sea lento.
+"""
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Tarea:
+    """Una llamada enviada al ejecutor"""
+
+    def __init__(self, funcion: Callable, args: tuple, kwargs: dict,
+                 al_terminar: Optional[Callable[[Any], None]],
+                 al_fallar: Optional[Callable[[Exception], None]],
+                 clave: Optional[str]):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.clave = clave
+        self.cancelada = False
+
+    def cancelar(self):
+        """Descarta la tarea: si no ha empezado no se ejecuta y su resultado se ignora"""
+        self.cancelada = True
+
+
+class EjecutorConsultas:
+    """
+    Cola de trabajo entre la interfaz y los modelos.
+
+    `enviar()` encola una llamada que se ejecuta en un hilo de trabajo; al
+    terminar, `al_terminar(resultado)` o `al_fallar(error)` se llaman en el
+    hilo de Tk. Las tareas con la misma `clave` se reemplazan: al enviar una
+    nueva búsqueda, la anterior queda cancelada y su resultado no se muestra.
+    Con `hilos=0` las llamadas se ejecutan en el momento (sin hilos).
+    """
+
+    def __init__(self, widget, db=None, hilos: int = 1, intervalo_ms: int = 30):
+        """
+        Args:
+            widget: Widget de Tk usado para programar la revisión con after()
+            db: DatabaseConnection; los hilos devuelven su conexión al pool al detenerse
+            hilos: Cantidad de hilos de trabajo (1 mantiene las escrituras en orden)
+            intervalo_ms: Cada cuánto se revisan los resultados mientras hay tareas pendientes
+        """
+        self.widget = widget
+        self.db = db
+        self.intervalo_ms = intervalo_ms
+        self._pendientes = queue.Queue()
+        self._resultados = queue.Queue()
+        self._por_clave: Dict[str, Tarea] = {}
+        self._en_curso = 0
+        self._revisando = False
+        self._observadores: List[Callable[[bool], None]] = []
+        self._hilos = [threading.Thread(target=self._trabajar, name=f"consultas-{i}", daemon=True)
+                       for i in range(hilos)]
+        for hilo in self._hilos:
+            hilo.start()
+
+    # --- API ---
+    def enviar(self, funcion: Callable, *args, al_terminar: Optional[Callable[[Any], None]] = None,
+               al_fallar: Optional[Callable[[Exception], None]] = None,
+               clave: Optional[str] = None, **kwargs) -> Tarea:
+        """
+        Encola `funcion(*args, **kwargs)` para ejecutarse en segundo plano
+        Returns: La tarea creada (permite cancelarla)
+        """
+        tarea = Tarea(funcion, args, kwargs, al_terminar, al_fallar, clave)
+        if clave is not None:
+            anterior = self._por_clave.get(clave)
+            if anterior is not None:
+                anterior.cancelar()
+            self._por_clave[clave] = tarea
+
+        if not self._hilos:
+            self._entregar(tarea, *self._ejecutar(tarea))
+            return tarea
+
+        self._en_curso += 1
+        if self._en_curso == 1:
+            self._notificar(True)
+        self._pendientes.put(tarea)
+        if not self._revisando:
+            self._revisando = True
+            self.widget.after(self.intervalo_ms, self._revisar)
+        return tarea
+
+    def cancelar(self, clave: str):
+        """Cancela la última tarea enviada con esa clave"""
+        tarea = self._por_clave.pop(clave, None)
+        if tarea is not None:
+            tarea.cancelar()
+
+    def al_cambiar_estado(self, observador: Callable[[bool], None]):
+        """Registra una función que recibe True al empezar a trabajar y False al quedar libre"""
+        self._observadores.append(observador)
+
+    @property
+    def ocupado(self) -> bool:
+        """Indica si hay tareas pendientes o en ejecución"""
+        return self._en_curso > 0
+
+    def detener(self):
+        """Detiene los hilos de trabajo (las tareas pendientes se descartan)"""
+        for _ in self._hilos:
+            self._pendientes.put(None)
+        for hilo in self._hilos:
+            hilo.join(timeout=2)
+        self._hilos = []
+
+    # --- Hilos de trabajo ---
+    def _trabajar(self):
+        """Bucle de cada hilo: toma tareas de la cola y deja el resultado para la interfaz"""
+        try:
+            while True:
+                tarea = self._pendientes.get()
+                if tarea is None:
+                    break
+                if tarea.cancelada:
+                    self._resultados.put((tarea, None, None))
+                    continue
+                self._resultados.put((tarea, *self._ejecutar(tarea)))
+        finally:
+            if self.db is not None:
+                self.db.liberar()
+
+    @staticmethod
+    def _ejecutar(tarea: Tarea):
+        """Ejecuta la tarea y retorna (resultado, error)"""
+        try:
+            return tarea.funcion(*tarea.args, **tarea.kwargs), None
+        except Exception as e:
+            return None, e
+
+    # --- Hilo de Tk ---
+    def _revisar(self):
+        """Entrega los resultados listos; se vuelve a programar mientras queden tareas"""
+        while True:
+            try:
+                tarea, resultado, error = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._en_curso -= 1
+            try:
+                self._entregar(tarea, resultado, error)
+            except Exception as e:
+                print(f"Error al entregar resultado: {e}")
+
+        if self._en_curso > 0:
+            self.widget.after(self.intervalo_ms, self._revisar)
+        else:
+            self._revisando = False
+            self._notificar(False)
+
+    def _entregar(self, tarea: Tarea, resultado, error: Optional[Exception]):
+        """Llama al callback de la tarea, salvo que haya sido cancelada o reemplazada"""
+        if tarea.clave is not None and self._por_clave.get(tarea.clave) is tarea:
+            del self._por_clave[tarea.clave]
+        if tarea.cancelada:
+            return
+        if error is not None:
+            if tarea.al_fallar is not None:
+                tarea.al_fallar(error)
+            else:
+                print(f"Error en consulta en segundo plano: {error}")
+        elif tarea.al_terminar is not None:
+            tarea.al_terminar(resultado)
+
+    def _notificar(self, ocupado: bool):
+        """Avisa a los observadores (p. ej. el indicador de carga)"""
+        for observador in self._observadores:
+            observador(ocupado)
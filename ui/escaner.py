@@ -0,0 +1,52 @@
+"""
+Escáner - Detecta lecturas de un lector de código de barras en un campo de texto
+"""
+from typing import Callable, Optional
+from utils.config import ESCANER_INTERVALO_MS, ESCANER_LARGO_MINIMO
+
+
+class DetectorEscaner:
+    """
+    Distingue una lectura del lector de código de barras de la escritura manual.
+
+    El lector se comporta como un teclado que escribe todo el código en pocos
+    milisegundos y termina con Enter. Si todo el texto del campo llegó en una
+    ráfaga (cada tecla a menos de `intervalo_ms` de la anterior) y el Enter llega
+    también dentro de la ráfaga, se llama a `al_escanear(texto)`. Un Enter tras
+    escribir a mano llama a `al_confirmar()`, si se entregó.
+    """
+
+    def __init__(self, entry, al_escanear: Callable[[str], None],
+                 al_confirmar: Optional[Callable[[], None]] = None,
+                 intervalo_ms: int = ESCANER_INTERVALO_MS, largo_minimo: int = ESCANER_LARGO_MINIMO):
+        self.entry = entry
+        self.al_escanear = al_escanear
+        self.al_confirmar = al_confirmar
+        self.intervalo_ms = intervalo_ms
+        self.largo_minimo = largo_minimo
+        self._ultima_tecla: Optional[int] = None
+        self._rafaga = 0  # Caracteres seguidos escritos a velocidad de lector
+        self.entry.bind("<KeyPress>", self._al_presionar, add="+")
+        self.entry.bind("<Return>", self._al_enter, add="+")
+
+    def _al_presionar(self, event):
+        """Cuenta los caracteres de la ráfaga actual según el tiempo del evento (ms)"""
+        if event.keysym in ("Return", "KP_Enter") or not event.char:
+            return
+        rapida = self._ultima_tecla is not None and event.time - self._ultima_tecla <= self.intervalo_ms
+        self._rafaga = self._rafaga + 1 if rapida else 1
+        self._ultima_tecla = event.time
+
+    def _al_enter(self, event):
+        """Decide si el Enter cierra una lectura del lector o una escritura manual"""
+        texto = self.entry.get().strip()
+        en_rafaga = self._ultima_tecla is not None and event.time - self._ultima_tecla <= self.intervalo_ms
+        escaneado = en_rafaga and len(texto) >= self.largo_minimo and self._rafaga >= len(texto)
+        self._ultima_tecla = None
+        self._rafaga = 0
+        if escaneado:
+            self.entry.delete(0, "end")
+            self.al_escanear(texto)
+        elif self.al_confirmar:
+            self.al_confirmar()
+        return "break"
@@ -1,36 +1,64 @@
 """
 Ventana Principal - Orquestador de todas las pestañas y componentes
 """
+import os
 import customtkinter
-from ui.tabs.prestamos_tab import PrestamosTab
-from ui.tabs.libros_tab import LibrosTab
-from ui.tabs.alumnos_tab import AlumnosTab
+from ui.ejecutor import EjecutorConsultas
+from ui.widgets.indicador_carga import IndicadorCarga
 from models.libro import LibroModel
 from models.alumno import AlumnoModel
 from models.transaccion import TransaccionModel
+from models.estadistica import EstadisticaModel
+from models.atraso import AtrasoModel
 from utils.theme import Colors, Styles, ThemeConfig
+from utils.arranque import TrazaArranque
+from utils.config import EJECUTOR_HILOS
+
+# Pestañas en orden; cada una se construye (e importa su módulo) la primera vez que se selecciona
+PESTANA_PRESTAMOS = "📤 Préstamos"
+PESTANA_LIBROS = "📚 Libros"
+PESTANA_ALUMNOS = "👥 Alumnos"
+PESTANA_ATRASADOS = "⏰ Atrasados"
 
 
 class MainWindow(customtkinter.CTk):
     """Ventana principal de la aplicación"""
     
-    def __init__(self, db_connection, db_models):
+    def __init__(self, db_connection, db_models, traza=None):
         super().__init__()
+        self.traza = traza or TrazaArranque()
         self.title("📚 Sistema de Inventario CRA")
         self.geometry("1200x750")
         self._set_appearance()
+        self.traza.marcar("ventana")
         
         # Inicializar modelos
         self.db = db_connection
         self.libro_model = LibroModel(self.db)
         self.alumno_model = AlumnoModel(self.db)
         self.transaccion_model = TransaccionModel(self.db)
+        self.estadistica_model = EstadisticaModel(self.db)
+        self.atraso_model = AtrasoModel(self.db)
         
-        # Crear tablas si no existen
+        # Crear tablas si no existen (solo lee user_version si el esquema está al día)
         db_models.inicializar_db()
+        self.traza.marcar("esquema")
+        
+        # Las consultas de la interfaz se ejecutan en un hilo de trabajo
+        self.ejecutor = EjecutorConsultas(self, self.db, hilos=EJECUTOR_HILOS)
         
         # Construir UI
         self._build_ui()
+        self.traza.marcar("interfaz")
+        
+        # Los datos iniciales se piden cuando la ventana ya se pintó
+        self._datos_iniciales_pedidos = False
+        self.bind("<Map>", self._al_mostrar_ventana, add="+")
+        
+        # Panel de depuración de consultas (solo si la conexión está instrumentada)
+        self.panel_depuracion = None
+        if self.db.instrumentacion is not None:
+            self.bind("<F12>", lambda e: self.abrir_panel_depuracion())
     
     def _set_appearance(self):
         """Configura la apariencia de la aplicación - Light Mode"""
@@ -71,27 +99,60 @@ class MainWindow(customtkinter.CTk):
             text_color_disabled=Colors.TEXT_SECONDARY,
             corner_radius=Styles.CORNER_RADIUS,
             border_width=Styles.BORDER_WIDTH_THIN,
-            border_color=Colors.BORDER_LIGHT
+            border_color=Colors.BORDER_LIGHT,
+            command=self._al_cambiar_pestana
         )
         self.tab_view.pack(pady=0, padx=0, fill="both", expand=True)
         
-        # Pestaña 1: Préstamos
-        self.tab_view.add("📤 Préstamos")
-        tab_prestamos = self.tab_view.tab("📤 Préstamos")
-        tab_prestamos.configure(fg_color=Colors.BG_SECONDARY)
-        self.prestamos_tab = PrestamosTab(tab_prestamos, self.libro_model, self.alumno_model, self.transaccion_model, self)
-        
-        # Pestaña 2: Libros
-        self.tab_view.add("📚 Libros")
-        tab_libros = self.tab_view.tab("📚 Libros")
-        tab_libros.configure(fg_color=Colors.BG_SECONDARY)
-        self.libros_tab = LibrosTab(tab_libros, self.libro_model, self)
-        
-        # Pestaña 3: Alumnos
-        self.tab_view.add("👥 Alumnos")
-        tab_alumnos = self.tab_view.tab("👥 Alumnos")
-        tab_alumnos.configure(fg_color=Colors.BG_SECONDARY)
-        self.alumnos_tab = AlumnosTab(tab_alumnos, self.alumno_model, self)
+        # Las pestañas se crean vacías; su contenido se construye al seleccionarlas
+        self.prestamos_tab = self.libros_tab = self.alumnos_tab = self.atrasados_tab = None
+        self._pestanas_pendientes = {
+            PESTANA_PRESTAMOS: self._crear_prestamos_tab,
+            PESTANA_LIBROS: self._crear_libros_tab,
+            PESTANA_ALUMNOS: self._crear_alumnos_tab,
+            PESTANA_ATRASADOS: self._crear_atrasados_tab,
+        }
+        for nombre in self._pestanas_pendientes:
+            self.tab_view.add(nombre)
+            self.tab_view.tab(nombre).configure(fg_color=Colors.BG_SECONDARY)
+        self._al_cambiar_pestana()  # La pestaña inicial (Préstamos)
+    
+    def _al_cambiar_pestana(self):
+        """Construye la pestaña seleccionada si es la primera vez que se muestra"""
+        nombre = self.tab_view.get()
+        crear = self._pestanas_pendientes.pop(nombre, None)
+        if crear is not None:
+            crear(self.tab_view.tab(nombre))
+    
+    def _crear_prestamos_tab(self, frame):
+        from ui.tabs.prestamos_tab import PrestamosTab
+        self.prestamos_tab = PrestamosTab(frame, self.libro_model, self.alumno_model, self.transaccion_model, self)
+    
+    def _crear_libros_tab(self, frame):
+        from ui.tabs.libros_tab import LibrosTab
+        self.libros_tab = LibrosTab(frame, self.libro_model, self)
+    
+    def _crear_alumnos_tab(self, frame):
+        from ui.tabs.alumnos_tab import AlumnosTab
+        self.alumnos_tab = AlumnosTab(frame, self.alumno_model, self)
+    
+    def _crear_atrasados_tab(self, frame):
+        from ui.tabs.atrasados_tab import AtrasadosTab
+        self.atrasados_tab = AtrasadosTab(frame, self.atraso_model, self)
+    
+    def _al_mostrar_ventana(self, evento):
+        """La primera vez que la ventana aparece, pide los datos iniciales cuando termine de pintarse"""
+        if evento.widget is not self or self._datos_iniciales_pedidos:
+            return
+        self._datos_iniciales_pedidos = True
+        self.after_idle(self._cargar_datos_iniciales)
+    
+    def _cargar_datos_iniciales(self):
+        """Consultas del arranque (en segundo plano), después del primer pintado"""
+        self.traza.marcar("primer_pintado")
+        # La lista de atrasados se reconstruye una vez al día, antes del resumen (un solo hilo: en orden)
+        self.ejecutor.enviar(self.atraso_model.actualizar_si_hace_falta, clave="atrasados_del_dia")
+        self.refresh_dashboard()
     
     def _build_header(self, parent):
         """Construye el encabezado de la ventana"""
@@ -115,9 +176,14 @@ class MainWindow(customtkinter.CTk):
                                          text_color=Colors.SECONDARY,
                                          font=Styles.FONT_REGULAR)
         subtitle.pack(side="left", padx=Styles.PADDING_LG)
+        
+        # Indicador de consultas en curso
+        self.indicador_carga = IndicadorCarga(content, text_color=Colors.TEXT_INVERSE)
+        self.indicador_carga.pack(side="right", padx=0)
+        self.ejecutor.al_cambiar_estado(self.indicador_carga.mostrar)
     
     def _build_dashboard(self, parent):
-        """Construye el dashboard de estadísticas"""
+        """Construye el dashboard de estadísticas (los valores se cargan en segundo plano)"""
         dashboard = customtkinter.CTkFrame(parent, fg_color=Colors.BG_DARK, 
                                           corner_radius=0, height=160)
         dashboard.pack(fill="x", padx=0, pady=0)
@@ -127,60 +193,29 @@ class MainWindow(customtkinter.CTk):
         cards_container = customtkinter.CTkFrame(dashboard, fg_color="transparent")
         cards_container.pack(fill="both", expand=True, padx=Styles.PADDING_XL, pady=Styles.PADDING_LG)
         
-        # Obtener estadísticas
-        libro_stats = self.libro_model.obtener_estadisticas()
-        total_alumnos = self.alumno_model.obtener_total_alumnos()
-        prestamos_activos = self.transaccion_model.obtener_total_prestamos_activos()
-        
-        # Tarjeta 1: Total de Libros
-        self._create_stat_card(
-            cards_container,
-            icon="📚",
-            value=str(libro_stats['total_libros']),
-            label="Libros Únicos",
-            color=Colors.INFO
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 2: Ejemplares Totales
-        self._create_stat_card(
-            cards_container,
-            icon="📖",
-            value=str(libro_stats['total_ejemplares']),
-            label="Total de Libros",
-            color=Colors.SECONDARY
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 3: Disponibles
-        self._create_stat_card(
-            cards_container,
-            icon="✅",
-            value=str(libro_stats['disponibles']),
-            label="Libros Disponibles",
-            color=Colors.SUCCESS
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 4: Prestados
-        self._create_stat_card(
-            cards_container,
-            icon="📤",
-            value=str(libro_stats['prestados']),
-            label="Libros Prestados",
-            color=Colors.WARNING
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 5: Alumnos
-        self._create_stat_card(
-            cards_container,
-            icon="👥",
-            value=str(total_alumnos),
-            label="Cantidad de Alumnos",
-            color=Colors.PRIMARY
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Guardar referencia al dashboard para actualizarlo
-        self.dashboard_frame = dashboard
+        # Etiquetas de valor por estadística (se actualizan en su lugar)
+        self.valores_dashboard = {}
+        self.estadisticas = None
+        
+        tarjetas = [
+            ("total_libros", "📚", "Libros Únicos", Colors.INFO),
+            ("total_ejemplares", "📖", "Total de Libros", Colors.SECONDARY),
+            ("disponibles", "✅", "Libros Disponibles", Colors.SUCCESS),
+            ("prestados", "📤", "Libros Prestados", Colors.WARNING),
+            ("total_alumnos", "👥", "Cantidad de Alumnos", Colors.PRIMARY),
+            ("atrasados", "⏰", "Préstamos Atrasados", Colors.DANGER),
+        ]
+        for clave, icon, label, color in tarjetas:
+            self._create_stat_card(
+                cards_container,
+                icon=icon,
+                value="–",
+                label=label,
+                color=color,
+                clave=clave
+            ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
     
-    def _create_stat_card(self, parent, icon: str, value: str, label: str, color: str):
+    def _create_stat_card(self, parent, icon: str, value: str, label: str, color: str, clave: str):
         """Crea una tarjeta de estadística - Light Mode"""
         card = customtkinter.CTkFrame(parent, fg_color=Colors.BG_SECONDARY, 
                                      corner_radius=Styles.CORNER_RADIUS,
@@ -217,79 +252,71 @@ class MainWindow(customtkinter.CTk):
             text_color=color
         )
         value_label.pack(pady=(0, Styles.PADDING_LG))
+        self.valores_dashboard[clave] = value_label
         
         return card
     
+    def invalidar_busquedas(self):
+        """Descarta los resultados cacheados de las búsquedas (tras un préstamo o devolución)"""
+        for tab in (self.libros_tab, self.alumnos_tab):
+            if tab is not None:  # Una pestaña sin construir cargará datos frescos al abrirse
+                tab.busqueda.invalidar()
+    
     def refresh_dashboard(self):
-        """Actualiza las estadísticas del dashboard"""
-        # Destruir dashboard existente
-        if hasattr(self, 'dashboard_frame'):
-            self.dashboard_frame.destroy()
-        
-        # Encontrar el main_frame
-        main_frame = self.winfo_children()[0]
-        
-        # Reconstruir dashboard
-        dashboard = customtkinter.CTkFrame(main_frame, fg_color=Colors.BG_DARK, 
-                                          corner_radius=0, height=160)
-        # Insertar después del header (posición 1)
-        dashboard.pack(fill="x", padx=0, pady=0, after=main_frame.winfo_children()[0])
-        dashboard.pack_propagate(False)
-        
-        # Contenedor de tarjetas
-        cards_container = customtkinter.CTkFrame(dashboard, fg_color="transparent")
-        cards_container.pack(fill="both", expand=True, padx=Styles.PADDING_XL, pady=Styles.PADDING_LG)
-        
-        # Obtener estadísticas actualizadas
-        libro_stats = self.libro_model.obtener_estadisticas()
-        total_alumnos = self.alumno_model.obtener_total_alumnos()
-        prestamos_activos = self.transaccion_model.obtener_total_prestamos_activos()
-        
-        # Tarjeta 1: Total de Libros
-        self._create_stat_card(
-            cards_container,
-            icon="📚",
-            value=str(libro_stats['total_libros']),
-            label="Libros Únicos",
-            color=Colors.INFO
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 2: Ejemplares Totales
-        self._create_stat_card(
-            cards_container,
-            icon="📖",
-            value=str(libro_stats['total_ejemplares']),
-            label="Total de Libros",
-            color=Colors.SECONDARY
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 3: Disponibles
-        self._create_stat_card(
-            cards_container,
-            icon="✅",
-            value=str(libro_stats['disponibles']),
-            label="Libros Disponibles",
-            color=Colors.SUCCESS
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 4: Prestados
-        self._create_stat_card(
-            cards_container,
-            icon="📤",
-            value=str(libro_stats['prestados']),
-            label="Libros Prestados",
-            color=Colors.WARNING
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Tarjeta 5: Alumnos
-        self._create_stat_card(
-            cards_container,
-            icon="👥",
-            value=str(total_alumnos),
-            label="Cantidad de Alumnos",
-            color=Colors.PRIMARY
-        ).pack(side="left", fill="both", expand=True, padx=Styles.PADDING_SM)
-        
-        # Guardar referencia al dashboard
-        self.dashboard_frame = dashboard
-
+        """Recalcula todas las estadísticas (una consulta, en segundo plano)"""
+        self.ejecutor.enviar(self.estadistica_model.obtener_resumen, al_terminar=self._mostrar_estadisticas,
+                             clave="dashboard")
+    
+    def actualizar_dashboard(self, **cambios: int):
+        """
+        Aplica cambios conocidos a las estadísticas sin consultar la BD
+        (p. ej. un préstamo: disponibles=-1, prestados=1, prestamos_activos=1)
+        """
+        if self.estadisticas is None:
+            return  # La carga inicial todavía no llega; traerá los valores actualizados
+        estadisticas = dict(self.estadisticas)
+        for clave, delta in cambios.items():
+            estadisticas[clave] += delta
+        self._mostrar_estadisticas(estadisticas)
+    
+    def refrescar_atrasados(self):
+        """Vuelve a cargar la lista de atrasados (tras una devolución)"""
+        if self.atrasados_tab is not None:
+            self.atrasados_tab.cargar_atrasados()
+        else:  # Sin la lista a la vista basta el contador de la tarjeta
+            self.ejecutor.enviar(self.atraso_model.contar_atrasados, al_terminar=self.mostrar_atrasados,
+                                 clave="atrasados")
+    
+    def mostrar_atrasados(self, cantidad: int):
+        """Actualiza la tarjeta de atrasados con la cantidad de la lista recién cargada"""
+        if self.estadisticas is not None:
+            self._mostrar_estadisticas(dict(self.estadisticas, atrasados=cantidad))
+    
+    def abrir_panel_depuracion(self):
+        """Abre (o trae al frente) el panel con las mediciones de las consultas"""
+        if self.panel_depuracion is not None and self.panel_depuracion.winfo_exists():
+            self.panel_depuracion.lift()
+            return
+        from ui.panel_depuracion import PanelDepuracion
+        self.panel_depuracion = PanelDepuracion(self, self.db.instrumentacion, self._contexto_depuracion)
+    
+    def _contexto_depuracion(self):
+        """
+        Tamaño de la BD, totales del dashboard y etapas del arranque, para comparar
+        volcados a medida que la base crece
+        """
+        contexto = {"base_datos": self.db.db_path, "perfil": self.db.perfil, "arranque_ms": self.traza.a_dict()}
+        if os.path.exists(self.db.db_path):
+            contexto["tamano_bytes"] = os.path.getsize(self.db.db_path)
+        if self.estadisticas is not None:
+            contexto.update(self.estadisticas)
+        return contexto
+    
+    def _mostrar_estadisticas(self, estadisticas):
+        """Actualiza solo las etiquetas cuyo valor cambió"""
+        anteriores = self.estadisticas or {}
+        self.estadisticas = estadisticas
+        self.traza.marcar("datos_iniciales")
+        for clave, etiqueta in self.valores_dashboard.items():
+            if anteriores.get(clave) != estadisticas[clave]:
+                etiqueta.configure(text=str(estadisticas[clave]))
@@ -0,0 +1,136 @@
+"""
+Panel de Depuración - Mediciones de las consultas a la base de datos (F12)
+"""
+import customtkinter
+from datetime import datetime
+from tkinter import filedialog, messagebox
+from typing import Any, Callable, Dict, Optional
+from database.instrumentacion import Instrumentacion
+from ui.widgets.lista_virtual import ListaVirtual
+from utils.theme import Colors, Styles
+
+# Pesos de las columnas: ORIGEN, OPERACIÓN, LLAMADAS, PROM, P95, MÁX, FILAS, TOTAL
+PESOS_COLUMNAS = (6, 3, 2, 2, 2, 2, 2, 2)
+INTERVALO_ACTUALIZAR_MS = 2000  # Refresco automático mientras el panel está abierto
+
+
+class PanelDepuracion(customtkinter.CTkToplevel):
+    """Ventana con los tiempos por método del modelo, ordenados por tiempo total"""
+
+    def __init__(self, master, instrumentacion: Instrumentacion,
+                 contexto: Optional[Callable[[], Dict[str, Any]]] = None):
+        """
+        Args:
+            instrumentacion: Recolector de la conexión a la base de datos
+            contexto: Función que entrega datos extra para el volcado JSON (tamaño de la BD, totales)
+        """
+        super().__init__(master)
+        self.title("🛠 Depuración de consultas")
+        self.geometry("1100x520")
+        self.transient(master)
+
+        # Aplicar tema
+        self.configure(fg_color=Colors.BG_DARK)
+
+        self.instrumentacion = instrumentacion
+        self.contexto = contexto
+        self._pendiente = None
+
+        self._build_ui()
+        self.actualizar()
+        self.protocol("WM_DELETE_WINDOW", self._cerrar)
+
+    def _build_ui(self):
+        """Construye la interfaz del panel"""
+        fa = customtkinter.CTkFrame(self, fg_color=Colors.BG_SECONDARY,
+                                   corner_radius=Styles.CORNER_RADIUS_LARGE,
+                                   border_width=Styles.BORDER_WIDTH_THIN,
+                                   border_color=Colors.BORDER_LIGHT)
+        fa.pack(fill="x", padx=Styles.PADDING_LG, pady=Styles.PADDING_LG)
+
+        self.lbl_resumen = customtkinter.CTkLabel(fa, text="", anchor="w", text_color=Colors.TEXT_PRIMARY,
+                                                  font=Styles.FONT_BOLD)
+        self.lbl_resumen.pack(side="left", padx=Styles.PADDING_LG, pady=Styles.PADDING_MD)
+        for texto, color, comando in (("🗑 Reiniciar", Colors.DANGER, self.reiniciar),
+                                      ("💾 Exportar JSON", Colors.SECONDARY, self.exportar_json),
+                                      ("🔄 Actualizar", Colors.INFO, self.actualizar)):
+            customtkinter.CTkButton(fa, text=texto, width=140, fg_color=color, text_color=Colors.TEXT_INVERSE,
+                                   height=Styles.BUTTON_HEIGHT_MD, corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                                   font=Styles.FONT_BOLD, command=comando).pack(side="right", padx=Styles.PADDING_SM)
+
+        # --- CABECERA ---
+        ha = customtkinter.CTkFrame(self, height=40, fg_color=Colors.PRIMARY, corner_radius=Styles.CORNER_RADIUS_SMALL)
+        ha.pack(fill="x", padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_SM))
+        ha.pack_propagate(False)
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            ha.grid_columnconfigure(col, weight=peso, uniform="columnas")
+        for col, texto in enumerate(("ORIGEN", "OPERACIÓN", "LLAMADAS", "PROM ms", "P95 ms", "MÁX ms",
+                                     "FILAS", "TOTAL ms")):
+            customtkinter.CTkLabel(ha, text=texto, anchor="w", text_color=Colors.TEXT_INVERSE,
+                                  font=Styles.FONT_BOLD).grid(row=0, column=col, padx=Styles.PADDING_MD, sticky="w")
+
+        self.lista = ListaVirtual(self, FilaMedicion, alto_fila=36)
+        self.lista.pack(fill="both", expand=True, padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_LG))
+
+    def actualizar(self):
+        """Vuelve a leer las mediciones (solo memoria, no consulta la BD) y programa el siguiente refresco"""
+        if self._pendiente is not None:
+            self.after_cancel(self._pendiente)
+        conexiones = self.instrumentacion.conexiones
+        promedio = conexiones.total_ms / conexiones.llamadas if conexiones.llamadas else 0.0
+        self.lbl_resumen.configure(
+            text=f"Desde {self.instrumentacion.desde:%H:%M:%S} · conexiones abiertas: {conexiones.llamadas} "
+                 f"({promedio:.2f} ms c/u) · lentas (≥ {self.instrumentacion.umbral_lento_ms:g} ms): "
+                 f"{self.instrumentacion.lentas}")
+        self.lista.mostrar(self.instrumentacion.resumen(), "Todavía no hay consultas medidas.")
+        self._pendiente = self.after(INTERVALO_ACTUALIZAR_MS, self.actualizar)
+
+    def reiniciar(self):
+        """Descarta las mediciones para medir desde ahora"""
+        self.instrumentacion.reiniciar()
+        self.actualizar()
+
+    def exportar_json(self):
+        """Guarda las mediciones (y el contexto de la BD) en un archivo JSON"""
+        ruta = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json", filetypes=[("JSON", "*.json")],
+            initialfile=f"consultas_{datetime.now():%Y%m%d_%H%M}.json")
+        if not ruta:
+            return
+        if self.instrumentacion.volcar_json(ruta, self.contexto() if self.contexto else None):
+            messagebox.showinfo("✅ Éxito", f"Mediciones guardadas en:\n{ruta}", parent=self)
+        else:
+            messagebox.showerror("❌ Error", "No se pudieron guardar las mediciones.", parent=self)
+
+    def _cerrar(self):
+        """Detiene el refresco automático y cierra la ventana"""
+        if self._pendiente is not None:
+            self.after_cancel(self._pendiente)
+            self._pendiente = None
+        self.destroy()
+
+
+class FilaMedicion:
+    """Fila reutilizable del panel (se vuelve a llenar al hacer scroll)"""
+
+    def __init__(self, parent):
+        self.frame = customtkinter.CTkFrame(parent, fg_color="transparent")
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            self.frame.grid_columnconfigure(col, weight=peso, uniform="columnas")
+
+        self.etiquetas = []
+        for col in range(len(PESOS_COLUMNAS)):
+            lbl = customtkinter.CTkLabel(self.frame, anchor="w", text_color=Colors.TEXT_PRIMARY,
+                                         font=Styles.FONT_REGULAR)
+            lbl.grid(row=0, column=col, padx=Styles.PADDING_MD, sticky="w")
+            self.etiquetas.append(lbl)
+
+    def llenar(self, r: tuple):
+        """Muestra la medición de un (origen, operación)"""
+        origen, operacion, m = r
+        promedio = m.total_ms / m.llamadas if m.llamadas else 0.0
+        textos = (origen, operacion, f"{m.llamadas}" + (f" ({m.errores} err)" if m.errores else ""),
+                  f"{promedio:.2f}", f"{m.percentil(0.95):.2f}", f"{m.max_ms:.2f}", str(m.filas),
+                  f"{m.total_ms:.0f}")
+        for lbl, texto in zip(self.etiquetas, textos):
+            lbl.configure(text=texto)
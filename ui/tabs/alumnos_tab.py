@@ -5,8 +5,15 @@ import customtkinter
 from tkinter import messagebox
 from models.alumno import AlumnoModel
 from ui.dialogs.dialogs import AlumnoDialog
+from ui.ejecutor import EjecutorConsultas
+from ui.busqueda_incremental import BusquedaIncremental
+from ui.widgets.lista_virtual import ListaVirtual
+from utils.paginacion import cargar_pagina
 from utils.theme import Colors, Styles
 
+# Pesos de las columnas: RUT, NOMBRE, CURSO, EN PODER, ACCIONES
+PESOS_COLUMNAS = (2, 4, 2, 2, 2)
+
 
 class AlumnosTab:
     """Construye y gestiona la pestaña de Alumnos"""
@@ -15,6 +22,8 @@ class AlumnosTab:
         self.parent = parent_tab
         self.alumno_model = alumno_model
         self.main_window = main_window
+        # Sin ventana principal (p. ej. pruebas manuales) las consultas se ejecutan en el momento
+        self.ejecutor = main_window.ejecutor if main_window else EjecutorConsultas(parent_tab, hilos=0)
         self.win_e_alumno = None
         self.win_n_alumno = None
         self.win_detalle = None
@@ -45,6 +54,9 @@ class AlumnosTab:
                                                   corner_radius=Styles.CORNER_RADIUS_BUTTON)
         self.entry_bus_a.pack(side="left", fill="x", expand=True, padx=Styles.PADDING_MD)
         self.entry_bus_a.bind("<Return>", lambda e: self.buscar_alumnos())
+        # Búsqueda mientras se escribe (con retardo y refinamiento en memoria)
+        self.busqueda = BusquedaIncremental(self.entry_bus_a, self.ejecutor, self._consultar_alumnos,
+                                            self._mostrar_alumnos, clave="buscar_alumnos")
         
         customtkinter.CTkButton(fa, text="🔎 Buscar", width=110, fg_color=Colors.INFO,
                                hover_color="#4291B5", text_color=Colors.TEXT_INVERSE,
@@ -64,11 +76,8 @@ class AlumnosTab:
                                    corner_radius=Styles.CORNER_RADIUS_SMALL)
         ha.pack(fill="x", padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_SM))
         ha.pack_propagate(False)
-        ha.grid_columnconfigure(0, weight=2)  # RUT
-        ha.grid_columnconfigure(1, weight=4)  # NOMBRE
-        ha.grid_columnconfigure(2, weight=2)  # CURSO
-        ha.grid_columnconfigure(3, weight=2)  # EN PODER
-        ha.grid_columnconfigure(4, weight=2)  # ACCIONES
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            ha.grid_columnconfigure(col, weight=peso, uniform="columnas")
         
         customtkinter.CTkLabel(ha, text="RUT", anchor="w", text_color=Colors.TEXT_INVERSE,
                               font=Styles.FONT_BOLD).grid(row=0, column=0, padx=Styles.PADDING_MD, sticky="w")
@@ -81,91 +90,27 @@ class AlumnosTab:
         customtkinter.CTkLabel(ha, text="ACCIONES", anchor="center", text_color=Colors.TEXT_INVERSE,
                               font=Styles.FONT_BOLD).grid(row=0, column=4, padx=Styles.PADDING_MD, sticky="e")
         
-        # --- ÁREA SCROLLABLE ---
-        self.scroll_alumnos = customtkinter.CTkScrollableFrame(self.parent, fg_color=Colors.BG_DARK)
-        self.scroll_alumnos.pack(fill="both", expand=True, padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_LG))
-        self.scroll_alumnos.grid_columnconfigure(0, weight=2)  # RUT
-        self.scroll_alumnos.grid_columnconfigure(1, weight=4)  # NOMBRE
-        self.scroll_alumnos.grid_columnconfigure(2, weight=2)  # CURSO
-        self.scroll_alumnos.grid_columnconfigure(3, weight=2)  # EN PODER
-        self.scroll_alumnos.grid_columnconfigure(4, weight=2)  # ACCIONES
+        # --- LISTA VIRTUAL (solo crea widgets para las filas visibles) ---
+        self.lista_alumnos = ListaVirtual(self.parent, lambda parent: FilaAlumno(parent, self))
+        self.lista_alumnos.pack(fill="both", expand=True, padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_LG))
     
     def buscar_alumnos(self):
-        """Busca alumnos según el término ingresado"""
-        for w in self.scroll_alumnos.winfo_children():
-            w.destroy()
-        
-        term = self.entry_bus_a.get()
-        rows = self.alumno_model.buscar_alumnos(term)
-        
-        if not rows:
-            msg = "👤 No se encontraron coincidencias." if term else "👤 No hay alumnos con préstamos activos."
-            customtkinter.CTkLabel(self.scroll_alumnos, text=msg, text_color=Colors.TEXT_SECONDARY,
-                                  font=Styles.FONT_REGULAR).pack(pady=Styles.PADDING_XL)
-            return
-        
-        for idx, r in enumerate(rows):
-            pid, rut, nom, cur, act = r
-            nom_trunc = (nom[:25] + '...') if len(nom) > 25 else nom
-
-            # Columna 0: RUT
-            customtkinter.CTkLabel(self.scroll_alumnos, text=str(rut), anchor="w",
-                                  text_color=Colors.TEXT_PRIMARY, font=Styles.FONT_REGULAR).grid(
-                row=idx, column=0, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w"
-            )
-            # Columna 1: NOMBRE
-            customtkinter.CTkLabel(self.scroll_alumnos, text=nom_trunc, anchor="w",
-                                  text_color=Colors.TEXT_PRIMARY, font=Styles.FONT_REGULAR).grid(
-                row=idx, column=1, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w"
-            )
-            # Columna 2: CURSO
-            customtkinter.CTkLabel(self.scroll_alumnos, text=str(cur) if cur else "-", anchor="w",
-                                  text_color=Colors.TEXT_SECONDARY, font=Styles.FONT_REGULAR).grid(
-                row=idx, column=2, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w"
-            )
-
-            # Columna 3: EN PODER (botón)
-            col_btn = Colors.WARNING if act > 0 else Colors.TEXT_TERTIARY
-            customtkinter.CTkButton(
-                self.scroll_alumnos,
-                text=f"📚 {act}",
-                fg_color=col_btn,
-                hover_color="#D9A820" if act > 0 else Colors.TEXT_TERTIARY,
-                text_color=Colors.TEXT_INVERSE,
-                corner_radius=Styles.CORNER_RADIUS_BUTTON,
-                height=32,
-                font=("Segoe UI", 11, "bold"),
-                command=lambda p=pid, n=nom: self.ver_libros_alumno(p, n)
-            ).grid(row=idx, column=3, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="ew")
-
-            # Columna 4: ACCIONES (contenedor con botones Editar y X)
-            acciones = customtkinter.CTkFrame(self.scroll_alumnos, fg_color="transparent")
-            acciones.grid(row=idx, column=4, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="e")
-
-            datos_edit = (rut, nom, cur)
-            customtkinter.CTkButton(
-                acciones,
-                text="✏️ Editar",
-                width=90,
-                fg_color=Colors.INFO,
-                hover_color="#4291B5",
-                text_color=Colors.TEXT_INVERSE,
-                corner_radius=Styles.CORNER_RADIUS_BUTTON,
-                height=32,
-                font=("Segoe UI", 11, "bold"),
-                command=lambda p=pid, d=datos_edit: self.abrir_editar_alumno(p, d)
-            ).pack(side="left", padx=Styles.PADDING_XS)
-            customtkinter.CTkButton(
-                acciones,
-                text="🗑️",
-                width=40,
-                fg_color=Colors.DANGER,
-                hover_color="#B02020",
-                text_color=Colors.TEXT_INVERSE,
-                corner_radius=Styles.CORNER_RADIUS_BUTTON,
-                height=32,
-                command=lambda p=pid, n=nom: self.eliminar_alumno(p, n)
-            ).pack(side="left", padx=Styles.PADDING_XS)
+        """Busca alumnos según el término ingresado, consultando siempre la BD"""
+        self.busqueda.buscar(forzar=True)
+    
+    def _consultar_alumnos(self, term: str):
+        """
+        Ejecuta la búsqueda de alumnos (hilo de trabajo), trayendo solo la primera página
+        Returns: (filas, refinador, continuar) - el refinador filtra estas filas para un
+                 término más largo y continuar carga la página siguiente
+        """
+        rows, continuar = cargar_pagina(self.alumno_model.buscar_alumnos_pagina, term)
+        return rows, (self.alumno_model.filtrar_alumnos if term else None), continuar
+    
+    def _mostrar_alumnos(self, rows, term: str, cargar_mas=None):
+        """Muestra los resultados en la lista; las páginas siguientes se cargan al hacer scroll"""
+        msg = "👤 No se encontraron coincidencias." if term else "👤 No hay alumnos con préstamos activos."
+        self.lista_alumnos.mostrar(rows, msg, cargar_mas=cargar_mas)
     
     def abrir_nuevo_alumno(self):
         """Abre el diálogo para crear un nuevo alumno"""
@@ -197,35 +142,127 @@ class AlumnosTab:
     
     def eliminar_alumno(self, id_prestatario: int, nombre: str):
         """Elimina un alumno de la base de datos"""
-        try:
-            if self.alumno_model.tiene_prestamos_activos(id_prestatario):
-                return messagebox.showerror("❌ Error", f"{nombre} tiene libros sin devolver.")
-            
-            if messagebox.askyesno("🗑️ Borrar", f"¿Eliminar a {nombre}?"):
-                self.alumno_model.eliminar_alumno(id_prestatario)
-                self.buscar_alumnos()
-                
-                # Actualizar dashboard
-                if self.main_window:
-                    self.main_window.refresh_dashboard()
-        except Exception as e:
-            messagebox.showerror("❌ Error", str(e))
+        self.ejecutor.enviar(self.alumno_model.tiene_prestamos_activos, id_prestatario,
+                             al_terminar=lambda activos: self._confirmar_eliminar_alumno(id_prestatario, nombre, activos),
+                             al_fallar=lambda e: messagebox.showerror("❌ Error", str(e)))
+    
+    def _confirmar_eliminar_alumno(self, id_prestatario: int, nombre: str, tiene_prestamos: bool):
+        """Pide confirmación y elimina al alumno si no tiene libros sin devolver"""
+        if tiene_prestamos:
+            return messagebox.showerror("❌ Error", f"{nombre} tiene libros sin devolver.")
+        
+        if messagebox.askyesno("🗑️ Borrar", f"¿Eliminar a {nombre}?"):
+            self.ejecutor.enviar(self.alumno_model.eliminar_alumno, id_prestatario,
+                                 al_terminar=lambda _: self._alumno_eliminado(),
+                                 al_fallar=lambda e: messagebox.showerror("❌ Error", str(e)))
+    
+    def _alumno_eliminado(self):
+        """Refresca la lista y el dashboard después de eliminar un alumno"""
+        self.buscar_alumnos()
+        
+        # Actualizar dashboard
+        if self.main_window:
+            self.main_window.refresh_dashboard()
     
     def ver_libros_alumno(self, id_prestatario: int, nombre_alumno: str):
         """Muestra los libros que un alumno tiene en poder"""
         if not self.win_detalle or not self.win_detalle.winfo_exists():
-            self.win_detalle = DetalleLibrosWindow(self.parent, id_prestatario, nombre_alumno, self.alumno_model)
+            self.win_detalle = DetalleLibrosWindow(self.parent, id_prestatario, nombre_alumno,
+                                                   self.alumno_model, self.ejecutor)
         else:
             self.win_detalle.focus()
 
 
+class FilaAlumno:
+    """Fila reutilizable de la lista de alumnos (se vuelve a llenar al hacer scroll)"""
+    
+    def __init__(self, parent, tab: AlumnosTab):
+        self.tab = tab
+        self.frame = customtkinter.CTkFrame(parent, fg_color="transparent")
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            self.frame.grid_columnconfigure(col, weight=peso, uniform="columnas")
+        
+        # Columna 0: RUT
+        self.lbl_rut = customtkinter.CTkLabel(self.frame, anchor="w", text_color=Colors.TEXT_PRIMARY,
+                                              font=Styles.FONT_REGULAR)
+        self.lbl_rut.grid(row=0, column=0, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w")
+        # Columna 1: NOMBRE
+        self.lbl_nombre = customtkinter.CTkLabel(self.frame, anchor="w", text_color=Colors.TEXT_PRIMARY,
+                                                 font=Styles.FONT_REGULAR)
+        self.lbl_nombre.grid(row=0, column=1, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w")
+        # Columna 2: CURSO
+        self.lbl_curso = customtkinter.CTkLabel(self.frame, anchor="w", text_color=Colors.TEXT_SECONDARY,
+                                                font=Styles.FONT_REGULAR)
+        self.lbl_curso.grid(row=0, column=2, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w")
+        
+        # Columna 3: EN PODER (botón)
+        self.btn_en_poder = customtkinter.CTkButton(
+            self.frame,
+            text_color=Colors.TEXT_INVERSE,
+            corner_radius=Styles.CORNER_RADIUS_BUTTON,
+            height=32,
+            font=("Segoe UI", 11, "bold")
+        )
+        self.btn_en_poder.grid(row=0, column=3, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="ew")
+        
+        # Columna 4: ACCIONES (contenedor con botones Editar y X)
+        acciones = customtkinter.CTkFrame(self.frame, fg_color="transparent")
+        acciones.grid(row=0, column=4, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="e")
+        
+        self.btn_editar = customtkinter.CTkButton(
+            acciones,
+            text="✏️ Editar",
+            width=90,
+            fg_color=Colors.INFO,
+            hover_color="#4291B5",
+            text_color=Colors.TEXT_INVERSE,
+            corner_radius=Styles.CORNER_RADIUS_BUTTON,
+            height=32,
+            font=("Segoe UI", 11, "bold")
+        )
+        self.btn_editar.pack(side="left", padx=Styles.PADDING_XS)
+        self.btn_eliminar = customtkinter.CTkButton(
+            acciones,
+            text="🗑️",
+            width=40,
+            fg_color=Colors.DANGER,
+            hover_color="#B02020",
+            text_color=Colors.TEXT_INVERSE,
+            corner_radius=Styles.CORNER_RADIUS_BUTTON,
+            height=32
+        )
+        self.btn_eliminar.pack(side="left", padx=Styles.PADDING_XS)
+    
+    def llenar(self, r: tuple):
+        """Muestra los datos de un alumno en la fila"""
+        pid, rut, nom, cur, act = r
+        nom_trunc = (nom[:25] + '...') if len(nom) > 25 else nom
+        
+        self.lbl_rut.configure(text=str(rut))
+        self.lbl_nombre.configure(text=nom_trunc)
+        self.lbl_curso.configure(text=str(cur) if cur else "-")
+        
+        col_btn = Colors.WARNING if act > 0 else Colors.TEXT_TERTIARY
+        self.btn_en_poder.configure(
+            text=f"📚 {act}",
+            fg_color=col_btn,
+            hover_color="#D9A820" if act > 0 else Colors.TEXT_TERTIARY,
+            command=lambda p=pid, n=nom: self.tab.ver_libros_alumno(p, n)
+        )
+        
+        datos_edit = (rut, nom, cur)
+        self.btn_editar.configure(command=lambda p=pid, d=datos_edit: self.tab.abrir_editar_alumno(p, d))
+        self.btn_eliminar.configure(command=lambda p=pid, n=nom: self.tab.eliminar_alumno(p, n))
+
+
 class DetalleLibrosWindow(customtkinter.CTkToplevel):
     """Ventana que muestra los libros en poder de un alumno"""
     
-    def __init__(self, master, id_prestatario: int, nombre_alumno: str, alumno_model: AlumnoModel):
+    def __init__(self, master, id_prestatario: int, nombre_alumno: str, alumno_model: AlumnoModel,
+                 ejecutor: EjecutorConsultas):
         super().__init__(master)
         self.title(f"📚 Libros en poder de: {nombre_alumno}")
-        self.geometry("700x450")
+        self.geometry("820x450")
         self.transient(master)
         
         # Configurar fondo con tema
@@ -251,20 +288,22 @@ class DetalleLibrosWindow(customtkinter.CTkToplevel):
         )
         self.textbox.pack(fill="both", expand=True, padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_LG))
         
-        self._cargar_libros(id_prestatario, alumno_model)
+        ejecutor.enviar(alumno_model.obtener_libros_en_poder, id_prestatario,
+                        al_terminar=self._mostrar_libros, clave="detalle_alumno")
     
-    def _cargar_libros(self, id_prestatario: int, alumno_model: AlumnoModel):
-        """Carga y muestra los libros del alumno"""
-        rows = alumno_model.obtener_libros_en_poder(id_prestatario)
+    def _mostrar_libros(self, rows):
+        """Muestra los libros del alumno"""
+        if not self.winfo_exists():
+            return
         
         if not rows:
             self.textbox.insert("1.0", "Este alumno no tiene libros pendientes.")
         else:
-            header = f"{'ISBN':<15} | {'TÍTULO':<40} | {'FECHA PRESTAMO':<15}\n" + ("-"*75) + "\n"
+            header = f"{'EJEMPLAR':<12} | {'ISBN':<15} | {'TÍTULO':<40} | {'FECHA PRESTAMO':<15}\n" + ("-"*90) + "\n"
             self.textbox.insert("1.0", header)
             for r in rows:
-                isbn, titulo, autor, fecha = r
+                isbn, titulo, autor, fecha, codigo = r
                 titulo_trunc = (titulo[:37]+'..') if len(titulo)>40 else titulo
-                self.textbox.insert("end", f"{isbn:<15} | {titulo_trunc:<40} | {fecha:<15}\n")
+                self.textbox.insert("end", f"{codigo or '-':<12} | {isbn:<15} | {titulo_trunc:<40} | {fecha:<15}\n")
         
         self.textbox.configure(state="disabled")
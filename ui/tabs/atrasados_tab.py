@@ -0,0 +1,98 @@
+"""
+Pestaña de Atrasados - Préstamos cuya fecha de devolución ya pasó
+"""
+import customtkinter
+from models.atraso import AtrasoModel
+from ui.ejecutor import EjecutorConsultas
+from ui.widgets.lista_virtual import ListaVirtual
+from utils.theme import Colors, Styles
+
+# Pesos de las columnas: TÍTULO, ALUMNO, CURSO, ENTREGA, VENCIMIENTO, DÍAS
+PESOS_COLUMNAS = (4, 4, 2, 2, 2, 1)
+
+
+class AtrasadosTab:
+    """Construye y gestiona la pestaña de préstamos atrasados"""
+
+    def __init__(self, parent_tab, atraso_model: AtrasoModel, main_window=None):
+        self.parent = parent_tab
+        self.atraso_model = atraso_model
+        self.main_window = main_window
+        # Sin ventana principal (p. ej. pruebas manuales) las consultas se ejecutan en el momento
+        self.ejecutor = main_window.ejecutor if main_window else EjecutorConsultas(parent_tab, hilos=0)
+        self.parent.configure(fg_color=Colors.BG_DARK)
+
+        self._build_ui()
+        self.cargar_atrasados()  # Cargar inicial
+
+    def _build_ui(self):
+        """Construye la interfaz de la pestaña"""
+        # --- BARRA SUPERIOR ---
+        fa = customtkinter.CTkFrame(self.parent, fg_color=Colors.BG_SECONDARY,
+                                   corner_radius=Styles.CORNER_RADIUS_LARGE,
+                                   border_width=Styles.BORDER_WIDTH_THIN,
+                                   border_color=Colors.BORDER_LIGHT)
+        fa.pack(fill="x", padx=Styles.PADDING_LG, pady=Styles.PADDING_LG)
+
+        self.lbl_resumen = customtkinter.CTkLabel(fa, text="⏰ Préstamos atrasados", text_color=Colors.TEXT_PRIMARY,
+                                                  font=Styles.FONT_BOLD)
+        self.lbl_resumen.pack(side="left", padx=Styles.PADDING_LG, pady=Styles.PADDING_MD)
+        customtkinter.CTkButton(fa, text="🔄 Actualizar", width=130, fg_color=Colors.INFO,
+                               hover_color="#4291B5", text_color=Colors.TEXT_INVERSE,
+                               height=Styles.BUTTON_HEIGHT_MD,
+                               corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                               font=Styles.FONT_BOLD,
+                               command=self.cargar_atrasados).pack(side="right", padx=Styles.PADDING_LG)
+
+        # --- CABECERA ---
+        ha = customtkinter.CTkFrame(self.parent, height=40, fg_color=Colors.DANGER,
+                                   corner_radius=Styles.CORNER_RADIUS_SMALL)
+        ha.pack(fill="x", padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_SM))
+        ha.pack_propagate(False)
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            ha.grid_columnconfigure(col, weight=peso, uniform="columnas")
+
+        for col, texto in enumerate(("TÍTULO", "ALUMNO", "CURSO", "ENTREGA", "VENCIMIENTO", "DÍAS")):
+            customtkinter.CTkLabel(ha, text=texto, anchor="w", text_color=Colors.TEXT_INVERSE,
+                                  font=Styles.FONT_BOLD).grid(row=0, column=col, padx=Styles.PADDING_MD, sticky="w")
+
+        # --- LISTA VIRTUAL (solo crea widgets para las filas visibles) ---
+        self.lista_atrasados = ListaVirtual(self.parent, FilaAtraso)
+        self.lista_atrasados.pack(fill="both", expand=True, padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_LG))
+
+    def cargar_atrasados(self):
+        """Carga la lista de atrasados en segundo plano (se recalcula una vez al día)"""
+        self.ejecutor.enviar(self.atraso_model.obtener_atrasados, al_terminar=self._mostrar_atrasados,
+                             clave="atrasados")
+
+    def _mostrar_atrasados(self, rows):
+        """Muestra los atrasados y actualiza la tarjeta del dashboard"""
+        self.lbl_resumen.configure(text=f"⏰ Préstamos atrasados: {len(rows)}")
+        self.lista_atrasados.mostrar(rows, "✅ No hay préstamos atrasados.")
+        if self.main_window:
+            self.main_window.mostrar_atrasados(len(rows))
+
+
+class FilaAtraso:
+    """Fila reutilizable de la lista de atrasados (se vuelve a llenar al hacer scroll)"""
+
+    def __init__(self, parent):
+        self.frame = customtkinter.CTkFrame(parent, fg_color="transparent")
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            self.frame.grid_columnconfigure(col, weight=peso, uniform="columnas")
+
+        self.etiquetas = []
+        for col in range(len(PESOS_COLUMNAS)):
+            color = Colors.DANGER if col == len(PESOS_COLUMNAS) - 1 else Colors.TEXT_PRIMARY
+            lbl = customtkinter.CTkLabel(self.frame, anchor="w", text_color=color, font=Styles.FONT_REGULAR)
+            lbl.grid(row=0, column=col, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w")
+            self.etiquetas.append(lbl)
+
+    def llenar(self, r: tuple):
+        """Muestra los datos de un préstamo atrasado en la fila"""
+        _, titulo, _, nombre, rut, curso, entrega, vencimiento, dias = r
+        titulo_trunc = (titulo[:30] + '...') if len(titulo) > 30 else titulo
+        nombre_trunc = (nombre[:25] + '...') if len(nombre) > 25 else nombre
+        textos = (titulo_trunc, f"{nombre_trunc} ({rut})", curso or "-", entrega, vencimiento, str(dias))
+        for lbl, texto in zip(self.etiquetas, textos):
+            lbl.configure(text=texto)
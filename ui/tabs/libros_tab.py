@@ -2,11 +2,18 @@
 Pestaña de Libros - Interfaz para gestionar el catálogo de libros
 """
 import customtkinter
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 from models.libro import LibroModel
 from ui.dialogs.dialogs import LibroDialog
+from ui.ejecutor import EjecutorConsultas
+from ui.busqueda_incremental import BusquedaIncremental
+from utils.paginacion import cargar_pagina
+from ui.widgets.lista_virtual import ListaVirtual
 from utils.theme import Colors, Styles
 
+# Pesos de las columnas: ISBN, TÍTULO, AUTOR, DISP/TOT, ACCIONES
+PESOS_COLUMNAS = (2, 5, 4, 1, 2)
+
 
 class LibrosTab:
     """Construye y gestiona la pestaña de Libros"""
@@ -15,6 +22,8 @@ class LibrosTab:
         self.parent = parent_tab
         self.libro_model = libro_model
         self.main_window = main_window
+        # Sin ventana principal (p. ej. pruebas manuales) las consultas se ejecutan en el momento
+        self.ejecutor = main_window.ejecutor if main_window else EjecutorConsultas(parent_tab, hilos=0)
         self.win_e_libro = None
         self.win_n_libro = None
         self.parent.configure(fg_color=Colors.BG_DARK)
@@ -43,6 +52,9 @@ class LibrosTab:
                                                   corner_radius=Styles.CORNER_RADIUS_BUTTON)
         self.entry_bus_l.pack(side="left", fill="x", expand=True, padx=Styles.PADDING_MD)
         self.entry_bus_l.bind("<Return>", lambda e: self.buscar_libros())
+        # Búsqueda mientras se escribe (con retardo y refinamiento en memoria)
+        self.busqueda = BusquedaIncremental(self.entry_bus_l, self.ejecutor, self._consultar_libros,
+                                            self._mostrar_libros, clave="buscar_libros")
         
         customtkinter.CTkButton(fl, text="🔎 Buscar", width=110, fg_color=Colors.PRIMARY,
                                hover_color=Colors.PRIMARY_LIGHT, text_color=Colors.TEXT_INVERSE,
@@ -56,17 +68,20 @@ class LibrosTab:
                                corner_radius=Styles.CORNER_RADIUS_BUTTON,
                                font=Styles.FONT_BOLD,
                                command=self.abrir_nuevo_libro).pack(side="right", padx=Styles.PADDING_LG)
+        customtkinter.CTkButton(fl, text="📥 Importar", width=110, fg_color=Colors.INFO,
+                               hover_color="#4291B5", text_color=Colors.TEXT_INVERSE,
+                               height=Styles.BUTTON_HEIGHT_MD,
+                               corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                               font=Styles.FONT_BOLD,
+                               command=self.importar_catalogo).pack(side="right", padx=Styles.PADDING_SM)
         
         # --- CABECERA ---
         hl = customtkinter.CTkFrame(self.parent, height=40, fg_color=Colors.PRIMARY,
                                    corner_radius=Styles.CORNER_RADIUS_SMALL)
         hl.pack(fill="x", padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_SM))
         hl.pack_propagate(False)
-        hl.grid_columnconfigure(0, weight=2)  # ISBN
-        hl.grid_columnconfigure(1, weight=5)  # TÍTULO
-        hl.grid_columnconfigure(2, weight=4)  # AUTOR
-        hl.grid_columnconfigure(3, weight=1)  # DISP/TOT
-        hl.grid_columnconfigure(4, weight=2)  # ACCIONES
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            hl.grid_columnconfigure(col, weight=peso, uniform="columnas")
         
         customtkinter.CTkLabel(hl, text="ISBN", anchor="w", text_color=Colors.TEXT_INVERSE,
                               font=Styles.FONT_BOLD).grid(row=0, column=0, padx=Styles.PADDING_MD, sticky="w")
@@ -79,69 +94,37 @@ class LibrosTab:
         customtkinter.CTkLabel(hl, text="ACCIONES", anchor="center", text_color=Colors.TEXT_INVERSE,
                               font=Styles.FONT_BOLD).grid(row=0, column=4, padx=Styles.PADDING_MD, sticky="e")
         
-        # --- ÁREA SCROLLABLE ---
-        self.scroll_libros = customtkinter.CTkScrollableFrame(self.parent, fg_color=Colors.BG_DARK)
-        self.scroll_libros.pack(fill="both", expand=True, padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_LG))
-        self.scroll_libros.grid_columnconfigure(0, weight=2)
-        self.scroll_libros.grid_columnconfigure(1, weight=5)
-        self.scroll_libros.grid_columnconfigure(2, weight=4)
-        self.scroll_libros.grid_columnconfigure(3, weight=1)
-        self.scroll_libros.grid_columnconfigure(4, weight=2)
+        # --- LISTA VIRTUAL (solo crea widgets para las filas visibles) ---
+        self.lista_libros = ListaVirtual(self.parent, lambda parent: FilaLibro(parent, self))
+        self.lista_libros.pack(fill="both", expand=True, padx=Styles.PADDING_LG, pady=(0, Styles.PADDING_LG))
     
     def buscar_libros(self):
-        """Busca libros según el término ingresado"""
-        for w in self.scroll_libros.winfo_children():
-            w.destroy()
-        
-        term = self.entry_bus_l.get()
-        rows = self.libro_model.buscar_libros(term)
-        
-        if not rows:
-            msg = "📭 No se encontraron coincidencias." if term else "📭 No hay libros con préstamos activos."
-            customtkinter.CTkLabel(self.scroll_libros, text=msg, text_color=Colors.TEXT_SECONDARY,
-                                  font=Styles.FONT_REGULAR).pack(pady=Styles.PADDING_XL)
-            return
+        """Busca libros según el término ingresado, consultando siempre la BD"""
+        self.busqueda.buscar(forzar=True)
+    
+    def _consultar_libros(self, term: str):
+        """
+        Ejecuta la búsqueda de libros (hilo de trabajo), trayendo solo la primera página
+        Returns: (filas, refinador, continuar) - el refinador filtra estas filas para un
+                 término más largo y continuar carga la página siguiente
+        """
+        if not term:
+            rows, continuar = cargar_pagina(self.libro_model.buscar_libros_pagina, term)
+            return rows, None, continuar
         
-        for idx, r in enumerate(rows):
-            lid, isbn, tit, aut, edit, anio, cat, tot, disp = r
-            
-            tit_trunc = (tit[:35] + '...') if len(tit) > 35 else tit
-            aut_trunc = (aut[:25] + '...') if len(aut) > 25 else aut
-            
-            # Colores según disponibilidad
-            color_text = Colors.TEXT_PRIMARY if disp > 0 else Colors.WARNING
-            
-            customtkinter.CTkLabel(self.scroll_libros, text=str(isbn), anchor="w", 
-                                  text_color=color_text, font=Styles.FONT_REGULAR).grid(
-                row=idx, column=0, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w"
-            )
-            customtkinter.CTkLabel(self.scroll_libros, text=tit_trunc, anchor="w", 
-                                  text_color=color_text, font=Styles.FONT_REGULAR).grid(
-                row=idx, column=1, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w"
-            )
-            customtkinter.CTkLabel(self.scroll_libros, text=aut_trunc, anchor="w", 
-                                  text_color=Colors.TEXT_SECONDARY, font=Styles.FONT_REGULAR).grid(
-                row=idx, column=2, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w"
-            )
-            customtkinter.CTkLabel(self.scroll_libros, text=f"{disp}/{tot}", anchor="center",
-                                  text_color=color_text, font=Styles.FONT_BOLD).grid(
-                row=idx, column=3, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="ew"
-            )
-            
-            frame_acciones = customtkinter.CTkFrame(self.scroll_libros, fg_color="transparent")
-            frame_acciones.grid(row=idx, column=4, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="e")
-            
-            datos_para_editar = (isbn, tit, aut, edit, anio, cat)
-            customtkinter.CTkButton(frame_acciones, text="✏️ Editar", width=90, fg_color=Colors.PRIMARY,
-                                   hover_color=Colors.PRIMARY_LIGHT, text_color=Colors.TEXT_INVERSE,
-                                   corner_radius=Styles.CORNER_RADIUS_BUTTON,
-                                   height=32, font=("Segoe UI", 11, "bold"),
-                                   command=lambda i=lid, d=datos_para_editar: self.abrir_editar_libro(i, d)).pack(side="left", padx=Styles.PADDING_XS)
-            customtkinter.CTkButton(frame_acciones, text="🗑️", width=40, fg_color=Colors.DANGER,
-                                   hover_color="#B02020", text_color=Colors.TEXT_INVERSE,
-                                   corner_radius=Styles.CORNER_RADIUS_BUTTON,
-                                   height=32,
-                                   command=lambda i=lid, t=tit: self.eliminar_libro(i, t)).pack(side="left", padx=Styles.PADDING_XS)
+        # Búsqueda por palabras con el índice de texto completo; si no hay
+        # coincidencias se intenta la búsqueda por fragmento (LIKE)
+        if self.libro_model.fts_disponible():
+            rows, continuar = cargar_pagina(self.libro_model.buscar_libros_fts_pagina, term)
+            if rows:
+                return rows, lambda filas, t: self.libro_model.filtrar_libros_fts(filas, t) or None, continuar
+        rows, continuar = cargar_pagina(self.libro_model.buscar_libros_pagina, term)
+        return rows, self.libro_model.filtrar_libros, continuar
+    
+    def _mostrar_libros(self, rows, term: str, cargar_mas=None):
+        """Muestra los resultados en la lista; las páginas siguientes se cargan al hacer scroll"""
+        msg = "📭 No se encontraron coincidencias." if term else "📭 No hay libros con préstamos activos."
+        self.lista_libros.mostrar(rows, msg, cargar_mas=cargar_mas)
     
     def abrir_nuevo_libro(self):
         """Abre el diálogo para crear un nuevo libro"""
@@ -203,18 +186,103 @@ class LibrosTab:
             messagebox.showerror("Error", str(e))
             return False
     
+    def importar_catalogo(self):
+        """Carga masiva de libros desde un Excel o CSV (en segundo plano)"""
+        archivo = filedialog.askopenfilename(
+            title="Importar catálogo",
+            filetypes=[("Excel o CSV", "*.xlsx *.csv"), ("Excel", "*.xlsx"), ("CSV", "*.csv")]
+        )
+        if not archivo:
+            return
+        from utils.import_libros import importar_libros  # openpyxl se carga solo al importar
+        self.ejecutor.enviar(importar_libros, archivo, self.libro_model.db,
+                             al_terminar=self._catalogo_importado,
+                             al_fallar=lambda e: messagebox.showerror("Error", str(e)))
+    
+    def _catalogo_importado(self, resultado):
+        """Informa el resultado de la importación y refresca la lista y el dashboard"""
+        nuevos, sumados, invalidos = resultado
+        messagebox.showinfo("Ok", f"Libros nuevos: {nuevos}\n"
+                                  f"Libros existentes con ejemplares sumados: {sumados}\n"
+                                  f"Filas inválidas (sin ISBN válido o título): {invalidos}")
+        self.buscar_libros()
+        
+        # Actualizar dashboard
+        if self.main_window:
+            self.main_window.refresh_dashboard()
+    
     def eliminar_libro(self, id_libro: int, titulo: str):
         """Elimina un libro de la base de datos"""
-        try:
-            if self.libro_model.tiene_prestamos_activos(id_libro):
-                return messagebox.showerror("Error", f"'{titulo}' tiene préstamos activos.")
-            
-            if messagebox.askyesno("🗑️ Borrar", f"¿Eliminar '{titulo}'?"):
-                self.libro_model.eliminar_libro(id_libro)
-                self.buscar_libros()
-                
-                # Actualizar dashboard
-                if self.main_window:
-                    self.main_window.refresh_dashboard()
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        self.ejecutor.enviar(self.libro_model.tiene_prestamos_activos, id_libro,
+                             al_terminar=lambda activos: self._confirmar_eliminar_libro(id_libro, titulo, activos),
+                             al_fallar=lambda e: messagebox.showerror("Error", str(e)))
+    
+    def _confirmar_eliminar_libro(self, id_libro: int, titulo: str, tiene_prestamos: bool):
+        """Pide confirmación y elimina el libro si no tiene préstamos activos"""
+        if tiene_prestamos:
+            return messagebox.showerror("Error", f"'{titulo}' tiene préstamos activos.")
+        
+        if messagebox.askyesno("🗑️ Borrar", f"¿Eliminar '{titulo}'?"):
+            self.ejecutor.enviar(self.libro_model.eliminar_libro, id_libro,
+                                 al_terminar=lambda _: self._libro_eliminado(),
+                                 al_fallar=lambda e: messagebox.showerror("Error", str(e)))
+    
+    def _libro_eliminado(self):
+        """Refresca la lista y el dashboard después de eliminar un libro"""
+        self.buscar_libros()
+        
+        # Actualizar dashboard
+        if self.main_window:
+            self.main_window.refresh_dashboard()
+
+
+class FilaLibro:
+    """Fila reutilizable de la lista de libros (se vuelve a llenar al hacer scroll)"""
+    
+    def __init__(self, parent, tab: LibrosTab):
+        self.tab = tab
+        self.frame = customtkinter.CTkFrame(parent, fg_color="transparent")
+        for col, peso in enumerate(PESOS_COLUMNAS):
+            self.frame.grid_columnconfigure(col, weight=peso, uniform="columnas")
+        
+        self.lbl_isbn = customtkinter.CTkLabel(self.frame, anchor="w", font=Styles.FONT_REGULAR)
+        self.lbl_isbn.grid(row=0, column=0, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w")
+        self.lbl_titulo = customtkinter.CTkLabel(self.frame, anchor="w", font=Styles.FONT_REGULAR)
+        self.lbl_titulo.grid(row=0, column=1, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w")
+        self.lbl_autor = customtkinter.CTkLabel(self.frame, anchor="w", text_color=Colors.TEXT_SECONDARY,
+                                                font=Styles.FONT_REGULAR)
+        self.lbl_autor.grid(row=0, column=2, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="w")
+        self.lbl_disp = customtkinter.CTkLabel(self.frame, anchor="center", font=Styles.FONT_BOLD)
+        self.lbl_disp.grid(row=0, column=3, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="ew")
+        
+        frame_acciones = customtkinter.CTkFrame(self.frame, fg_color="transparent")
+        frame_acciones.grid(row=0, column=4, padx=Styles.PADDING_MD, pady=Styles.PADDING_SM, sticky="e")
+        self.btn_editar = customtkinter.CTkButton(frame_acciones, text="✏️ Editar", width=90, fg_color=Colors.PRIMARY,
+                                                  hover_color=Colors.PRIMARY_LIGHT, text_color=Colors.TEXT_INVERSE,
+                                                  corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                                                  height=32, font=("Segoe UI", 11, "bold"))
+        self.btn_editar.pack(side="left", padx=Styles.PADDING_XS)
+        self.btn_eliminar = customtkinter.CTkButton(frame_acciones, text="🗑️", width=40, fg_color=Colors.DANGER,
+                                                    hover_color="#B02020", text_color=Colors.TEXT_INVERSE,
+                                                    corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                                                    height=32)
+        self.btn_eliminar.pack(side="left", padx=Styles.PADDING_XS)
+    
+    def llenar(self, r: tuple):
+        """Muestra los datos de un libro en la fila"""
+        lid, isbn, tit, aut, edit, anio, cat, tot, disp = r
+        
+        tit_trunc = (tit[:35] + '...') if len(tit) > 35 else tit
+        aut_trunc = (aut[:25] + '...') if len(aut) > 25 else aut
+        
+        # Colores según disponibilidad
+        color_text = Colors.TEXT_PRIMARY if disp > 0 else Colors.WARNING
+        
+        self.lbl_isbn.configure(text=str(isbn), text_color=color_text)
+        self.lbl_titulo.configure(text=tit_trunc, text_color=color_text)
+        self.lbl_autor.configure(text=aut_trunc)
+        self.lbl_disp.configure(text=f"{disp}/{tot}", text_color=color_text)
+        
+        datos_para_editar = (isbn, tit, aut, edit, anio, cat)
+        self.btn_editar.configure(command=lambda i=lid, d=datos_para_editar: self.tab.abrir_editar_libro(i, d))
+        self.btn_eliminar.configure(command=lambda i=lid, t=tit: self.tab.eliminar_libro(i, t))
@@ -6,6 +6,10 @@ from tkinter import messagebox
 from models.libro import LibroModel
 from models.alumno import AlumnoModel
 from models.transaccion import TransaccionModel
+from ui.ejecutor import EjecutorConsultas
+from ui.escaner import DetectorEscaner
+from ui.dialogs.dialogs import PrestamoCursoDialog
+from utils.config import ESCANER_LOTE_ESPERA_MS
 from utils.theme import Colors, Styles
 
 
@@ -19,7 +23,14 @@ class PrestamosTab:
         self.alumno_model = alumno_model
         self.transaccion_model = transaccion_model
         self.main_window = main_window
+        # Sin ventana principal (p. ej. pruebas manuales) las consultas se ejecutan en el momento
+        self.ejecutor = main_window.ejecutor if main_window else EjecutorConsultas(parent_tab, hilos=0)
         self.parent.configure(fg_color=Colors.BG_DARK)
+        # ISBNs leídos con el escáner que esperan registrarse juntos, y el RUT de su primera lectura
+        self._lote = []
+        self._lote_rut = None
+        self._lote_programado = None
+        self.win_curso = None
         
         self._build_ui()
     
@@ -51,6 +62,7 @@ class PrestamosTab:
                                                   height=Styles.BUTTON_HEIGHT_MD,
                                                   corner_radius=Styles.CORNER_RADIUS_BUTTON)
         self.entry_p_rut.grid(row=2, column=1, sticky="ew", padx=Styles.PADDING_LG, pady=Styles.PADDING_SM)
+        self.entry_p_rut.bind("<KeyRelease>", self._rut_cambiado, add="+")
         
         customtkinter.CTkLabel(fp, text="ISBN/Título:", text_color=Colors.TEXT_PRIMARY,
                               font=Styles.FONT_REGULAR).grid(row=3, column=0, sticky="w", padx=Styles.PADDING_LG)
@@ -64,12 +76,26 @@ class PrestamosTab:
                                                    corner_radius=Styles.CORNER_RADIUS_BUTTON)
         self.entry_p_isbn.grid(row=3, column=1, sticky="ew", padx=Styles.PADDING_LG, pady=Styles.PADDING_SM)
         
-        customtkinter.CTkButton(fp, text="✓ CONFIRMAR PRÉSTAMO", fg_color=Colors.SECONDARY,
-                               hover_color=Colors.SECONDARY_LIGHT, text_color=Colors.TEXT_INVERSE,
-                               height=Styles.BUTTON_HEIGHT_LG, corner_radius=Styles.CORNER_RADIUS_BUTTON,
-                               font=Styles.FONT_BOLD, border_width=0,
-                               command=self.realizar_prestamo).grid(row=4, columnspan=2, pady=Styles.PADDING_XL, 
-                                                                    padx=Styles.PADDING_LG, sticky="ew")
+        self.btn_prestamo = customtkinter.CTkButton(fp, text="✓ CONFIRMAR PRÉSTAMO", fg_color=Colors.SECONDARY,
+                                                    hover_color=Colors.SECONDARY_LIGHT, text_color=Colors.TEXT_INVERSE,
+                                                    height=Styles.BUTTON_HEIGHT_LG, corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                                                    font=Styles.FONT_BOLD, border_width=0,
+                                                    command=self.realizar_prestamo)
+        self.btn_prestamo.grid(row=4, columnspan=2, pady=(Styles.PADDING_XL, Styles.PADDING_SM),
+                               padx=Styles.PADDING_LG, sticky="ew")
+        customtkinter.CTkButton(fp, text="👥 Prestar a curso", fg_color=Colors.BG_TERTIARY,
+                               hover_color=Colors.BG_LIGHT, text_color=Colors.SECONDARY,
+                               height=Styles.BUTTON_HEIGHT_MD, corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                               font=Styles.FONT_BOLD, border_width=Styles.BORDER_WIDTH_THIN,
+                               border_color=Colors.SECONDARY,
+                               command=self.abrir_prestamo_curso).grid(row=5, columnspan=2, padx=Styles.PADDING_LG,
+                                                                      pady=Styles.PADDING_SM, sticky="ew")
+        
+        self.lbl_estado_p = customtkinter.CTkLabel(fp, text="", text_color=Colors.TEXT_SECONDARY,
+                                                   font=Styles.FONT_REGULAR, wraplength=380, justify="left")
+        self.lbl_estado_p.grid(row=6, columnspan=2, padx=Styles.PADDING_LG, sticky="w")
+        # Con el escáner cada lectura se agrega al lote del alumno; Enter a mano confirma como el botón
+        self.escaner_p = DetectorEscaner(self.entry_p_isbn, self._isbn_escaneado, self.realizar_prestamo)
         
         # --- SEPARADOR ---
         customtkinter.CTkFrame(self.parent, width=2, fg_color=Colors.BORDER_LIGHT).grid(row=0, column=1, sticky="ns", pady=40)
@@ -86,7 +112,7 @@ class PrestamosTab:
         
         customtkinter.CTkLabel(fd, text="ISBN/Título:", text_color=Colors.TEXT_PRIMARY,
                               font=Styles.FONT_REGULAR).grid(row=2, column=0, sticky="w", padx=Styles.PADDING_LG)
-        self.entry_d_isbn = customtkinter.CTkEntry(fd, placeholder_text="Libro a devolver...",
+        self.entry_d_isbn = customtkinter.CTkEntry(fd, placeholder_text="Código de ejemplar, ISBN o título...",
                                                    fg_color=Colors.BG_TERTIARY,
                                                    border_color=Colors.BORDER_ACCENT,
                                                    border_width=Styles.BORDER_WIDTH_MEDIUM,
@@ -96,12 +122,31 @@ class PrestamosTab:
                                                    corner_radius=Styles.CORNER_RADIUS_BUTTON)
         self.entry_d_isbn.grid(row=2, column=1, sticky="ew", padx=Styles.PADDING_LG, pady=Styles.PADDING_SM)
         
-        customtkinter.CTkButton(fd, text="✓ CONFIRMAR DEVOLUCIÓN", fg_color=Colors.PRIMARY,
-                               hover_color=Colors.PRIMARY_LIGHT, text_color=Colors.TEXT_INVERSE,
-                               height=Styles.BUTTON_HEIGHT_LG, corner_radius=Styles.CORNER_RADIUS_BUTTON,
-                               font=Styles.FONT_BOLD, border_width=0,
-                               command=self.realizar_devolucion).grid(row=4, columnspan=2, pady=Styles.PADDING_XL, 
-                                                                      padx=Styles.PADDING_LG, sticky="ew")
+        # Solo hace falta si el libro (por ISBN o título) tiene varios préstamos activos
+        customtkinter.CTkLabel(fd, text="RUT (opcional):", text_color=Colors.TEXT_PRIMARY,
+                              font=Styles.FONT_REGULAR).grid(row=3, column=0, sticky="w", padx=Styles.PADDING_LG)
+        self.entry_d_rut = customtkinter.CTkEntry(fd, placeholder_text="Alumno que devuelve",
+                                                  fg_color=Colors.BG_TERTIARY,
+                                                  border_color=Colors.BORDER_ACCENT,
+                                                  border_width=Styles.BORDER_WIDTH_MEDIUM,
+                                                  text_color=Colors.TEXT_PRIMARY,
+                                                  placeholder_text_color=Colors.TEXT_TERTIARY,
+                                                  height=Styles.BUTTON_HEIGHT_MD,
+                                                  corner_radius=Styles.CORNER_RADIUS_BUTTON)
+        self.entry_d_rut.grid(row=3, column=1, sticky="ew", padx=Styles.PADDING_LG, pady=Styles.PADDING_SM)
+        
+        self.btn_devolucion = customtkinter.CTkButton(fd, text="✓ CONFIRMAR DEVOLUCIÓN", fg_color=Colors.PRIMARY,
+                                                      hover_color=Colors.PRIMARY_LIGHT, text_color=Colors.TEXT_INVERSE,
+                                                      height=Styles.BUTTON_HEIGHT_LG, corner_radius=Styles.CORNER_RADIUS_BUTTON,
+                                                      font=Styles.FONT_BOLD, border_width=0,
+                                                      command=self.realizar_devolucion)
+        self.btn_devolucion.grid(row=4, columnspan=2, pady=Styles.PADDING_XL, padx=Styles.PADDING_LG, sticky="ew")
+        
+        self.lbl_estado_d = customtkinter.CTkLabel(fd, text="", text_color=Colors.TEXT_SECONDARY,
+                                                   font=Styles.FONT_REGULAR, wraplength=380, justify="left")
+        self.lbl_estado_d.grid(row=5, columnspan=2, padx=Styles.PADDING_LG, sticky="w")
+        # Con el escáner cada lectura se devuelve de inmediato, sin ventanas de confirmación
+        self.escaner_d = DetectorEscaner(self.entry_d_isbn, self._devolver_escaneado, self.realizar_devolucion)
     
     def realizar_prestamo(self):
         """Realiza un préstamo de un libro a un alumno"""
@@ -111,39 +156,25 @@ class PrestamosTab:
         if not rut or not item:
             return messagebox.showerror("Error", "Datos incompletos.")
         
-        try:
-            # Buscar alumno
-            res_a = self.alumno_model.obtener_alumno_por_rut(rut)
-            if not res_a:
-                return messagebox.showerror("Error", "Alumno no encontrado.")
-            
-            pid, pnom = res_a
-            
-            # Buscar libro
-            res_l = self.libro_model.obtener_libro_por_titulo_o_isbn(item)
-            if not res_l:
-                return messagebox.showerror("Error", "Libro no disponible.")
-            
-            lid, ltit, _ = res_l
-            
-            # Verificar préstamo duplicado
-            if self.transaccion_model.existe_prestamo_duplicado(lid, pid):
-                return messagebox.showerror("Error", "Préstamo duplicado.")
-            
-            # Realizar préstamo
-            self.libro_model.restar_disponibles(lid)
-            self.transaccion_model.crear_prestamo(lid, pid)
-            
-            messagebox.showinfo("Éxito", f"Préstamo: {ltit} -> {pnom}")
-            self.entry_p_rut.delete(0, "end")
-            self.entry_p_isbn.delete(0, "end")
-            
-            # Actualizar dashboard
-            if self.main_window:
-                self.main_window.refresh_dashboard()
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        # Búsqueda, validación y registro en una sola transacción, en segundo plano.
+        # El botón queda deshabilitado para no registrar el préstamo dos veces.
+        self.btn_prestamo.configure(state="disabled")
+        self.ejecutor.enviar(self.transaccion_model.prestar, rut, item,
+                             al_terminar=self._prestamo_realizado,
+                             al_fallar=lambda e: self._operacion_fallida(self.btn_prestamo, e))
+    
+    def _prestamo_realizado(self, resultado):
+        """Muestra el préstamo registrado y limpia el formulario"""
+        ltit, pnom = resultado
+        self.btn_prestamo.configure(state="normal")
+        messagebox.showinfo("Éxito", f"Préstamo: {ltit} -> {pnom}")
+        self.entry_p_rut.delete(0, "end")
+        self.entry_p_isbn.delete(0, "end")
+        
+        # Actualizar dashboard sin recalcular (y descartar búsquedas cacheadas con disponibilidad anterior)
+        if self.main_window:
+            self.main_window.invalidar_busquedas()
+            self.main_window.actualizar_dashboard(disponibles=-1, prestados=1, prestamos_activos=1)
     
     def realizar_devolucion(self):
         """Registra la devolución de un libro"""
@@ -152,31 +183,155 @@ class PrestamosTab:
         if not item:
             return messagebox.showerror("Error", "Ingrese ISBN o Título.")
         
-        try:
-            # Buscar libro
-            res = self.libro_model.obtener_libro_por_titulo_o_isbn(item)
-            if not res:
-                return messagebox.showerror("Error", "Libro no encontrado.")
-            
-            lid, ltit, _ = res
-            
-            # Buscar préstamo activo
-            res_t = self.transaccion_model.obtener_prestamo_activo(lid)
-            if not res_t:
-                return messagebox.showerror("Error", "No hay préstamo activo.")
-            
-            tid = res_t[0]
-            
-            # Registrar devolución
-            self.transaccion_model.registrar_devolucion(tid)
-            self.libro_model.sumar_disponibles(lid)
-            
-            messagebox.showinfo("Éxito", f"Devuelto: {ltit}")
-            self.entry_d_isbn.delete(0, "end")
-            
-            # Actualizar dashboard
-            if self.main_window:
-                self.main_window.refresh_dashboard()
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        # Búsqueda del préstamo y devolución en una sola transacción, en segundo plano
+        self.btn_devolucion.configure(state="disabled")
+        self.ejecutor.enviar(self.transaccion_model.devolver, item, self.entry_d_rut.get() or None,
+                             al_terminar=self._devolucion_realizada,
+                             al_fallar=lambda e: self._operacion_fallida(self.btn_devolucion, e))
+    
+    def _devolucion_realizada(self, ltit: str):
+        """Muestra la devolución registrada y limpia el formulario"""
+        self.btn_devolucion.configure(state="normal")
+        messagebox.showinfo("Éxito", f"Devuelto: {ltit}")
+        self.entry_d_isbn.delete(0, "end")
+        self.entry_d_rut.delete(0, "end")
+        self._actualizar_tras_devolucion()
+    
+    def _actualizar_tras_devolucion(self):
+        """Actualiza dashboard sin recalcular (y descarta búsquedas cacheadas con disponibilidad anterior)"""
+        if self.main_window:
+            self.main_window.invalidar_busquedas()
+            self.main_window.actualizar_dashboard(disponibles=1, prestados=-1, prestamos_activos=-1)
+            self.main_window.refrescar_atrasados()
+    
+    # --- Préstamo a curso ---
+    def abrir_prestamo_curso(self):
+        """Carga los cursos y abre el diálogo de préstamo a curso"""
+        if self.win_curso and self.win_curso.winfo_exists():
+            return self.win_curso.focus()
+        self.ejecutor.enviar(self.alumno_model.obtener_cursos, al_terminar=self._mostrar_dialogo_curso,
+                             clave="cursos")
+    
+    def _mostrar_dialogo_curso(self, cursos):
+        """Abre el diálogo con la lista de cursos"""
+        if not cursos:
+            return messagebox.showerror("Error", "No hay alumnos con curso asignado.")
+        self.win_curso = PrestamoCursoDialog(self.parent, cursos, self.prestar_a_curso, self.devolver_de_curso)
+    
+    def prestar_a_curso(self, curso: str, termino: str):
+        """Presta un libro a todos los alumnos del curso en una sola transacción"""
+        self.ejecutor.enviar(self._prestar_a_curso, curso, termino,
+                             al_terminar=self._prestamo_curso_realizado,
+                             al_fallar=lambda e: messagebox.showerror("Error", str(e)))
+    
+    def _prestar_a_curso(self, curso: str, termino: str):
+        """Busca el libro y los alumnos y registra los préstamos (hilo de trabajo)"""
+        libro = self.libro_model.obtener_libro_por_titulo_o_isbn(termino)
+        if not libro:
+            raise ValueError("Libro no disponible.")
+        prestados, omitidos = self.transaccion_model.prestar_lote(
+            libro[0], self.alumno_model.obtener_ids_por_curso(curso))
+        return curso, libro[1], len(prestados), len(omitidos)
+    
+    def _prestamo_curso_realizado(self, resultado):
+        """Muestra el resumen del préstamo al curso"""
+        curso, ltit, n, omitidos = resultado
+        texto = f"Préstamo: {ltit} -> {n} alumno(s) de {curso}"
+        if omitidos:
+            texto += f"\n{omitidos} alumno(s) ya tenían el libro."
+        messagebox.showinfo("Éxito", texto)
+        
+        if n and self.main_window:
+            self.main_window.invalidar_busquedas()
+            self.main_window.actualizar_dashboard(disponibles=-n, prestados=n, prestamos_activos=n)
+    
+    def devolver_de_curso(self, curso: str, termino: str):
+        """Registra la devolución de un libro por todos los alumnos del curso que lo tienen"""
+        self.ejecutor.enviar(self._devolver_de_curso, curso, termino,
+                             al_terminar=self._devolucion_curso_realizada,
+                             al_fallar=lambda e: messagebox.showerror("Error", str(e)))
+    
+    def _devolver_de_curso(self, curso: str, termino: str):
+        """Busca los préstamos del curso y los cierra (hilo de trabajo)"""
+        libro = self.libro_model.obtener_libro_por_titulo_o_isbn(termino, solo_disponibles=False)
+        if not libro:
+            raise ValueError("Libro no encontrado.")
+        n = self.transaccion_model.devolver_lote(self.transaccion_model.obtener_prestamos_curso(libro[0], curso))
+        return curso, libro[1], n
+    
+    def _devolucion_curso_realizada(self, resultado):
+        """Muestra el resumen de la devolución del curso"""
+        curso, ltit, n = resultado
+        messagebox.showinfo("Éxito", f"Devueltos: {n} ejemplar(es) de {ltit} ({curso})")
+        
+        if n and self.main_window:
+            self.main_window.invalidar_busquedas()
+            self.main_window.actualizar_dashboard(disponibles=n, prestados=-n, prestamos_activos=-n)
+            self.main_window.refrescar_atrasados()
+    
+    # --- Escáner ---
+    def _isbn_escaneado(self, isbn: str):
+        """Agrega una lectura al lote del alumno y reprograma su registro"""
+        rut = self.entry_p_rut.get()
+        if not rut:
+            self.lbl_estado_p.configure(text="⚠️ Ingrese el RUT del alumno antes de escanear.",
+                                        text_color=Colors.DANGER)
+            return
+        if self._lote and rut != self._lote_rut:
+            self.registrar_lote()  # El lote pendiente es de otro alumno
+        if not self._lote:
+            self._lote_rut = rut
+        self._lote.append(isbn)
+        self.lbl_estado_p.configure(text=f"📦 Lote: {len(self._lote)} libro(s) leído(s)...",
+                                    text_color=Colors.TEXT_SECONDARY)
+        if self._lote_programado:
+            self.parent.after_cancel(self._lote_programado)
+        self._lote_programado = self.parent.after(ESCANER_LOTE_ESPERA_MS, self.registrar_lote)
+    
+    def _rut_cambiado(self, evento=None):
+        """Si se escribe el RUT del siguiente alumno con un lote pendiente, el lote se registra ya"""
+        if self._lote and self.entry_p_rut.get() != self._lote_rut:
+            self.registrar_lote()
+    
+    def registrar_lote(self):
+        """Presta todos los libros leídos al alumno de la primera lectura, en una sola transacción"""
+        if self._lote_programado:
+            self.parent.after_cancel(self._lote_programado)
+        self._lote_programado = None
+        lote, self._lote = self._lote, []
+        if not lote:
+            return
+        self.ejecutor.enviar(self.transaccion_model.prestar_isbns, self._lote_rut, lote,
+                             al_terminar=self._lote_registrado,
+                             al_fallar=lambda e: self.lbl_estado_p.configure(text=f"❌ {e}",
+                                                                             text_color=Colors.DANGER))
+    
+    def _lote_registrado(self, resultado):
+        """Muestra el resumen del lote (sin ventanas, para seguir escaneando)"""
+        pnom, prestados, rechazados = resultado
+        texto = f"✅ {len(prestados)} préstamo(s) a {pnom}"
+        if rechazados:
+            texto += "\n" + "\n".join(f"❌ {isbn}: {motivo}" for isbn, motivo in rechazados)
+        self.lbl_estado_p.configure(text=texto, text_color=Colors.DANGER if rechazados else Colors.SUCCESS)
+        
+        if prestados and self.main_window:
+            n = len(prestados)
+            self.main_window.invalidar_busquedas()
+            self.main_window.actualizar_dashboard(disponibles=-n, prestados=n, prestamos_activos=n)
+    
+    def _devolver_escaneado(self, isbn: str):
+        """Registra de inmediato la devolución de un libro leído con el escáner"""
+        self.ejecutor.enviar(self.transaccion_model.devolver, isbn, self.entry_d_rut.get() or None,
+                             al_terminar=self._devolucion_escaneada,
+                             al_fallar=lambda e: self.lbl_estado_d.configure(text=f"❌ {isbn}: {e}",
+                                                                             text_color=Colors.DANGER))
+    
+    def _devolucion_escaneada(self, ltit: str):
+        """Muestra la devolución en la etiqueta de estado"""
+        self.lbl_estado_d.configure(text=f"✅ Devuelto: {ltit}", text_color=Colors.SUCCESS)
+        self._actualizar_tras_devolucion()
+    
+    def _operacion_fallida(self, boton, error: Exception):
+        """Rehabilita el botón y muestra el error"""
+        boton.configure(state="normal")
+        messagebox.showerror("Error", str(error))
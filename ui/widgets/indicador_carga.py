@@ -0,0 +1,34 @@
+"""
+Indicador de Carga - Spinner de texto que se muestra mientras hay consultas en curso
+"""
+import customtkinter
+from utils.theme import Styles
+
+
+class IndicadorCarga(customtkinter.CTkLabel):
+    """Etiqueta animada; `mostrar(True)` inicia la animación y `mostrar(False)` la oculta"""
+
+    CUADROS = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+    def __init__(self, master, texto: str = "Cargando...", intervalo_ms: int = 80, **kwargs):
+        kwargs.setdefault("font", Styles.FONT_REGULAR)
+        super().__init__(master, text="", **kwargs)
+        self.texto = texto
+        self.intervalo_ms = intervalo_ms
+        self._cuadro = 0
+        self._animacion = None
+
+    def mostrar(self, activo: bool):
+        """Inicia o detiene la animación"""
+        if activo and self._animacion is None:
+            self._animar()
+        elif not activo and self._animacion is not None:
+            self.after_cancel(self._animacion)
+            self._animacion = None
+            self.configure(text="")
+
+    def _animar(self):
+        """Avanza un cuadro del spinner"""
+        self._cuadro = (self._cuadro + 1) % len(self.CUADROS)
+        self.configure(text=f"{self.CUADROS[self._cuadro]} {self.texto}")
+        self._animacion = self.after(self.intervalo_ms, self._animar)
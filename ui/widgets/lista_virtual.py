@@ -0,0 +1,167 @@
+"""
+Lista Virtual - Lista con scroll que solo crea widgets para las filas visibles
+"""
+import math
+import customtkinter
+from typing import Any, Callable, List, Optional, Sequence
+from utils.theme import Colors, Styles
+
+
+class ListaVirtual(customtkinter.CTkFrame):
+    """
+    Lista de filas de alto fijo que reutiliza sus widgets al hacer scroll.
+
+    En lugar de crear widgets para cada resultado, mantiene solo las filas que
+    caben en pantalla y las vuelve a llenar con los datos de la posición actual.
+    Las filas se crean con `fabrica_fila(parent)`, que debe retornar un objeto con:
+        - frame: el widget de la fila (se posiciona con place)
+        - llenar(datos): actualiza los widgets con una fila de datos
+    Si se entrega `cargar_mas(agregar)`, se llama al acercarse al final para pedir
+    más filas; debe llamar (de inmediato o más tarde, en el hilo de Tk) a
+    `agregar(filas, hay_mas)`. No se pide otra página mientras una está pendiente.
+    """
+
+    def __init__(self, master, fabrica_fila: Callable[[Any], Any], alto_fila: int = 52, **kwargs):
+        kwargs.setdefault("fg_color", Colors.BG_DARK)
+        super().__init__(master, **kwargs)
+        self.fabrica_fila = fabrica_fila
+        self.alto_fila = alto_fila
+
+        self._datos: List = []
+        self._cargar_mas: Optional[Callable[[Callable[[Sequence, bool], None]], None]] = None
+        self._cargando = False
+        self._generacion = 0  # Cambia con cada mostrar(); descarta páginas de datos anteriores
+        self._filas: List[Any] = []
+        self._inicio = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self._viewport = customtkinter.CTkFrame(self, fg_color="transparent")
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = customtkinter.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._lbl_vacio = customtkinter.CTkLabel(self._viewport, text="", text_color=Colors.TEXT_SECONDARY,
+                                                 font=Styles.FONT_REGULAR)
+
+        self._viewport.bind("<Configure>", lambda e: self._render())
+        self._bind_rueda(self._viewport)
+
+    # --- API ---
+    def mostrar(self, datos: Sequence, mensaje_vacio: str = "",
+                cargar_mas: Optional[Callable[[Callable[[Sequence, bool], None]], None]] = None):
+        """Reemplaza el contenido de la lista y vuelve al inicio"""
+        self._datos = list(datos)
+        self._cargar_mas = cargar_mas
+        self._cargando = False
+        self._generacion += 1
+        self._inicio = 0
+        self._lbl_vacio.configure(text=mensaje_vacio)
+        self._render()
+
+    def refrescar(self):
+        """Vuelve a dibujar las filas visibles (p. ej. tras modificar los datos)"""
+        self._render()
+
+    @property
+    def datos(self) -> List:
+        """Filas cargadas actualmente"""
+        return self._datos
+
+    # --- Dibujo ---
+    def _visibles(self) -> int:
+        """Cantidad de filas que caben (aunque sea parcialmente) en el área visible"""
+        alto = max(self._viewport.winfo_height(), self.alto_fila)
+        return math.ceil(alto / self.alto_fila)
+
+    def _completas(self) -> int:
+        """Cantidad de filas que caben completas en el área visible"""
+        return max(1, self._viewport.winfo_height() // self.alto_fila)
+
+    def _render(self):
+        """Posiciona y llena solo las filas visibles"""
+        visibles = self._visibles()
+        self._pedir_mas_si_hace_falta(visibles)
+
+        total = len(self._datos)
+        self._inicio = max(0, min(self._inicio, total - self._completas()))
+
+        if total == 0:
+            for fila in self._filas:
+                fila.frame.place_forget()
+            self._lbl_vacio.place(relx=0.5, y=Styles.PADDING_XL, anchor="n")
+            self._scrollbar.set(0.0, 1.0)
+            return
+        self._lbl_vacio.place_forget()
+
+        # Crear filas solo hasta cubrir el área visible
+        while len(self._filas) < min(visibles, total):
+            fila = self.fabrica_fila(self._viewport)
+            # Alto fijo: CTk no acepta height en place(), se define en el widget
+            fila.frame.configure(height=self.alto_fila)
+            fila.frame.grid_propagate(False)
+            self._bind_rueda(fila.frame)
+            self._filas.append(fila)
+
+        for i, fila in enumerate(self._filas):
+            indice = self._inicio + i
+            if i < visibles and indice < total:
+                fila.llenar(self._datos[indice])
+                fila.frame.place(x=0, y=i * self.alto_fila, relwidth=1.0)
+            else:
+                fila.frame.place_forget()
+
+        self._scrollbar.set(self._inicio / total, min(1.0, (self._inicio + visibles) / total))
+
+    def _pedir_mas_si_hace_falta(self, visibles: int):
+        """Pide más filas a `cargar_mas` cuando el área visible se acerca al final de los datos"""
+        if (self._cargar_mas is None or self._cargando
+                or self._inicio + 2 * visibles < len(self._datos)):
+            return
+        self._cargando = True
+        generacion = self._generacion
+        self._cargar_mas(lambda filas, hay_mas: self._agregar(generacion, filas, hay_mas))
+
+    def _agregar(self, generacion: int, filas: Sequence, hay_mas: bool):
+        """Recibe una página pedida con cargar_mas y la agrega al final"""
+        if generacion != self._generacion:
+            return  # Llegó después de un mostrar() con otros datos
+        self._cargando = False
+        self._datos.extend(filas)
+        if not hay_mas:
+            self._cargar_mas = None
+        self._render()
+
+    # --- Scroll ---
+    def _desplazar(self, filas: int):
+        """Mueve la ventana visible `filas` posiciones"""
+        inicio = self._inicio + filas
+        if inicio != self._inicio:
+            self._inicio = max(0, inicio)
+            self._render()
+
+    def _on_scrollbar(self, accion, valor, unidad=None):
+        """Recibe los comandos de la barra de scroll ('moveto' o 'scroll')"""
+        if accion == "moveto":
+            self._inicio = int(float(valor) * len(self._datos))
+            self._render()
+        elif accion == "scroll":
+            paso = self._completas() if unidad == "pages" else 1
+            self._desplazar(int(float(valor)) * paso)
+
+    def _on_rueda(self, event):
+        """Scroll con la rueda del mouse (Windows/macOS: delta; Linux: botones 4 y 5)"""
+        if getattr(event, "num", None) == 4:
+            self._desplazar(-3)
+        elif getattr(event, "num", None) == 5:
+            self._desplazar(3)
+        elif event.delta:
+            self._desplazar(-3 if event.delta > 0 else 3)
+
+    def _bind_rueda(self, widget):
+        """Asocia la rueda del mouse a un widget y a todos sus hijos"""
+        for secuencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(secuencia, self._on_rueda, add="+")
+        for hijo in widget.winfo_children():
+            self._bind_rueda(hijo)
@@ -0,0 +1,43 @@
+"""
+Traza de arranque - Duración de cada etapa del inicio de la aplicación
+(importaciones, conexión, esquema, interfaz, primer pintado, datos iniciales)
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class TrazaArranque:
+    """Marcas de tiempo desde el inicio del proceso; cada marca cierra una etapa"""
+
+    def __init__(self, inicio: Optional[float] = None):
+        """
+        Args:
+            inicio: time.perf_counter() tomado lo antes posible (antes de las importaciones)
+        """
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.marcas: List[Tuple[str, float]] = []
+
+    def marcar(self, etapa: str):
+        """Cierra la etapa (si ya estaba marcada, se conserva la primera marca)"""
+        if etapa not in self:
+            self.marcas.append((etapa, time.perf_counter()))
+
+    def __contains__(self, etapa: str) -> bool:
+        return any(nombre == etapa for nombre, _ in self.marcas)
+
+    @property
+    def total_ms(self) -> float:
+        """Tiempo desde el inicio hasta la última marca"""
+        return (self.marcas[-1][1] - self.inicio) * 1000 if self.marcas else 0.0
+
+    def a_dict(self) -> Dict[str, float]:
+        """Duración de cada etapa en ms, en orden"""
+        duraciones, anterior = {}, self.inicio
+        for etapa, instante in self.marcas:
+            duraciones[etapa] = round((instante - anterior) * 1000, 3)
+            anterior = instante
+        return duraciones
+
+    def __str__(self) -> str:
+        etapas = " · ".join(f"{etapa} {ms:.0f} ms" for etapa, ms in self.a_dict().items())
+        return f"{etapas} · total {self.total_ms:.0f} ms"
@@ -3,7 +3,6 @@ Configuración global de la aplicación
 """
 import os
 import sys
-from pathlib import Path
 from .theme import Colors, Styles
 
 # Configuración de apariencia
@@ -19,6 +18,53 @@ else:
 DATABASE_PATH = os.path.join(APPLICATION_PATH, "inventario.db")
 EXCEL_IMPORT_PATH = os.path.join(APPLICATION_PATH, "alumnos.xlsx")
 
+# Conexiones a la base de datos
+DB_PERSISTENTE = True  # Reutiliza una conexión por hilo en lugar de abrir una por consulta
+DB_TAMANO_POOL = 5  # Conexiones inactivas que el pool mantiene abiertas
+EJECUTOR_HILOS = 1  # Hilos que ejecutan las consultas de la interfaz (1 mantiene las escrituras en orden)
+
+# Perfiles de rendimiento de SQLite: PRAGMA que se aplican a cada conexión nueva.
+# cache_size negativo = KiB; mmap_size en bytes; busy_timeout en ms.
+PERFILES_DB = {
+    # Un equipo con la base en su disco: WAL (lectores y escritor no se bloquean) y
+    # synchronous=NORMAL (un corte de luz puede perder el último commit, nunca corrompe)
+    "escritorio": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024, "temp_store": "MEMORY", "busy_timeout": 5000,
+    },
+    # Equipo dedicado que atiende varios puestos o procesos (CLI, importaciones): más caché y espera
+    "servidor": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024, "temp_store": "MEMORY", "busy_timeout": 15000,
+    },
+    # Máxima durabilidad, y el único apto para una base en carpeta de red o pendrive (WAL no lo es)
+    "seguro": {
+        "journal_mode": "DELETE", "synchronous": "FULL", "cache_size": -8000,
+        "mmap_size": 0, "temp_store": "DEFAULT", "busy_timeout": 10000,
+    },
+}
+DB_PERFIL = "escritorio"  # Perfil de PERFILES_DB que usa la aplicación
+
+# Instrumentación de consultas (panel de depuración con F12)
+INSTRUMENTAR_CONSULTAS = True  # Mide cada consulta y la asocia al método del modelo que la hizo
+UMBRAL_CONSULTA_LENTA_MS = 100  # Desde esta duración la consulta se anota en el log de consultas lentas
+LOG_CONSULTAS_LENTAS = os.path.join(APPLICATION_PATH, "consultas_lentas.log")
+LOG_CONSULTAS_LENTAS_BYTES = 1024 * 1024  # Tamaño en que el log rota
+LOG_CONSULTAS_LENTAS_RESPALDOS = 3  # Archivos rotados que se conservan
+
+# Búsqueda mientras se escribe
+BUSQUEDA_RETARDO_MS = 250  # Espera tras la última tecla antes de buscar
+
+# Lector de código de barras (funciona como teclado: escribe el ISBN muy rápido y envía Enter)
+ESCANER_INTERVALO_MS = 40  # Separación máxima entre teclas para considerar que las escribe el lector
+ESCANER_LARGO_MINIMO = 10  # Caracteres mínimos de una lectura (ISBN-10)
+ESCANER_LOTE_ESPERA_MS = 1500  # Espera tras la última lectura antes de registrar el lote de préstamos
+
+# Plazos de préstamo (días corridos desde la entrega)
+PLAZO_PRESTAMO_DIAS = 14  # Plazo general
+PLAZOS_POR_CATEGORIA = {"Referencia": 3, "Diccionario": 3, "Enciclopedia": 3}  # Categoría del libro -> días
+PLAZOS_POR_CURSO = {}  # Curso del alumno -> días, p. ej. {"1°A": 7}; la categoría tiene prioridad
+
 # Nombres de tablas
 TABLE_LIBROS = "Libros"
 TABLE_PRESTATARIOS = "Prestatarios"
@@ -1,55 +1,236 @@
 """
 Import Excel - Funciones para importar alumnos desde archivos Excel
+La hoja se lee en streaming (openpyxl en modo solo lectura) y se escribe por lotes,
+así que la memoria usada no depende del tamaño del archivo.
 """
 import os
-from typing import Tuple
-import pandas as pd
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from openpyxl import load_workbook
 from database.conexion import DatabaseConnection
+from utils.validators import limpiar_rut, validar_ruts, validar_nombre
 
+TAMANO_LOTE = 5000
+COLUMNAS_ALUMNOS = ['RUT', 'Nombre', 'Curso']
 
-def importar_alumnos_desde_excel(archivo_path: str, db_connection: DatabaseConnection) -> Tuple[int, int]:
+
+def abrir_excel(archivo_path: str) -> Tuple[List[str], Optional[int], Iterator[Tuple]]:
     """
-    Importa alumnos desde un archivo Excel
-    
-    Args:
-        archivo_path: Ruta al archivo .xlsx
-        db_connection: Conexión a la base de datos
-    
+    Abre la primera hoja de un Excel en modo solo lectura
+
     Returns:
-        Tupla (registros_importados, registros_omitidos)
+        Tupla (cabecera, filas_estimadas, iterador de filas como tuplas de texto).
+        filas_estimadas viene de las dimensiones de la hoja y puede ser None.
+        El archivo se cierra al terminar de recorrer el iterador.
     """
-    
-    # Verificar que el archivo existe
     if not os.path.exists(archivo_path):
         raise FileNotFoundError(f"No se encontró el archivo '{archivo_path}'")
-    
-    # Leer Excel
+
     try:
-        df = pd.read_excel(archivo_path, dtype=str)
-        df = df.fillna("")
+        libro = load_workbook(archivo_path, read_only=True, data_only=True)
+        hoja = libro.active
+        filas = hoja.iter_rows(values_only=True)
+        cabecera = [_texto(c) for c in next(filas, ())]
     except Exception as e:
         raise Exception(f"Error leyendo el archivo de Excel: {e}")
-    
-    # Verificar columnas
-    columnas_necesarias = ['RUT', 'Nombre', 'Curso']
-    if not all(col in df.columns for col in columnas_necesarias):
-        raise Exception(f"El archivo debe tener las columnas: {columnas_necesarias}")
-    
-    # Importar registros
-    registros_importados = 0
-    registros_omitidos = 0
-    
-    query = "INSERT OR IGNORE INTO Prestatarios (RUT, Nombre, Curso) VALUES (?, ?, ?)"
-    
-    for index, row in df.iterrows():
+
+    total = hoja.max_row - 1 if hoja.max_row else None
+
+    def generar():
         try:
-            db_connection.ejecutar(
-                query,
-                (row['RUT'], row['Nombre'], row['Curso'])
-            )
-            registros_importados += 1
-        except Exception as e:
-            print(f"Error importando fila {index}: {e}")
-            registros_omitidos += 1
-    
-    return registros_importados, registros_omitidos
+            for fila in filas:
+                if fila is None or all(v is None for v in fila):
+                    continue
+                yield tuple(_texto(v) for v in fila)
+        finally:
+            libro.close()
+
+    return cabecera, total, generar()
+
+
+def leer_filas_excel(archivo_path: str, columnas: Sequence[str]) -> Tuple[Optional[int], Iterator[Tuple]]:
+    """
+    Entrega las filas de un Excel solo con las columnas pedidas, en ese orden
+
+    Returns:
+        Tupla (filas_estimadas, iterador de tuplas en el orden de `columnas`)
+    """
+    cabecera, total, filas = abrir_excel(archivo_path)
+
+    if any(c not in cabecera for c in columnas):
+        filas.close()
+        raise Exception(f"El archivo debe tener las columnas: {list(columnas)}")
+
+    indices = [cabecera.index(c) for c in columnas]
+    return total, (tuple(fila[i] if i < len(fila) else "" for i in indices) for fila in filas)
+
+
+def importar_alumnos_desde_excel(archivo_path: str, db_connection: DatabaseConnection,
+                                 tamano_lote: int = TAMANO_LOTE,
+                                 progreso: Optional[Callable[[int, Optional[int]], None]] = None
+                                 ) -> Tuple[int, int, int]:
+    """
+    Importa alumnos desde un archivo Excel
+    Lee la hoja por lotes de `tamano_lote` filas, valida cada lote y lo inserta con
+    un solo executemany; todo el archivo se escribe en una única transacción.
+
+    Args:
+        archivo_path: Ruta al archivo .xlsx
+        db_connection: Conexión a la base de datos
+        tamano_lote: Filas por lote
+        progreso: Función opcional que recibe (filas_procesadas, filas_estimadas) tras cada lote
+
+    Returns:
+        Tupla (insertados, ignorados por RUT ya existente, inválidos)
+    """
+    total, filas = leer_filas_excel(archivo_path, COLUMNAS_ALUMNOS)
+
+    insertados = ignorados = invalidos = procesadas = 0
+    # RUT_Limpio es único: se omite el alumno ya registrado aunque su RUT esté escrito distinto
+    query = "INSERT OR IGNORE INTO Prestatarios (RUT, RUT_Limpio, Nombre, Curso) VALUES (?, ?, ?, ?)"
+
+    with db_connection.transaccion() as conn:
+        while True:
+            lote = list(islice(filas, tamano_lote))
+            if not lote:
+                break
+
+            validos = preparar_lote_alumnos(lote)
+            invalidos += len(lote) - len(validos)
+            if validos:
+                cursor = conn.executemany(query, validos)
+                insertados += cursor.rowcount
+                ignorados += len(validos) - cursor.rowcount
+
+            procesadas += len(lote)
+            if progreso:
+                progreso(procesadas, total)
+
+    return insertados, ignorados, invalidos
+
+
+def preparar_lote_alumnos(lote: List[Tuple[str, str, str]]) -> List[Tuple[str, str, str, str]]:
+    """
+    Valida filas (RUT, Nombre, Curso) y agrega el RUT normalizado
+    Los dígitos verificadores de todo el lote se revisan de una vez con validar_ruts.
+    Returns: Filas válidas como (RUT, RUT_Limpio, Nombre, Curso)
+    """
+    ruts_validos = validar_ruts([rut for rut, _, _ in lote])
+    return [
+        (rut, limpiar_rut(rut).upper(), nombre, curso)
+        for (rut, nombre, curso), rut_valido in zip(lote, ruts_validos)
+        if rut_valido and validar_nombre(nombre)
+    ]
+
+
+def sincronizar_alumnos_desde_excel(archivo_path: str, db_connection: DatabaseConnection,
+                                    simular: bool = False, eliminar_retirados: bool = False,
+                                    tamano_lote: int = TAMANO_LOTE) -> Dict[str, list]:
+    """
+    Sincroniza Prestatarios con la nómina completa del año
+    Carga una vez los alumnos existentes en memoria, compara cada fila de la nómina
+    por RUT normalizado y aplica solo las diferencias con sentencias por lotes en una
+    transacción. Una nómina sin cambios no escribe nada.
+
+    Args:
+        archivo_path: Ruta al archivo .xlsx con columnas RUT, Nombre y Curso
+        db_connection: Conexión a la base de datos
+        simular: Si es True, solo calcula el reporte sin escribir
+        eliminar_retirados: Si es True, elimina a los alumnos que ya no están en la
+                            nómina (salvo los que tienen préstamos activos)
+        tamano_lote: Filas por lote de validación y por executemany
+
+    Returns:
+        Reporte con las listas:
+            nuevos: (RUT, Nombre, Curso)
+            actualizados: (RUT, (Nombre, Curso) anterior, (Nombre, Curso) nuevo)
+            retirados: (RUT, Nombre) que no están en la nómina
+            retirados_con_prestamos: (RUT, Nombre) que no se eliminan por tener libros
+            invalidos: filas sin RUT o nombre válido
+    """
+    _, filas = leer_filas_excel(archivo_path, COLUMNAS_ALUMNOS)
+
+    # Nómina: {RUT_Limpio: (RUT, Nombre, Curso)}; si un RUT se repite, vale la última fila
+    nomina = {}
+    invalidos = []
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            break
+        for (rut, nombre, curso), rut_valido in zip(lote, validar_ruts([f[0] for f in lote])):
+            if rut_valido and validar_nombre(nombre):
+                nomina[limpiar_rut(rut).upper()] = (rut, nombre, curso)
+            else:
+                invalidos.append((rut, nombre, curso))
+
+    # Alumnos registrados: {RUT_Limpio: (ID, RUT, Nombre, Curso, préstamos activos)}
+    existentes = {
+        fila[1]: (fila[0], fila[2], fila[3], fila[4] or "", fila[5])
+        for fila in db_connection.consultar_todos("""
+            SELECT p.ID_Prestatario, p.RUT_Limpio, p.RUT, p.Nombre, p.Curso,
+                   EXISTS (SELECT 1 FROM Transacciones t 
+                           WHERE t.ID_Prestatario = p.ID_Prestatario AND t.Estado = 'Prestado')
+            FROM Prestatarios p
+        """)
+    }
+
+    nuevos = [(rut, limpio, nombre, curso) for limpio, (rut, nombre, curso) in nomina.items()
+              if limpio not in existentes]
+    actualizados = [
+        (existentes[limpio][0], rut, (existentes[limpio][2], existentes[limpio][3]), (nombre, curso))
+        for limpio, (rut, nombre, curso) in nomina.items()
+        if limpio in existentes and (existentes[limpio][2], existentes[limpio][3]) != (nombre, curso)
+    ]
+    ausentes = [datos for limpio, datos in existentes.items() if limpio not in nomina]
+    retirados = [(pid, rut, nombre) for pid, rut, nombre, _, activos in ausentes if not activos]
+    con_prestamos = [(rut, nombre) for _, rut, nombre, _, activos in ausentes if activos]
+
+    if not simular and (nuevos or actualizados or (eliminar_retirados and retirados)):
+        with db_connection.transaccion() as conn:
+            for i in range(0, len(nuevos), tamano_lote):
+                conn.executemany(
+                    "INSERT INTO Prestatarios (RUT, RUT_Limpio, Nombre, Curso) VALUES (?, ?, ?, ?)",
+                    nuevos[i:i + tamano_lote]
+                )
+            for i in range(0, len(actualizados), tamano_lote):
+                conn.executemany(
+                    "UPDATE Prestatarios SET Nombre = ?, Curso = ? WHERE ID_Prestatario = ?",
+                    [(nom, cur, pid) for pid, _, _, (nom, cur) in actualizados[i:i + tamano_lote]]
+                )
+            if eliminar_retirados:
+                for i in range(0, len(retirados), tamano_lote):
+                    conn.executemany("DELETE FROM Prestatarios WHERE ID_Prestatario = ?",
+                                     [(pid,) for pid, _, _ in retirados[i:i + tamano_lote]])
+
+    return {
+        'nuevos': [(rut, nombre, curso) for rut, _, nombre, curso in nuevos],
+        'actualizados': [(rut, antes, despues) for _, rut, antes, despues in actualizados],
+        'retirados': [(rut, nombre) for _, rut, nombre in retirados],
+        'retirados_con_prestamos': con_prestamos,
+        'invalidos': invalidos,
+    }
+
+
+def formatear_reporte_sincronizacion(reporte: Dict[str, list], detalle: int = 20) -> str:
+    """Resume un reporte de sincronizar_alumnos_desde_excel (muestra hasta `detalle` filas por grupo)"""
+    lineas = [
+        f"➕ Nuevos: {len(reporte['nuevos'])}",
+        f"✏️ Actualizados: {len(reporte['actualizados'])}",
+        f"🚪 Ya no están en la nómina: {len(reporte['retirados'])}",
+        f"📚 Ya no están en la nómina pero tienen préstamos activos: {len(reporte['retirados_con_prestamos'])}",
+        f"⚠️ Filas inválidas: {len(reporte['invalidos'])}",
+    ]
+    for rut, (nom_a, cur_a), (nom_n, cur_n) in reporte['actualizados'][:detalle]:
+        lineas.append(f"   {rut}: {nom_a} ({cur_a or '-'}) -> {nom_n} ({cur_n or '-'})")
+    for rut, nombre in reporte['retirados_con_prestamos'][:detalle]:
+        lineas.append(f"   Con préstamos: {rut} {nombre}")
+    return "\n".join(lineas)
+
+
+def _texto(valor) -> str:
+    """Convierte el valor de una celda en texto (los números enteros sin '.0')"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
@@ -0,0 +1,176 @@
+"""
+Import Libros - Carga masiva del catálogo desde Excel (.xlsx) o CSV
+Las filas con el mismo ISBN se combinan en memoria (sumando ejemplares) y el
+resultado se escribe con un upsert por ISBN en una única transacción.
+"""
+import csv
+import os
+import unicodedata
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from database.conexion import DatabaseConnection
+from utils.import_excel import abrir_excel, TAMANO_LOTE
+from utils.validators import limpiar_isbn, validar_isbns
+
+# Nombres aceptados para cada columna (se comparan sin tildes ni mayúsculas)
+ALIAS_COLUMNAS = {
+    'isbn': ('isbn',),
+    'titulo': ('titulo', 'título'),
+    'autor': ('autor',),
+    'editorial': ('editorial',),
+    'anio': ('ano', 'año', 'anio', 'ano_publicacion', 'año_publicacion', 'año publicación'),
+    'categoria': ('categoria', 'categoría'),
+    'ejemplares': ('ejemplares', 'total_ejemplares', 'cantidad', 'nº ejemplares', 'n° ejemplares'),
+}
+COLUMNAS_OBLIGATORIAS = ('isbn', 'titulo')
+
+
+def importar_libros(archivo_path: str, db_connection: DatabaseConnection,
+                    tamano_lote: int = TAMANO_LOTE,
+                    progreso: Optional[Callable[[int, Optional[int]], None]] = None
+                    ) -> Tuple[int, int, int]:
+    """
+    Importa libros desde un archivo Excel (.xlsx) o CSV
+    Un ISBN que ya existe suma sus ejemplares (totales y disponibles) al libro
+    registrado; los datos del libro existente no se modifican.
+
+    Args:
+        archivo_path: Ruta al archivo .xlsx o .csv
+        db_connection: Conexión a la base de datos
+        tamano_lote: Libros por executemany
+        progreso: Función opcional que recibe (filas_leidas, filas_estimadas)
+
+    Returns:
+        Tupla (libros nuevos, libros existentes con ejemplares sumados, filas inválidas)
+    """
+    libros, invalidos = combinar_por_isbn(archivo_path, progreso)
+
+    query = """
+        INSERT INTO Libros (ISBN, Título, Autor, Editorial, Año_Publicacion,
+                            Categoría, Total_Ejemplares, Disponibles, Fecha_Ingreso_Donacion)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(ISBN) DO UPDATE SET
+            Total_Ejemplares = Total_Ejemplares + excluded.Total_Ejemplares,
+            Disponibles = Disponibles + excluded.Disponibles
+    """
+    fecha = datetime.now().strftime("%Y-%m-%d")
+    filas = ((isbn, tit, aut, edi, anio, cat, ej, ej, fecha)
+             for isbn, (tit, aut, edi, anio, cat, ej) in libros.items())
+
+    with db_connection.transaccion() as conn:
+        # ID_Libro es AUTOINCREMENT: los libros nuevos quedan sobre el máximo anterior.
+        # NOT INDEXED fija el rango por rowid (si no, COUNT puede preferir recorrer un índice).
+        ultimo = conn.execute("SELECT COALESCE(MAX(ID_Libro), 0) FROM Libros").fetchone()[0]
+        while True:
+            lote = list(islice(filas, tamano_lote))
+            if not lote:
+                break
+            conn.executemany(query, lote)
+        nuevos = conn.execute("SELECT COUNT(*) FROM Libros NOT INDEXED WHERE ID_Libro > ?", (ultimo,)).fetchone()[0]
+
+    return nuevos, len(libros) - nuevos, invalidos
+
+
+def combinar_por_isbn(archivo_path: str,
+                      progreso: Optional[Callable[[int, Optional[int]], None]] = None
+                      ) -> Tuple[Dict[str, list], int]:
+    """
+    Lee el archivo y combina las filas por ISBN (normalizado, sin guiones ni espacios).
+    Se conservan los datos de la primera fila de cada ISBN y se suman los ejemplares.
+    Los dígitos de control se validan por lotes con validar_isbns.
+
+    Returns:
+        Tupla ({isbn: [título, autor, editorial, año, categoría, ejemplares]}, filas inválidas)
+    """
+    cabecera, total, filas = _abrir(archivo_path)
+    indices = _resolver_columnas(cabecera)
+    if any(indices[c] is None for c in COLUMNAS_OBLIGATORIAS):
+        filas.close()
+        raise Exception("El archivo debe tener al menos las columnas: ISBN, Título")
+
+    def valor(fila, columna):
+        i = indices[columna]
+        return fila[i] if i is not None and i < len(fila) else ""
+
+    libros: Dict[str, list] = {}
+    invalidos = leidas = 0
+    while True:
+        lote = list(islice(filas, TAMANO_LOTE))
+        if not lote:
+            break
+        leidas += len(lote)
+
+        isbns = [limpiar_isbn(valor(fila, 'isbn')) for fila in lote]
+        for fila, isbn, isbn_valido in zip(lote, isbns, validar_isbns(isbns)):
+            titulo = valor(fila, 'titulo')
+            texto_ejemplares = valor(fila, 'ejemplares')
+            ejemplares = _entero(texto_ejemplares) if texto_ejemplares else 1
+            if not isbn_valido or not titulo or not ejemplares or ejemplares <= 0:
+                invalidos += 1
+                continue
+
+            existente = libros.get(isbn)
+            if existente:
+                existente[5] += ejemplares
+            else:
+                libros[isbn] = [titulo, valor(fila, 'autor'), valor(fila, 'editorial'),
+                                _entero(valor(fila, 'anio')), valor(fila, 'categoria'), ejemplares]
+
+        if progreso:
+            progreso(leidas, total)
+
+    return libros, invalidos
+
+
+def _abrir(archivo_path: str) -> Tuple[List[str], Optional[int], Iterator[Tuple]]:
+    """Abre un .xlsx o un .csv y retorna (cabecera, filas_estimadas, iterador de filas)"""
+    if not archivo_path.lower().endswith(".csv"):
+        return abrir_excel(archivo_path)
+
+    if not os.path.exists(archivo_path):
+        raise FileNotFoundError(f"No se encontró el archivo '{archivo_path}'")
+
+    archivo = open(archivo_path, newline="", encoding="utf-8-sig")
+    try:
+        muestra = archivo.read(4096)
+        archivo.seek(0)
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(archivo, dialecto)
+    cabecera = [c.strip() for c in next(lector, [])]
+
+    def generar():
+        try:
+            for fila in lector:
+                if any(v.strip() for v in fila):
+                    yield tuple(v.strip() for v in fila)
+        finally:
+            archivo.close()
+
+    return cabecera, None, generar()
+
+
+def _resolver_columnas(cabecera: List[str]) -> Dict[str, Optional[int]]:
+    """Ubica cada columna conocida en la cabecera (None si no está)"""
+    normalizada = [_normalizar(c) for c in cabecera]
+    indices = {}
+    for columna, alias in ALIAS_COLUMNAS.items():
+        nombres = {_normalizar(a) for a in alias}
+        indices[columna] = next((i for i, c in enumerate(normalizada) if c in nombres), None)
+    return indices
+
+
+def _normalizar(texto: str) -> str:
+    """Texto en minúsculas y sin tildes, para comparar nombres de columnas"""
+    descompuesto = unicodedata.normalize("NFKD", texto.strip().rstrip(":").lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def _entero(texto: str) -> Optional[int]:
+    """Convierte un texto en entero (None si no es un número)"""
+    try:
+        return int(float(texto))
+    except (TypeError, ValueError, OverflowError):
+        return None
@@ -0,0 +1,70 @@
+"""
+Paginación - Cursores opacos para paginar por clave (keyset)
+Cada página se pide "después" de la última fila entregada, identificada por su
+clave de orden y su ID. SQLite entra al índice directamente en ese punto, así que
+la página 100 cuesta lo mismo que la primera (a diferencia de OFFSET).
+"""
+import base64
+import json
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
+
+TAMANO_PAGINA = 100
+
+# Una página: (filas, cursor para pedir la siguiente o None si no hay más)
+Pagina = Tuple[List[Tuple], Optional[str]]
+
+
+def codificar_cursor(clave: Any, id_fila: int) -> str:
+    """Convierte (clave de orden, ID) en un texto opaco"""
+    return base64.urlsafe_b64encode(json.dumps([clave, id_fila]).encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[Any, int]:
+    """Recupera (clave de orden, ID) de un cursor; ValueError si no es válido"""
+    try:
+        clave, id_fila = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Cursor de página inválido: {cursor!r}") from e
+    return clave, id_fila
+
+
+def condicion_despues(columnas: str, despues: Optional[str], descendente: bool = False
+                      ) -> Tuple[str, Tuple]:
+    """
+    Condición SQL para las filas posteriores al cursor
+    Args:
+        columnas: Par de columnas de orden, p. ej. "(Título, ID_Libro)"
+        despues: Cursor de la página anterior (None = primera página)
+        descendente: True si la consulta ordena con DESC
+    Returns: (condición, parámetros); sin cursor la condición es siempre verdadera
+    """
+    if despues is None:
+        return "1", ()
+    return f"{columnas} {'<' if descendente else '>'} (?, ?)", decodificar_cursor(despues)
+
+
+def armar_pagina(filas: List[Tuple], tamano: int,
+                 clave: Callable[[Tuple], Tuple[Any, int]]) -> Pagina:
+    """
+    Recorta a `tamano` filas una consulta hecha con LIMIT tamano + 1 y arma el cursor
+    Args:
+        clave: Retorna (clave de orden, ID) de una fila
+    """
+    if len(filas) <= tamano:
+        return filas, None
+    filas = filas[:tamano]
+    return filas, codificar_cursor(*clave(filas[-1]))
+
+
+def cargar_pagina(consultar: Callable[..., Pagina], *args, despues: Optional[str] = None
+                  ) -> Tuple[List[Tuple], Optional[Callable[[], Tuple]]]:
+    """
+    Consulta una página y retorna (filas, continuar), donde continuar() carga la
+    página siguiente de la misma forma (None si no hay más). Evita que quien
+    muestra las filas tenga que saber qué consulta y qué cursor usar.
+    """
+    filas, siguiente = consultar(*args, despues=despues)
+    if siguiente is None:
+        return filas, None
+    return filas, partial(cargar_pagina, consultar, *args, despues=siguiente)
@@ -0,0 +1,32 @@
+"""
+Plazos - Cálculo de la fecha de devolución de un préstamo
+El plazo se elige por la categoría del libro, luego por el curso del alumno y,
+si ninguno está configurado, se usa el plazo general (ver utils/config.py).
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional, Union
+from utils.config import PLAZO_PRESTAMO_DIAS, PLAZOS_POR_CATEGORIA, PLAZOS_POR_CURSO
+
+FORMATO_FECHA = "%Y-%m-%d"
+
+
+def plazo_prestamo(categoria: Optional[str] = None, curso: Optional[str] = None) -> int:
+    """Días de préstamo para un libro de `categoria` prestado a un alumno de `curso`"""
+    if categoria and categoria.strip() in PLAZOS_POR_CATEGORIA:
+        return PLAZOS_POR_CATEGORIA[categoria.strip()]
+    if curso and curso.strip() in PLAZOS_POR_CURSO:
+        return PLAZOS_POR_CURSO[curso.strip()]
+    return PLAZO_PRESTAMO_DIAS
+
+
+def fecha_devolucion(fecha_entrega: Union[str, date], categoria: Optional[str] = None,
+                     curso: Optional[str] = None) -> str:
+    """Fecha de devolución estimada (YYYY-MM-DD) de un préstamo entregado en `fecha_entrega`"""
+    if isinstance(fecha_entrega, str):
+        fecha_entrega = datetime.strptime(fecha_entrega, FORMATO_FECHA).date()
+    return (fecha_entrega + timedelta(days=plazo_prestamo(categoria, curso))).strftime(FORMATO_FECHA)
+
+
+def hoy() -> str:
+    """Fecha actual en el formato de las columnas de fecha (YYYY-MM-DD)"""
+    return datetime.now().strftime(FORMATO_FECHA)
@@ -0,0 +1,29 @@
+"""
+Texto - Comparaciones en memoria equivalentes a las que hace SQLite
+Permiten filtrar resultados ya cargados sin volver a consultar la base de datos.
+"""
+import re
+import unicodedata
+from typing import List, Optional
+
+_MINUSCULAS_ASCII = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def contiene_like(texto: Optional[str], termino: str) -> bool:
+    """
+    Equivale a `texto LIKE '%termino%'` en SQLite: solo ignora mayúsculas
+    en letras ASCII y un valor NULL nunca coincide
+    """
+    if texto is None:
+        return False
+    return termino.translate(_MINUSCULAS_ASCII) in str(texto).translate(_MINUSCULAS_ASCII)
+
+
+def tokens_fts(texto: Optional[str]) -> List[str]:
+    """Separa un texto en palabras como el tokenizador unicode61 (sin tildes ni mayúsculas)"""
+    if not texto:
+        return []
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _TOKEN.findall(sin_tildes.lower())
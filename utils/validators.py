@@ -1,20 +1,41 @@
 """
 Validadores - Funciones de validación de datos
+Las versiones por lote (validar_ruts, validar_isbns) calculan los dígitos
+verificadores de columnas completas con NumPy, sin recorrer fila por fila.
 """
 import re
+from typing import Iterable, Sequence
+
+# Largo máximo del RUT limpio: 8 dígitos de cuerpo más el dígito verificador
+LARGO_MAXIMO_RUT = 9
 
 
 def validar_rut(rut: str) -> bool:
-    """Valida que el RUT tenga formato válido (sin validar dígito verificador)"""
-    rut_limpio = rut.replace(".", "").replace("-", "").replace(" ", "")
-    return len(rut_limpio) >= 7 and rut_limpio.isalnum()
+    """Valida el formato del RUT y su dígito verificador (módulo 11)"""
+    rut_limpio = limpiar_rut(rut).upper()
+    cuerpo, verificador = rut_limpio[:-1], rut_limpio[-1:]
+    return (7 <= len(rut_limpio) <= LARGO_MAXIMO_RUT and cuerpo.isascii() and cuerpo.isdigit()
+            and calcular_digito_rut(cuerpo) == verificador)
+
+
+def calcular_digito_rut(cuerpo: str) -> str:
+    """Calcula el dígito verificador (0-9 o K) del cuerpo numérico de un RUT"""
+    suma = sum(int(d) * (2 + i % 6) for i, d in enumerate(reversed(cuerpo)))
+    resto = 11 - suma % 11
+    return "0" if resto == 11 else "K" if resto == 10 else str(resto)
 
 
 def validar_isbn(isbn: str) -> bool:
-    """Valida que el ISBN sea válido (básico)"""
-    isbn_limpio = isbn.replace("-", "").replace(" ", "")
-    # Puede ser ISBN-10 o ISBN-13
-    return len(isbn_limpio) in [10, 13] and isbn_limpio.isdigit()
+    """Valida un ISBN-10 o ISBN-13, incluido su dígito de control"""
+    isbn_limpio = limpiar_isbn(isbn)
+    if not isbn_limpio.isascii():
+        return False
+    if len(isbn_limpio) == 13 and isbn_limpio.isdigit():
+        return sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(isbn_limpio)) % 10 == 0
+    if len(isbn_limpio) == 10 and isbn_limpio[:9].isdigit() and (isbn_limpio[9].isdigit() or isbn_limpio[9] == "X"):
+        valores = [int(d) for d in isbn_limpio[:9]] + [10 if isbn_limpio[9] == "X" else int(isbn_limpio[9])]
+        return sum(v * (10 - i) for i, v in enumerate(valores)) % 11 == 0
+    return False
 
 
 def validar_titulo(titulo: str) -> bool:
@@ -37,6 +58,11 @@ def limpiar_rut(rut: str) -> str:
     return rut.replace(".", "").replace("-", "").replace(" ", "")
 
 
+def limpiar_isbn(isbn: str) -> str:
+    """Limpia el ISBN removiendo guiones y espacios (X final en mayúscula)"""
+    return isbn.replace("-", "").replace(" ", "").upper()
+
+
 def formatear_rut(rut: str) -> str:
     """Formatea un RUT limpio al formato XX.XXX.XXX-X"""
     rut_limpio = limpiar_rut(rut)
@@ -49,3 +75,83 @@ def formatear_rut(rut: str) -> str:
     
     # Formatear
     return f"{cuerpo[-6:]}.{cuerpo[-9:-6]}.{cuerpo[:-6]}-{verificador}".lstrip("0").lstrip(".")
+
+
+def validar_ruts(ruts: Iterable[str]) -> Sequence[bool]:
+    """
+    Valida una columna de RUTs (lista o arreglo) de una vez
+    Returns: Arreglo de bool con el mismo criterio que validar_rut, fila por fila
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        # Sin NumPy se valida uno a uno con la misma regla
+        return [validar_rut(r) for r in ruts]
+
+    codigos, conservar = _matriz_codigos(np, ruts, ".- ")
+    largos = conservar.sum(axis=1)
+    # Posición de cada carácter contada desde el final: 1 = verificador, 2 = último del cuerpo...
+    desde_el_final = np.cumsum(conservar[:, ::-1], axis=1, dtype=np.int16)[:, ::-1]
+    en_cuerpo = conservar & (desde_el_final >= 2)
+    es_verificador = conservar & (desde_el_final == 1)
+
+    digitos = codigos - ord("0")
+    cuerpo_numerico = np.all(~en_cuerpo | ((digitos >= 0) & (digitos <= 9)), axis=1)
+    # Pesos 2,3,4,5,6,7,2,3... según la posición desde el final (0 fuera del cuerpo)
+    tabla_pesos = np.array([0, 0] + [2 + i % 6 for i in range(codigos.shape[1])], dtype=np.int32)
+    pesos = tabla_pesos[desde_el_final] * en_cuerpo
+    resto = 11 - (digitos * pesos).sum(axis=1) % 11
+    esperado = np.where(resto == 11, ord("0"), np.where(resto == 10, ord("K"), resto + ord("0")))
+    verificador = (codigos * es_verificador).sum(axis=1)
+    verificador = np.where(verificador == ord("k"), ord("K"), verificador)
+
+    return (largos >= 7) & (largos <= LARGO_MAXIMO_RUT) & cuerpo_numerico & (verificador == esperado)
+
+
+def validar_isbns(isbns: Iterable[str]) -> Sequence[bool]:
+    """
+    Valida una columna de ISBN-10/13 (lista o arreglo) de una vez
+    Returns: Arreglo de bool con el mismo criterio que validar_isbn, fila por fila
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return [validar_isbn(i) for i in isbns]
+
+    codigos, conservar = _matriz_codigos(np, isbns, "- ")
+    largos = conservar.sum(axis=1)
+    # Posición de cada carácter desde el inicio, sin contar separadores (0 = primero)
+    posicion = np.cumsum(conservar, axis=1, dtype=np.int16) - 1
+    digitos = codigos - ord("0")
+    es_digito = ~conservar | ((digitos >= 0) & (digitos <= 9))
+    digitos = np.where(conservar, digitos, 0)
+
+    # ISBN-13: pesos 1,3,1,3... y suma múltiplo de 10
+    suma_13 = (digitos * np.where(posicion % 2 == 1, 3, 1)).sum(axis=1)
+    isbn_13 = (largos == 13) & es_digito.all(axis=1) & (suma_13 % 10 == 0)
+
+    # ISBN-10: pesos 10..1, el último puede ser X (= 10), y suma múltiplo de 11
+    ultimo = conservar & (posicion == 9)
+    es_x = ultimo & ((codigos == ord("X")) | (codigos == ord("x")))
+    valores_10 = np.where(es_x, 10, digitos)
+    suma_10 = (valores_10 * np.where(conservar, 10 - posicion, 0)).sum(axis=1)
+    isbn_10 = (largos == 10) & (es_digito | es_x).all(axis=1) & (suma_10 % 11 == 0)
+
+    return isbn_13 | isbn_10
+
+
+def _matriz_codigos(np, valores, separadores: str):
+    """
+    Convierte la columna en una matriz (filas x largo máximo) con el código Unicode de cada
+    carácter, sin copiar texto por fila. Retorna (códigos, máscara de caracteres que no son
+    relleno ni separadores).
+    """
+    columna = np.asarray(valores if isinstance(valores, Sequence) or hasattr(valores, "__array__")
+                         else list(valores), dtype=str)
+    ancho = max(columna.dtype.itemsize // 4, 1)
+    codigos = np.ascontiguousarray(columna, dtype=f"<U{ancho}").view(np.uint32)
+    codigos = codigos.reshape(len(columna), ancho).astype(np.int32)
+    conservar = codigos != 0
+    for caracter in separadores:
+        conservar &= codigos != ord(caracter)
+    return codigos, conservar